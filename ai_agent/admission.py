@@ -0,0 +1,385 @@
+import math
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from .metrics import REGISTRY
+
+ADMISSION_REJECTIONS = REGISTRY.counter(
+    'nova_admission_rejections_total', 'Requests turned away by admission control', ('lane', 'reason')
+)
+
+# Intents whose handlers call external APIs (search backends, WolframAlpha); math
+# the local engine evaluates is cheap (see lane_for)
+EXPENSIVE_INTENTS = ('search', 'math')
+
+LANES = ('cheap', 'expensive')
+
+_controllers = weakref.WeakSet()
+
+REGISTRY.gauge_callback(
+    'nova_admission_in_flight', 'Admitted requests currently running in each lane', ('lane',),
+    lambda: [((lane,), sum(controller.lanes[lane].in_flight for controller in list(_controllers)))
+             for lane in LANES]
+)
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is not admitted
+
+    Attributes:
+        status (int): HTTP status to answer with (429 rate limited, 503 lane full)
+        retry_after (int): Seconds the client should wait before retrying
+        lane (str): Lane the request was meant to run in
+        reason (str): 'rate_limited' or 'overloaded'
+    """
+
+    def __init__(self, status, retry_after, lane, reason):
+        super().__init__(f"{reason} ({lane} lane), retry after {retry_after}s")
+        self.status = status
+        self.retry_after = retry_after
+        self.lane = lane
+        self.reason = reason
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a fixed rate (not thread-safe, see RateLimiter)"""
+
+    __slots__ = ('rate', 'burst', 'tokens', 'updated')
+
+    def __init__(self, rate, burst, now):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = now
+
+    def take(self, now, cost=1):
+        """
+        Take tokens if available
+
+        Returns:
+            float: 0 if the tokens were taken, otherwise seconds until they will be available
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        return (cost - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Per-client token buckets
+    Buckets of the least recently seen clients are dropped beyond max_clients; a
+    dropped client simply starts again with a full bucket
+    """
+
+    def __init__(self, rate, burst, max_clients=10000):
+        """
+        Args:
+            rate (float): Tokens added per second (sustained requests per second)
+            burst (float): Bucket size (requests allowed back to back)
+            max_clients (int): Number of clients tracked
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, client, cost=1):
+        """
+        Charge a client for a request
+
+        Returns:
+            float: 0 if allowed, otherwise seconds until the client may retry
+        """
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client)
+            if bucket is None:
+                bucket = self._buckets[client] = TokenBucket(self.rate, self.burst, now)
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client)
+            return bucket.take(now, cost)
+
+
+class Lane:
+    """
+    Concurrency budget for one class of requests
+    Requests reject immediately when the lane is full; only batch messages wait for
+    a slot (see BatchAdmission). The average time a request holds its slot is
+    tracked to suggest a Retry-After
+    """
+
+    def __init__(self, name, limit):
+        """
+        Args:
+            name (str): Lane name ('cheap' or 'expensive')
+            limit (int): Maximum requests running in the lane at once
+        """
+        self.name = name
+        self.limit = limit
+        self.in_flight = 0
+        self.average_seconds = 0.0
+        self._lock = threading.Lock()
+        self._released = threading.Condition(self._lock)
+
+    def try_enter(self, wait=0):
+        """
+        Take a slot, waiting up to wait seconds for one to be released
+
+        Returns:
+            bool: True if a slot was taken
+        """
+        with self._lock:
+            if self.in_flight >= self.limit:
+                if wait <= 0 or not self._released.wait_for(lambda: self.in_flight < self.limit, wait):
+                    return False
+            self.in_flight += 1
+            return True
+
+    def leave(self, elapsed):
+        with self._lock:
+            self.in_flight -= 1
+            # Exponentially weighted so the estimate follows current backend latency
+            self.average_seconds += (elapsed - self.average_seconds) * 0.2
+            self._released.notify()
+
+    def retry_after(self):
+        return max(1, math.ceil(self.average_seconds))
+
+
+class AdmissionTicket:
+    """Slot in a lane, released when the with-block ends"""
+
+    __slots__ = ('lane', 'started')
+
+    def __init__(self, lane):
+        self.lane = lane
+        self.started = time.perf_counter()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.lane.leave(time.perf_counter() - self.started)
+        return False
+
+
+class AdmissionController:
+    """
+    Admission control in front of the request handlers
+    Every request is charged to its client's token bucket for its lane and then
+    needs a free slot in that lane. Cheap intents (time, date, greetings, help...)
+    and expensive ones (search, math via WolframAlpha, speech-to-text) have
+    separate buckets and budgets, so a saturated expensive lane never delays
+    cheap requests. Rejections are immediate: 429 when the client is over its
+    rate, 503 when the lane is full, both with Retry-After. Batches are charged
+    once and their messages queue for slots (see batch).
+
+    Limits are per process; with several gunicorn workers the totals multiply.
+    """
+
+    LANES = LANES
+
+    def __init__(self, concurrency, rates, bursts, expensive_intents=EXPENSIVE_INTENTS, enabled=True):
+        """
+        Args:
+            concurrency (dict): Lane name to maximum concurrent requests
+            rates (dict): Lane name to sustained requests per second per client
+            bursts (dict): Lane name to requests per client allowed back to back
+            expensive_intents (iterable): Intents routed to the expensive lane
+            enabled (bool): When False every request is admitted
+        """
+        self.enabled = enabled
+        self.expensive_intents = frozenset(expensive_intents)
+        self.lanes = {name: Lane(name, concurrency[name]) for name in self.LANES}
+        self.limiters = {name: RateLimiter(rates[name], bursts[name]) for name in self.LANES}
+        _controllers.add(self)
+
+    @classmethod
+    def from_env(cls, **defaults):
+        """
+        Build a controller from NOVA_ADMISSION_* settings
+
+        Args:
+            **defaults: Overrides of the built-in defaults (e.g. expensive_concurrency=64
+                for an async server), still subject to the environment
+
+        Returns:
+            AdmissionController: Configured controller
+        """
+        settings = {
+            'cheap_concurrency': 64,
+            'expensive_concurrency': 4,
+            'cheap_rate': 10,
+            'cheap_burst': 20,
+            'expensive_rate': 1,
+            'expensive_burst': 5
+        }
+        settings.update(defaults)
+        for key in settings:
+            settings[key] = float(os.getenv(f'NOVA_ADMISSION_{key.upper()}', settings[key]))
+
+        intents = os.getenv('NOVA_ADMISSION_EXPENSIVE_INTENTS', ','.join(EXPENSIVE_INTENTS)).split(',')
+        return cls(
+            concurrency={lane: int(settings[f'{lane}_concurrency']) for lane in cls.LANES},
+            rates={lane: settings[f'{lane}_rate'] for lane in cls.LANES},
+            bursts={lane: settings[f'{lane}_burst'] for lane in cls.LANES},
+            expensive_intents=[intent.strip() for intent in intents if intent.strip()],
+            enabled=os.getenv('NOVA_ADMISSION', 'true').lower() in ('1', 'true', 'yes')
+        )
+
+    def with_concurrency(self, **limits):
+        """
+        Controller with its own lane budgets that charges this one's token buckets,
+        so requests admitted by either count against the same per-client rate limits
+
+        Args:
+            **limits: Lane name to maximum concurrent requests; other lanes keep this
+                controller's limits
+
+        Returns:
+            AdmissionController: Controller sharing this one's rate limiters
+        """
+        concurrency = {name: lane.limit for name, lane in self.lanes.items()}
+        concurrency.update(limits)
+        controller = AdmissionController(
+            concurrency,
+            rates={name: limiter.rate for name, limiter in self.limiters.items()},
+            bursts={name: limiter.burst for name, limiter in self.limiters.items()},
+            expensive_intents=self.expensive_intents,
+            enabled=self.enabled
+        )
+        controller.limiters = self.limiters
+        return controller
+
+    def lane_for(self, intent, local=False):
+        """
+        Lane a detected intent runs in
+
+        Args:
+            intent (str): Detected intent
+            local (bool): The request is answered without calling an external API (e.g.
+                arithmetic the local math engine evaluates), so it is cheap
+
+        Returns:
+            str: 'cheap' or 'expensive'
+        """
+        return 'expensive' if intent in self.expensive_intents and not local else 'cheap'
+
+    def admit(self, client, lane):
+        """
+        Admit a request or reject it without waiting
+
+        Args:
+            client (str): Client id the rate limit applies to
+            lane (str): 'cheap' or 'expensive'
+
+        Returns:
+            AdmissionTicket: Context manager holding the lane slot (a no-op one when disabled)
+
+        Raises:
+            AdmissionRejected: Client over its rate limit or lane at capacity
+        """
+        if not self.enabled:
+            return nullcontext()
+        self.charge(client, lane)
+        return self.enter(lane)
+
+    def charge(self, client, lane):
+        """
+        Charge a client's token bucket for a lane
+
+        Raises:
+            AdmissionRejected: Client over its rate limit (429)
+        """
+        wait = self.limiters[lane].acquire(client)
+        if wait:
+            ADMISSION_REJECTIONS.inc(lane=lane, reason='rate_limited')
+            raise AdmissionRejected(429, max(1, math.ceil(wait)), lane, 'rate_limited')
+
+    def enter(self, lane, wait=0):
+        """
+        Take a slot in a lane without charging any client
+
+        Args:
+            lane (str): 'cheap' or 'expensive'
+            wait (float): Seconds to wait for a free slot before rejecting
+
+        Returns:
+            AdmissionTicket: Context manager holding the lane slot
+
+        Raises:
+            AdmissionRejected: Lane still at capacity (503)
+        """
+        slot = self.lanes[lane]
+        if not slot.try_enter(wait):
+            ADMISSION_REJECTIONS.inc(lane=lane, reason='overloaded')
+            raise AdmissionRejected(503, slot.retry_after(), lane, 'overloaded')
+        return AdmissionTicket(slot)
+
+    def batch(self, client, wait=0):
+        """
+        Admission for the messages of one batch request
+
+        Args:
+            client (str): Client id the batch is charged to
+            wait (float): Seconds a message may wait for a free lane slot
+
+        Returns:
+            BatchAdmission: Admits the batch's messages lane by lane
+        """
+        return BatchAdmission(self, client, wait)
+
+    def in_flight(self):
+        """Requests currently running in each lane"""
+        return {name: lane.in_flight for name, lane in self.lanes.items()}
+
+
+class BatchAdmission:
+    """
+    Admission for the messages of one batch
+    The client is charged once per lane the batch uses rather than once per message,
+    so a queued batch can be replayed within a single request's rate limit, and
+    messages wait for a lane slot instead of being rejected while the lane is busy
+    """
+
+    def __init__(self, controller, client, wait=0):
+        """
+        Args:
+            controller (AdmissionController): Controller whose buckets and lanes are used
+            client (str): Client id the batch is charged to
+            wait (float): Seconds a message may wait for a free lane slot
+        """
+        self.controller = controller
+        self.client = client
+        self.wait = wait
+        self._charged = set()
+        self._lock = threading.Lock()
+
+    def admit(self, lane):
+        """
+        Admit one message of the batch
+
+        Returns:
+            AdmissionTicket: Context manager holding the lane slot (a no-op one when disabled)
+
+        Raises:
+            AdmissionRejected: Client over its rate limit, or no slot freed up in time
+        """
+        if not self.controller.enabled:
+            return nullcontext()
+        with self._lock:
+            if lane not in self._charged:
+                self.controller.charge(self.client, lane)
+                self._charged.add(lane)
+        return self.controller.enter(lane, self.wait)
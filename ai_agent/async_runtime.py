@@ -0,0 +1,397 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from .commands import GOOGLE_CSE_URL, GOOGLE_SEARCH_URL, SCRAPE_HEADERS, canonicalize_query
+from .http_client import RETRY_STATUSES
+from .metrics import (
+    HTTP_CLIENT_REQUESTS, HTTP_CLIENT_BYTES, HTTP_CLIENT_SECONDS, external_call, timed
+)
+from .parsing import ParseResult
+from .singleflight import AsyncSingleFlight
+
+logger = logging.getLogger(__name__)
+
+ASSEMBLYAI_URL = 'https://api.assemblyai.com/v2'
+UPLOAD_CHUNK_BYTES = 256 * 1024
+
+
+class AsyncHTTPClient:
+    """
+    Non-blocking counterpart of HTTPClient built on httpx.AsyncClient
+    One connection pool serves all hosts; timeouts, deadlines and retries of
+    idempotent requests behave like the blocking client
+    """
+
+    def __init__(self, max_connections=200, max_keepalive=50, connect_timeout=3.05, read_timeout=10,
+                 max_retries=2, backoff=0.2):
+        """
+        Args:
+            max_connections (int): Maximum open connections across all hosts
+            max_keepalive (int): Maximum idle keep-alive connections kept
+            connect_timeout (float): Default connect timeout in seconds
+            read_timeout (float): Default read timeout in seconds
+            max_retries (int): Retries after the first attempt for transient failures
+            backoff (float): Base backoff in seconds, doubled on every retry
+        """
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._client = None
+
+    def _get_client(self):
+        """Create the httpx client on first use, inside the serving event loop"""
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_keepalive),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout),
+                follow_redirects=True
+            )
+        return self._client
+
+    async def get(self, url, params=None, headers=None, timeout=None, retries=None, deadline=None, **kwargs):
+        """Send a GET request (see request)"""
+        return await self.request('GET', url, params=params, headers=headers, timeout=timeout,
+                                  retries=retries, deadline=deadline, **kwargs)
+
+    async def request(self, method, url, timeout=None, retries=None, deadline=None, **kwargs):
+        """
+        Send a request, retrying transient failures of idempotent methods
+
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            timeout (float): Read timeout in seconds
+            retries (int): Override for the number of retries
+            deadline (float): time.monotonic() value by which the call must finish
+
+        Returns:
+            httpx.Response: Final response (possibly a retryable error status)
+
+        Raises:
+            httpx.HTTPError: When every attempt failed or the deadline passed
+        """
+        import httpx
+        client = self._get_client()
+        host = urlsplit(url).netloc
+        read_timeout = self.read_timeout if timeout is None else timeout
+
+        max_retries = self.max_retries if retries is None else retries
+        if method.upper() not in ('GET', 'HEAD', 'OPTIONS'):
+            max_retries = 0
+
+        attempt = 0
+        while True:
+            connect_timeout = min(self.connect_timeout, read_timeout)
+            attempt_read_timeout = read_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise httpx.TimeoutException(f"Deadline exceeded before request to {host}")
+                connect_timeout = min(connect_timeout, remaining)
+                attempt_read_timeout = min(read_timeout, remaining)
+
+            started = time.perf_counter()
+            try:
+                response = await client.request(
+                    method, url, timeout=httpx.Timeout(attempt_read_timeout, connect=connect_timeout), **kwargs
+                )
+            except httpx.TransportError as e:
+                HTTP_CLIENT_SECONDS.observe(time.perf_counter() - started, host=host)
+                HTTP_CLIENT_REQUESTS.inc(host=host, status='error')
+                if attempt >= max_retries:
+                    raise
+                logger.warning("HTTP %s %s failed (%s), retrying", method, host, e.__class__.__name__)
+            else:
+                HTTP_CLIENT_SECONDS.observe(time.perf_counter() - started, host=host)
+                HTTP_CLIENT_REQUESTS.inc(host=host, status=response.status_code)
+                HTTP_CLIENT_BYTES.inc(len(response.content), host=host)
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    return response
+                logger.warning("HTTP %s %s returned %s, retrying", method, host, response.status_code)
+
+            delay = random.uniform(0, self.backoff * (2 ** attempt))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise httpx.TimeoutException(f"Deadline exceeded while retrying request to {host}")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class AsyncAssistant:
+    """
+    Event-loop execution of the assistant's request path
+    Network-bound work (search, WolframAlpha, AssemblyAI) is awaited on the
+    non-blocking client so one process can hold hundreds of requests in flight;
+    CPU-bound work (spaCy, intent matching, math, HTML parsing) and handlers with
+    no I/O run on a bounded thread pool
+    """
+
+    def __init__(self, nlp_processor, command_handler, speech_handler, http=None, cpu_workers=None,
+                 stt_timeout=None, stt_poll_interval=1.0):
+        """
+        Args:
+            nlp_processor (NLPProcessor): Intent detection
+            command_handler (CommandHandler): Handlers, caches and backend configuration
+            speech_handler (SpeechHandler): Fallback speech recognizer
+            http (AsyncHTTPClient): Non-blocking HTTP client
+            cpu_workers (int): Threads for CPU-bound work (NOVA_ASYNC_CPU_WORKERS)
+            stt_timeout (float): Seconds an AssemblyAI transcription may take (NOVA_STT_MAX_WAIT)
+            stt_poll_interval (float): Seconds between AssemblyAI status polls
+        """
+        self.nlp_processor = nlp_processor
+        self.command_handler = command_handler
+        self.speech_handler = speech_handler
+        self.http = http or AsyncHTTPClient(
+            max_connections=int(os.getenv('NOVA_ASYNC_HTTP_CONNECTIONS', 200)),
+            connect_timeout=float(os.getenv('NOVA_HTTP_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.getenv('NOVA_HTTP_READ_TIMEOUT', 10)),
+            max_retries=int(os.getenv('NOVA_HTTP_MAX_RETRIES', 2))
+        )
+        self.cpu_executor = ThreadPoolExecutor(
+            max_workers=cpu_workers or int(os.getenv('NOVA_ASYNC_CPU_WORKERS', os.cpu_count() or 2)),
+            thread_name_prefix='nova-cpu'
+        )
+        self.stt_timeout = stt_timeout or float(os.getenv('NOVA_STT_MAX_WAIT', 30))
+        self.stt_poll_interval = stt_poll_interval
+        self.search_flights = AsyncSingleFlight('search')
+
+    async def run_cpu(self, func, *args, **kwargs):
+        """Run a blocking function on the CPU pool, keeping the caller's context (request id)"""
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self.cpu_executor, call)
+
+    async def handle_command(self, intent, user_input, owner=None):
+        """
+        Async counterpart of CommandHandler.handle_command
+
+        Returns:
+            dict: Response with thinking process and answer
+        """
+        parsed = ParseResult.coerce(user_input, intent)
+        if intent == 'search':
+            handler = self.handle_search
+        elif intent == 'math':
+            handler = self.handle_math
+        else:
+            # No network I/O: the regular handler runs on the CPU pool
+            return await self.run_cpu(self.command_handler.handle_command, intent, parsed, owner=owner)
+
+        thinking = self.command_handler.generate_thinking_process(intent, parsed.text)
+        with timed(f'handle_{intent}', intent):
+            answer = await handler(parsed)
+        return {
+            'thinking': thinking,
+            'answer': answer,
+            'intent': intent
+        }
+
+    async def handle_math(self, parsed):
+        """Evaluate locally on the CPU pool, asking WolframAlpha without blocking when that fails"""
+        handler = self.command_handler
+        try:
+            result = await self.run_cpu(handler.evaluate_math, parsed)
+            if result is not None:
+                return f"The result is {result}."
+
+            answer = await handler.wolfram.ask_async(parsed.text, self.http)
+            if answer:
+                return f"The answer is {answer}."
+
+            return "I couldn't solve that mathematical problem. Please try rephrasing it as a simple calculation."
+
+        except Exception as e:
+            logger.error(f"Math error: {str(e)}")
+            return "I encountered an error while trying to calculate that. Please try again."
+
+    async def handle_search(self, parsed):
+        """Search with the same cache, coalescing and hedging policy as CommandHandler.handle_search"""
+        handler = self.command_handler
+        try:
+            query = parsed.query
+
+            cache_key = canonicalize_query(query)
+            cached = handler.search_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Search cache hit for '%s'", cache_key)
+                return cached
+
+            return await self.search_flights.do(
+                cache_key, lambda: self._search_and_cache(query, cache_key), timeout=handler.search_deadline
+            )
+
+        except Exception as e:
+            logger.error(f"Search error: {str(e)}")
+            return f"I can help you search for that. Try visiting Google with your query: {parsed.text}"
+
+    async def _search_and_cache(self, query, cache_key):
+        answer, found = await self._search(query)
+        self.command_handler._cache_search_answer(cache_key, answer, found)
+        return answer
+
+    async def _search(self, query):
+        """
+        Hedged, deadline-bounded race between the search backends
+        Unlike the threaded version, losing backends are really cancelled
+
+        Returns:
+            tuple: (answer, found), see CommandHandler._search
+        """
+        handler = self.command_handler
+        deadline = time.monotonic() + handler.search_deadline
+
+        backends = []
+        if handler._google_api_configured():
+            backends.append(self._search_google_api)
+        backends.append(self._search_scrape)
+
+        pending = {asyncio.ensure_future(backends[0](query, deadline))}
+        next_backend = 1
+        hedge_at = time.monotonic() + handler.search_hedge_delay
+
+        try:
+            while pending or next_backend < len(backends):
+                now = time.monotonic()
+                if now >= deadline:
+                    logger.warning("Search deadline exceeded for '%s'", query)
+                    break
+
+                if next_backend < len(backends) and (now >= hedge_at or not pending):
+                    pending.add(asyncio.ensure_future(backends[next_backend](query, deadline)))
+                    next_backend += 1
+                    continue
+
+                wait_until = deadline if next_backend >= len(backends) else min(hedge_at, deadline)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(wait_until - now, 0), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    result = task.result()
+                    if result is not None:
+                        return result
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return handler._search_unavailable(query)
+
+    async def _search_google_api(self, query, deadline):
+        handler = self.command_handler
+        try:
+            with external_call('google_cse'):
+                response = await self.http.get(
+                    GOOGLE_CSE_URL, params=handler._google_api_params(query), timeout=10, deadline=deadline
+                )
+            if response.status_code == 200:
+                return handler._format_google_api_results(query, response.json())
+            logger.error(f"Google API error: {response.status_code}")
+        except Exception as e:
+            logger.error(f"Google Custom Search API error: {str(e)}")
+        return None
+
+    async def _search_scrape(self, query, deadline):
+        handler = self.command_handler
+        try:
+            with external_call('google_scrape'):
+                response = await self.http.get(
+                    GOOGLE_SEARCH_URL, params={'q': query}, headers=SCRAPE_HEADERS, timeout=5, deadline=deadline
+                )
+            if response.status_code == 200:
+                return await self.run_cpu(handler._parse_scraped_results, query, response.content,
+                                          response.encoding)
+        except Exception as scrape_error:
+            logger.error(f"Web scraping error: {str(scrape_error)}")
+        return None
+
+    async def transcribe(self, buffer):
+        """
+        Transcribe an AudioBuffer with AssemblyAI's REST API, falling back to the
+        blocking Google recognizer on the CPU pool
+
+        Returns:
+            str: Transcribed text or None
+        """
+        text = await self.transcribe_assemblyai(buffer)
+        if not text:
+            logger.warning("AssemblyAI failed, trying fallback method")
+            text = await self.run_cpu(self.speech_handler.audio_to_text, buffer)
+        return text
+
+    async def transcribe_assemblyai(self, buffer):
+        """Upload, start and poll an AssemblyAI transcription without blocking the loop"""
+        api_key = self.speech_handler.assemblyai_key
+        if not api_key:
+            logger.error("AssemblyAI API key not configured. Please set ASSEMBLYAI_API_KEY environment variable.")
+            return None
+
+        headers = {'authorization': api_key}
+        deadline = time.monotonic() + self.stt_timeout
+        try:
+            with external_call('assemblyai'):
+                upload = await self.http.request(
+                    'POST', f'{ASSEMBLYAI_URL}/upload', headers=headers,
+                    content=self._iter_audio(buffer), deadline=deadline
+                )
+                upload.raise_for_status()
+
+                created = await self.http.request(
+                    'POST', f'{ASSEMBLYAI_URL}/transcript', headers=headers, deadline=deadline,
+                    json={'audio_url': upload.json()['upload_url'], 'speech_model': 'best', 'language_code': 'en'}
+                )
+                created.raise_for_status()
+                transcript = created.json()
+
+                while transcript.get('status') not in ('completed', 'error'):
+                    if time.monotonic() + self.stt_poll_interval >= deadline:
+                        logger.error("AssemblyAI transcription timed out")
+                        return None
+                    await asyncio.sleep(self.stt_poll_interval)
+                    polled = await self.http.get(
+                        f"{ASSEMBLYAI_URL}/transcript/{transcript['id']}", headers=headers, deadline=deadline
+                    )
+                    polled.raise_for_status()
+                    transcript = polled.json()
+
+            if transcript['status'] == 'error':
+                logger.error(f"AssemblyAI transcription failed: {transcript.get('error')}")
+                return None
+
+            text = (transcript.get('text') or '').strip()
+            if not text:
+                logger.warning("AssemblyAI returned empty transcript")
+                return None
+            logger.info("Transcribed text: %s", text)
+            return text
+
+        except Exception as e:
+            logger.error(f"AssemblyAI transcription error: {str(e)}")
+            return None
+
+    @staticmethod
+    async def _iter_audio(buffer):
+        """Stream the buffer in chunks (reads come from memory or the local spool file)"""
+        stream = buffer.open()
+        while True:
+            chunk = stream.read(UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+    async def aclose(self):
+        await self.http.aclose()
+        self.cpu_executor.shutdown(wait=False)
@@ -0,0 +1,322 @@
+"""
+Hashed n-gram intent classifier
+
+Inputs are turned into sparse feature vectors by hashing word unigrams, word
+bigrams and character trigrams into a fixed number of columns, and scored with a
+linear (softmax) model. Scoring uses NumPy when it is installed (a batch is one
+matrix product) and falls back to plain Python otherwise.
+
+Train a model from a labeled utterance file ({"intent": ["utterance", ...]}):
+
+    python -m ai_agent.classifier train ai_agent/data/intent_training.json
+    python -m ai_agent.classifier evaluate benchmarks/corpus.json
+"""
+import argparse
+import functools
+import json
+import logging
+import math
+import os
+import re
+import sys
+import time
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # scoring still works, training needs NumPy
+    np = None
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+DEFAULT_MODEL_PATH = os.path.join(DATA_DIR, 'intent_model.json')
+DEFAULT_TRAINING_PATH = os.path.join(DATA_DIR, 'intent_training.json')
+
+MODEL_FORMAT = 1
+
+# Rows scored per matrix product in predict_batch (bounds the dense batch matrix)
+BATCH_ROWS = 512
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?|\d+(?:\.\d+)?|[+\-*/^%=]")
+_NUMBER_RE = re.compile(r'\d')
+
+
+def tokenize(text):
+    """Lowercased words, numbers (all mapped to one token) and arithmetic operators"""
+    return ['<num>' if _NUMBER_RE.match(token) else token for token in _TOKEN_RE.findall(text.lower())]
+
+
+def _column(feature, n_features):
+    # crc32 rather than hash(): it must not change between processes
+    return zlib.crc32(feature.encode()) % n_features
+
+
+@functools.lru_cache(maxsize=16384)
+def _token_columns(token, n_features):
+    """Columns of a token's word feature and character trigrams (tokens repeat a lot, so cached)"""
+    padded = f'^{token}$'
+    features = ['w:' + token] + ['c:' + padded[start:start + 3] for start in range(len(padded) - 2)]
+    return tuple(_column(feature, n_features) for feature in features)
+
+
+def hash_features(text, n_features):
+    """
+    Hashed feature vector of a text: word unigrams, word bigrams and character trigrams
+
+    Args:
+        text (str): Input text
+        n_features (int): Number of hash buckets (columns)
+
+    Returns:
+        dict: Column index to value, scaled to unit length
+    """
+    tokens = tokenize(text)
+    vector = {}
+    for token in tokens:
+        for column in _token_columns(token, n_features):
+            vector[column] = vector.get(column, 0.0) + 1.0
+    for first, second in zip(tokens, tokens[1:]):
+        column = _column(f'b:{first} {second}', n_features)
+        vector[column] = vector.get(column, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in vector.values())) or 1.0
+    return {column: value / norm for column, value in vector.items()}
+
+
+class IntentClassifier:
+    """
+    Linear intent classifier over hashed n-gram features
+    Returns a probability for every label; the regex matcher stays the first stage
+    and this model fills in where its patterns miss or disagree
+    """
+
+    def __init__(self, labels, weights, bias, n_features):
+        """
+        Args:
+            labels (list): Intent names, one per model output
+            weights (dict): Column index to list of per-label weights (missing rows are zero)
+            bias (list): Per-label bias
+            n_features (int): Number of hash buckets the model was trained with
+        """
+        self.labels = list(labels)
+        self.n_features = n_features
+        self.bias = list(bias)
+        self.rows = {int(column): list(row) for column, row in weights.items()}
+        self.matrix = None
+        if np is not None:
+            self.matrix = np.zeros((n_features, len(self.labels)), dtype=np.float32)
+            for column, row in self.rows.items():
+                self.matrix[column] = row
+            self.bias_vector = np.asarray(self.bias, dtype=np.float32)
+
+    @classmethod
+    def load(cls, path=DEFAULT_MODEL_PATH):
+        """
+        Load a trained model
+
+        Args:
+            path (str): Model file written by save()
+
+        Returns:
+            IntentClassifier: Loaded model
+        """
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != MODEL_FORMAT:
+            raise ValueError(f"Unsupported intent model format: {data.get('format')}")
+        return cls(data['labels'], data['weights'], data['bias'], data['n_features'])
+
+    def save(self, path=DEFAULT_MODEL_PATH):
+        """Write the model as JSON, keeping only non-zero rows"""
+        data = {
+            'format': MODEL_FORMAT,
+            'n_features': self.n_features,
+            'labels': self.labels,
+            'bias': [round(value, 5) for value in self.bias],
+            'weights': {
+                str(column): [round(value, 5) for value in row]
+                for column, row in sorted(self.rows.items())
+                if any(abs(value) >= 1e-5 for value in row)
+            }
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.write('\n')
+
+    def predict(self, text):
+        """
+        Score one text
+
+        Args:
+            text (str): User input text
+
+        Returns:
+            dict: Label to probability
+        """
+        vector = hash_features(text, self.n_features)
+        if self.matrix is not None and vector:
+            columns = np.fromiter(vector, dtype=np.intp, count=len(vector))
+            values = np.fromiter(vector.values(), dtype=np.float32, count=len(vector))
+            scores = (values @ self.matrix[columns] + self.bias_vector).tolist()
+        else:
+            scores = list(self.bias)
+            for column, value in vector.items():
+                row = self.rows.get(column)
+                if row is not None:
+                    for index, weight in enumerate(row):
+                        scores[index] += value * weight
+        return dict(zip(self.labels, _softmax(scores)))
+
+    def predict_batch(self, texts):
+        """
+        Score many texts; with NumPy each block of rows is one matrix product
+
+        Args:
+            texts (list): User input texts
+
+        Returns:
+            list: Label to probability dicts, in input order
+        """
+        if self.matrix is None:
+            return [self.predict(text) for text in texts]
+
+        results = []
+        for start in range(0, len(texts), BATCH_ROWS):
+            block = texts[start:start + BATCH_ROWS]
+            features = np.zeros((len(block), self.n_features), dtype=np.float32)
+            for row, text in enumerate(block):
+                for column, value in hash_features(text, self.n_features).items():
+                    features[row, column] = value
+            scores = features @ self.matrix + self.bias_vector
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            results.extend(dict(zip(self.labels, row)) for row in probabilities.tolist())
+        return results
+
+    def classify(self, text):
+        """
+        Best label for a text
+
+        Returns:
+            tuple: (label, probability)
+        """
+        probabilities = self.predict(text)
+        label = max(probabilities, key=probabilities.get)
+        return label, probabilities[label]
+
+    @classmethod
+    def train(cls, examples, n_features=4096, epochs=300, learning_rate=2.0, l2=1e-4):
+        """
+        Fit a softmax regression model with full-batch gradient descent (needs NumPy)
+
+        Args:
+            examples (list): (text, label) pairs
+            n_features (int): Number of hash buckets
+            epochs (int): Gradient descent iterations
+            learning_rate (float): Step size
+            l2 (float): L2 regularization strength
+
+        Returns:
+            IntentClassifier: Trained model
+        """
+        if np is None:
+            raise RuntimeError("Training the intent classifier requires NumPy")
+
+        labels = sorted({label for _, label in examples})
+        index = {label: position for position, label in enumerate(labels)}
+        features = np.zeros((len(examples), n_features), dtype=np.float64)
+        targets = np.zeros((len(examples), len(labels)), dtype=np.float64)
+        for row, (text, label) in enumerate(examples):
+            for column, value in hash_features(text, n_features).items():
+                features[row, column] = value
+            targets[row, index[label]] = 1.0
+
+        weights = np.zeros((n_features, len(labels)))
+        bias = np.zeros(len(labels))
+        for _ in range(epochs):
+            scores = features @ weights + bias
+            scores -= scores.max(axis=1, keepdims=True)
+            probabilities = np.exp(scores)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            error = (probabilities - targets) / len(examples)
+            weights -= learning_rate * (features.T @ error + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        used = np.flatnonzero(np.abs(weights).max(axis=1) > 0)
+        return cls(labels, {int(column): weights[column].tolist() for column in used}, bias.tolist(), n_features)
+
+
+def _softmax(scores):
+    top = max(scores)
+    exps = [math.exp(score - top) for score in scores]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+def load_examples(path):
+    """Read a labeled utterance file ({"intent": ["utterance", ...]}) into (text, label) pairs"""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    return [(text, label) for label, texts in data.items() for text in texts]
+
+
+def load_default_classifier():
+    """
+    Load the classifier configured by NOVA_INTENT_CLASSIFIER / NOVA_INTENT_MODEL
+
+    Returns:
+        IntentClassifier: Loaded model, or None when disabled or unavailable
+    """
+    if os.getenv('NOVA_INTENT_CLASSIFIER', 'on').lower() in ('0', 'off', 'false', 'no'):
+        return None
+    path = os.getenv('NOVA_INTENT_MODEL', DEFAULT_MODEL_PATH)
+    try:
+        started = time.perf_counter()
+        classifier = IntentClassifier.load(path)
+        logger.info(f"Loaded intent classifier from {path} in {(time.perf_counter() - started) * 1000:.1f} ms "
+                    f"({'NumPy' if classifier.matrix is not None else 'pure Python'} scoring)")
+        return classifier
+    except FileNotFoundError:
+        logger.warning(f"Intent model {path} not found; train one with: python -m ai_agent.classifier train")
+    except Exception as e:
+        logger.error(f"Failed to load intent model {path}: {str(e)}")
+    return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    train = commands.add_parser('train', help='Train a model from a labeled utterance file')
+    train.add_argument('data', nargs='?', default=DEFAULT_TRAINING_PATH)
+    train.add_argument('-o', '--output', default=DEFAULT_MODEL_PATH)
+    train.add_argument('--features', type=int, default=4096, help='Number of hash buckets')
+    train.add_argument('--epochs', type=int, default=300)
+
+    evaluate = commands.add_parser('evaluate', help='Report the accuracy of a model on a labeled utterance file')
+    evaluate.add_argument('data')
+    evaluate.add_argument('-m', '--model', default=DEFAULT_MODEL_PATH)
+
+    args = parser.parse_args(argv)
+    if args.command == 'train':
+        examples = load_examples(args.data)
+        started = time.perf_counter()
+        classifier = IntentClassifier.train(examples, n_features=args.features, epochs=args.epochs)
+        classifier.save(args.output)
+        correct = sum(classifier.classify(text)[0] == label for text, label in examples)
+        print(f"Trained on {len(examples)} utterances in {time.perf_counter() - started:.2f}s "
+              f"(training accuracy {correct / len(examples):.3f}), saved to {args.output}")
+    else:
+        classifier = IntentClassifier.load(args.model)
+        examples = load_examples(args.data)
+        misses = [(text, label, classifier.classify(text)) for text, label in examples]
+        misses = [(text, label, predicted) for text, label, predicted in misses if predicted[0] != label]
+        for text, label, (predicted, probability) in misses:
+            print(f"  {text!r}: expected {label}, got {predicted} ({probability:.2f})")
+        print(f"Accuracy {1 - len(misses) / len(examples):.3f} on {len(examples)} utterances")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
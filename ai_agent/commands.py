@@ -1,24 +1,128 @@
+import contextvars
 import datetime
+import json
 import re
-import requests
-from bs4 import BeautifulSoup
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging
 import os
 from dotenv import load_dotenv
 
+from .cache import TTLCache
+from .metrics import timed, external_call, track_cache, track_http_client
+from .http_client import HTTPClient
+from .math_engine import MathEngine, MathError
+from .wolfram import WolframBackend
+from .reminders import ReminderStore, ReminderScheduler
+from .singleflight import SingleFlight
+from .scraping import GOOGLE_RESULT_RULES, SCRAPE_CHUNK_BYTES, extract_snippet
+from .parsing import ParseResult
+
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+GOOGLE_CSE_URL = "https://www.googleapis.com/customsearch/v1"
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+SCRAPE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
+
+# How often a running search checks whether the client went away
+SEARCH_POLL_INTERVAL = 0.25
+
+# Leading request phrasing that does not change what is searched for
+SEARCH_PREFIX_RE = re.compile(
+    r'^(?:(?:please|can\s+you|could\s+you|search(?:\s+for)?|find|google|look\s+(?:up|for)|show\s+me|'
+    r'tell\s+me(?:\s+more)?\s+about)\s+)+'
+)
+SEARCH_STOP_WORDS = frozenset(
+    'a an the of for on in at to about me is are was were what who where when how '
+    'please some any and or'.split()
+)
+
+
+def canonicalize_query(query):
+    """
+    Normalize a search query into a cache key
+    Lowercases, strips punctuation, request phrasing and stop-words, and collapses whitespace
+    
+    Args:
+        query (str): Search query
+        
+    Returns:
+        str: Canonical form of the query
+    """
+    text = re.sub(r'[^\w\s]', ' ', query.lower())
+    text = ' '.join(text.split())
+    text = SEARCH_PREFIX_RE.sub('', text)
+    words = [word for word in text.split() if word not in SEARCH_STOP_WORDS]
+    return ' '.join(words) or text
+
 class CommandHandler:
     """
     Handles different types of commands and generates responses
     """
     
     def __init__(self):
-        self.wolfram_app_id = os.getenv('WOLFRAM_ALPHA_APP_ID')
         self.google_api_key = os.getenv('GOOGLE_API_KEY')
         self.google_search_engine_id = os.getenv('GOOGLE_SEARCH_ENGINE_ID')
-        self.reminders = []  # Simple in-memory storage for reminders
+        
+        # Reminders persist in SQLite; the scheduler fires them when due
+        self.reminder_store = ReminderStore(os.getenv('NOVA_REMINDER_DB', 'nova_reminders.db'))
+        self.reminder_scheduler = ReminderScheduler(
+            self.reminder_store,
+            horizon=float(os.getenv('NOVA_REMINDER_HORIZON', 3600))
+        )
+        self.reminder_scheduler.start()
+        
+        # Bounded evaluator for local arithmetic (no eval)
+        self.math_engine = MathEngine(
+            max_exponent=int(os.getenv('NOVA_MATH_MAX_EXPONENT', 1000)),
+            max_digits=int(os.getenv('NOVA_MATH_MAX_DIGITS', 100))
+        )
+        
+        # Search results cache (the short negative TTL covers "no results" answers)
+        self.search_cache = TTLCache(
+            maxsize=int(os.getenv('NOVA_SEARCH_CACHE_SIZE', 512)),
+            ttl=float(os.getenv('NOVA_SEARCH_CACHE_TTL', 600)),
+            name='search'
+        )
+        self.search_negative_ttl = float(os.getenv('NOVA_SEARCH_NEGATIVE_TTL', 60))
+        track_cache(self.search_cache)
+        
+        # Shared pooled HTTP sessions for all outbound calls
+        self.http = HTTPClient(
+            pool_size=int(os.getenv('NOVA_HTTP_POOL_SIZE', 10)),
+            connect_timeout=float(os.getenv('NOVA_HTTP_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.getenv('NOVA_HTTP_READ_TIMEOUT', 10)),
+            max_retries=int(os.getenv('NOVA_HTTP_MAX_RETRIES', 2))
+        )
+        track_http_client(self.http)
+        
+        # WolframAlpha fallback for math the local engine can't do
+        self.wolfram = WolframBackend(
+            os.getenv('WOLFRAM_ALPHA_APP_ID'),
+            self.http,
+            timeout=float(os.getenv('NOVA_WOLFRAM_TIMEOUT', 5)),
+            max_concurrent=int(os.getenv('NOVA_WOLFRAM_MAX_CONCURRENT', 4)),
+            cache_size=int(os.getenv('NOVA_WOLFRAM_CACHE_SIZE', 1024)),
+            cache_ttl=float(os.getenv('NOVA_WOLFRAM_CACHE_TTL', 86400))
+        )
+        
+        # Hedged search: the fallback backend starts if the primary has not answered
+        # within the hedge delay, and the whole search is bounded by the deadline
+        self.search_deadline = float(os.getenv('NOVA_SEARCH_DEADLINE', 6))
+        self.search_hedge_delay = float(os.getenv('NOVA_SEARCH_HEDGE_DELAY', 1.0))
+        self.search_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv('NOVA_SEARCH_WORKERS', 8)),
+            thread_name_prefix='nova-search'
+        )
+        # Concurrent identical queries share one search instead of each calling the backends
+        self.search_flights = SingleFlight('search')
+        
+        # Per-request state (progress callback, cancellation, owner) for the thread running a handler
+        self._context = threading.local()
     
     def generate_thinking_process(self, intent, user_input):
         """
@@ -86,19 +190,25 @@ class CommandHandler:
         steps = thinking_steps.get(intent, thinking_steps['unknown'])
         return "\n".join(steps)
     
-    def handle_command(self, intent, user_input):
+    def handle_command(self, intent, user_input, progress=None, cancel_event=None, owner=None):
         """
         Main command handler that routes to specific handlers
         
         Args:
             intent (str): Detected intent
-            user_input (str): Original user input
+            user_input (ParseResult): Parsed user input (NLPProcessor.parse); raw text is
+                accepted too and parsed on demand
+            progress (callable): Called with a short status message as the handler progresses
+            cancel_event (threading.Event): Set when the caller no longer wants the answer
+            owner (str): Client id the request belongs to (used to scope reminders)
             
         Returns:
             dict: Response with thinking process and answer
         """
+        parsed = ParseResult.coerce(user_input, intent)
+        
         # Generate thinking process
-        thinking = self.generate_thinking_process(intent, user_input)
+        thinking = self.generate_thinking_process(intent, parsed.text)
         
         handlers = {
             'time': self.handle_time,
@@ -113,7 +223,15 @@ class CommandHandler:
         }
         
         handler = handlers.get(intent, self.handle_unknown)
-        answer = handler(user_input)
+        
+        context = self._context
+        previous = (getattr(context, 'progress', None), getattr(context, 'cancel_event', None), getattr(context, 'owner', None))
+        context.progress, context.cancel_event, context.owner = progress, cancel_event, owner
+        try:
+            with timed(handler.__name__, intent):
+                answer = handler(parsed)
+        finally:
+            context.progress, context.cancel_event, context.owner = previous
         
         return {
             'thinking': thinking,
@@ -121,233 +239,347 @@ class CommandHandler:
             'intent': intent
         }
     
-    def handle_time(self, user_input):
+    def _report_progress(self, message):
+        """Send a status message to the current request's progress callback, if any"""
+        progress = getattr(self._context, 'progress', None)
+        if progress:
+            try:
+                progress(message)
+            except Exception as e:
+                logger.error("Progress callback error: %s", e)
+    
+    def _is_cancelled(self):
+        """Whether the caller of the current request has gone away"""
+        cancel_event = getattr(self._context, 'cancel_event', None)
+        return cancel_event is not None and cancel_event.is_set()
+    
+    def handle_time(self, parsed):
         """Handle time-related queries"""
         now = datetime.datetime.now()
         time_str = now.strftime("%I:%M %p")
         return f"The current time is {time_str}."
     
-    def handle_date(self, user_input):
+    def handle_date(self, parsed):
         """Handle date-related queries"""
         now = datetime.datetime.now()
         date_str = now.strftime("%B %d, %Y")
         day_name = now.strftime("%A")
         return f"Today is {day_name}, {date_str}."
     
-    def handle_math(self, user_input):
+    def evaluate_math(self, parsed):
+        """
+        Evaluate a math request with the local engine
+        
+        Args:
+            parsed (ParseResult): Parsed user input
+            
+        Returns:
+            int or float: Result, or None when the input needs WolframAlpha
+        """
+        # Arithmetic expression with word operators turned into symbols
+        expression = parsed.expression
+        if not expression:
+            return None
+        try:
+            return self.math_engine.evaluate(expression)
+        except MathError as e:
+            logger.debug("Local math evaluation failed for '%s': %s", expression, e)
+            return None
+    
+    def handle_math(self, parsed):
         """Handle mathematical calculations"""
         try:
-            # Extract the mathematical expression
-            # Clean the input
-            user_input_lower = user_input.lower()
-            
-            # Replace word operators with symbols
-            replacements = {
-                'plus': '+',
-                'minus': '-',
-                'times': '*',
-                'multiplied by': '*',
-                'divided by': '/',
-                'x': '*',
-                'to the power of': '**',
-                'squared': '**2',
-                'cubed': '**3'
-            }
-            
-            expression = user_input_lower
-            for word, symbol in replacements.items():
-                expression = expression.replace(word, symbol)
-            
-            # Extract numeric expression
-            match = re.search(r'[\d\+\-\*/\(\)\.\s\*]+', expression)
-            if match:
-                expression = match.group(0).strip()
-                
-                # Safely evaluate the expression
-                # Remove any potentially dangerous characters
-                safe_expression = re.sub(r'[^0-9\+\-\*/\(\)\.\s\*]', '', expression)
-                
-                if safe_expression:
-                    try:
-                        result = eval(safe_expression)
-                        return f"The result is {result}."
-                    except:
-                        pass
+            result = self.evaluate_math(parsed)
+            if result is not None:
+                return f"The result is {result}."
             
             # Try WolframAlpha if available
-            if self.wolfram_app_id and self.wolfram_app_id != 'your_wolfram_alpha_app_id_here':
-                try:
-                    import wolframalpha
-                    client = wolframalpha.Client(self.wolfram_app_id)
-                    res = client.query(user_input)
-                    answer = next(res.results).text
+            if self.wolfram.configured:
+                self._report_progress("Asking WolframAlpha")
+                answer = self.wolfram.ask(parsed.text)
+                if answer:
                     return f"The answer is {answer}."
-                except Exception as e:
-                    logger.error(f"WolframAlpha error: {str(e)}")
             
             return "I couldn't solve that mathematical problem. Please try rephrasing it as a simple calculation."
         
         except Exception as e:
-            logger.error(f"Math error: {str(e)}")
+            logger.error("Math error: %s", e)
             return "I encountered an error while trying to calculate that. Please try again."
     
-    def handle_search(self, user_input):
+    def handle_search(self, parsed):
         """Handle web search queries using Google Custom Search API with image support"""
         try:
-            # Extract search query with more patterns
-            search_patterns = [
-                r'(?:search|find|google|look\s+(?:up|for)|show\s+me)\s+(.+)',
-                r'tell\s+me\s+(?:about|more\s+about)\s+(.+)',
-                r'what\s+(?:is|are|was|were)\s+(.+)',
-                r'who\s+(?:is|are|was|were)\s+(.+)',
-                r'where\s+(?:is|are|can\s+i\s+find)\s+(.+)',
-                r'when\s+(?:is|are|did|was)\s+(.+)',
-                r'how\s+to\s+(.+)',
-                r'latest\s+(?:news|info|information|updates?)\s+(?:on|about)?\s*(.+)',
-                r'information\s+(?:about|on)\s+(.+)',
-                r'details\s+(?:about|on)\s+(.+)',
-                r'explain\s+(.+)'
-            ]
+            query = parsed.query
             
-            query = None
-            for pattern in search_patterns:
-                match = re.search(pattern, user_input.lower())
-                if match:
-                    query = match.group(1).strip()
-                    break
+            # Serve repeated queries from the cache
+            cache_key = canonicalize_query(query)
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                logger.info("Search cache hit for '%s'", cache_key)
+                return cached
             
-            if not query:
-                query = user_input
+            return self.search_flights.do(
+                cache_key, lambda: self._search_and_cache(query, cache_key), timeout=self.search_deadline,
+                cancel_event=getattr(self._context, 'cancel_event', None)
+            )
+        
+        except Exception as e:
+            logger.error("Search error: %s", e)
+            return f"I can help you search for that. Try visiting Google with your query: {parsed.text}"
+    
+    def _search_and_cache(self, query, cache_key):
+        """
+        Search and cache the answer (before the in-flight entry is released, so no lookup is repeated)
+        
+        The search is shared by every request for the same query, so it runs under the
+        flight's cancellation instead of the leading request's: it only stops early once
+        all of those requests have gone away
+        """
+        context = self._context
+        previous = (getattr(context, 'cancel_event', None), getattr(context, 'owner', None))
+        context.cancel_event, context.owner = self.search_flights.cancellation(cache_key), None
+        try:
+            answer, found = self._search(query)
+        finally:
+            context.cancel_event, context.owner = previous
+        self._cache_search_answer(cache_key, answer, found)
+        return answer
+    
+    def _cache_search_answer(self, cache_key, answer, found):
+        """Cache real results normally and "no results" briefly; never cache errors"""
+        if found is True:
+            self.search_cache.set(cache_key, answer)
+        elif found is False:
+            self.search_cache.set(cache_key, answer, ttl=self.search_negative_ttl)
+    
+    def _google_api_configured(self):
+        return bool(self.google_api_key and self.google_api_key != 'your_google_api_key_here' and
+                    self.google_search_engine_id and self.google_search_engine_id != 'your_search_engine_id_here')
+    
+    def _search(self, query):
+        """
+        Run the search backends for a query as a hedged, deadline-bounded race
+        
+        The primary backend (Custom Search API) starts immediately; the scraping
+        fallback starts once the hedge delay passes or the primary fails. The first
+        acceptable answer wins and the other backend is cancelled or ignored.
+        
+        Args:
+            query (str): Search query
             
-            # Try Google Custom Search API first (if configured)
-            if self.google_api_key and self.google_api_key != 'your_google_api_key_here' and \
-               self.google_search_engine_id and self.google_search_engine_id != 'your_search_engine_id_here':
-                try:
-                    search_url = "https://www.googleapis.com/customsearch/v1"
-                    params = {
-                        'key': self.google_api_key,
-                        'cx': self.google_search_engine_id,
-                        'q': query,
-                        'num': 3  # Get top 3 results
-                    }
-                    
-                    response = requests.get(search_url, params=params, timeout=10)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        if 'items' in data and len(data['items']) > 0:
-                            # Get the first result
-                            result = data['items'][0]
-                            title = result.get('title', '')
-                            snippet = result.get('snippet', '')
-                            link = result.get('link', '')
-                            
-                            # Try to get image if available
-                            image_url = None
-                            if 'pagemap' in result:
-                                if 'cse_image' in result['pagemap']:
-                                    image_url = result['pagemap']['cse_image'][0].get('src')
-                                elif 'metatags' in result['pagemap'] and len(result['pagemap']['metatags']) > 0:
-                                    metatags = result['pagemap']['metatags'][0]
-                                    image_url = metatags.get('og:image') or metatags.get('twitter:image')
-                            
-                            # Build response with special format for images
-                            response_data = {
-                                'text': f"Here's what I found about '{query}':\n\n📌 {title}\n{snippet}\n\n🔗 Source: {link}",
-                                'image': image_url,
-                                'query': query,
-                                'link': link
-                            }
-                            
-                            # Return formatted response that frontend can parse
-                            import json
-                            return json.dumps(response_data)
-                        else:
-                            return f"I couldn't find any results for '{query}'. Try rephrasing your search."
-                    else:
-                        logger.error(f"Google API error: {response.status_code}")
+        Returns:
+            tuple: (answer, found) where found is True for results, False for a
+                definite "no results" and None when no backend could answer
+        """
+        deadline = time.monotonic() + self.search_deadline
+        
+        # (progress message, backend) in priority order
+        backends = []
+        if self._google_api_configured():
+            backends.append(("Querying Google Custom Search", self._search_google_api))
+        backends.append(("Searching the web", self._search_scrape))
+        
+        def start(index):
+            label, backend = backends[index]
+            self._report_progress(label)
+            return self.search_executor.submit(contextvars.copy_context().run, backend, query, deadline)
+        
+        pending = {start(0)}
+        next_backend = 1
+        hedge_at = time.monotonic() + self.search_hedge_delay
+        
+        try:
+            while pending or next_backend < len(backends):
+                now = time.monotonic()
+                if now >= deadline:
+                    logger.warning("Search deadline exceeded for '%s'", query)
+                    break
+                if self._is_cancelled():
+                    logger.info("Search for '%s' cancelled by the client", query)
+                    break
                 
-                except Exception as e:
-                    logger.error(f"Google Custom Search API error: {str(e)}")
-                    # Fall through to web scraping method
-            
-            # Fallback to web scraping (less reliable)
-            try:
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                }
-                search_url = f"https://www.google.com/search?q={query}"
-                response = requests.get(search_url, headers=headers, timeout=5)
+                # Start the fallback once the hedge delay passed or nothing is running
+                if next_backend < len(backends) and (now >= hedge_at or not pending):
+                    pending.add(start(next_backend))
+                    next_backend += 1
+                    continue
                 
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.text, 'html.parser')
-                    
-                    # Try to extract featured snippet
-                    featured = soup.find('div', class_='BNeawe s3v9rd AP7Wnd')
-                    if featured:
-                        snippet = featured.get_text()
-                        return f"Here's what I found about '{query}': {snippet}"
-                    
-                    # Extract search results
-                    search_results = soup.find_all('div', class_='BNeawe vvjwJb AP7Wnd')
-                    if search_results:
-                        result_text = search_results[0].get_text()
-                        return f"I found this about '{query}': {result_text}"
-            except Exception as scrape_error:
-                logger.error(f"Web scraping error: {str(scrape_error)}")
+                # Wake up regularly so cancellation is noticed promptly
+                wait_until = deadline if next_backend >= len(backends) else min(hedge_at, deadline)
+                timeout = min(max(wait_until - now, 0), SEARCH_POLL_INTERVAL)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result = future.result()
+                    if result is not None:
+                        return result
+        finally:
+            for future in pending:
+                future.cancel()
+        
+        return self._search_unavailable(query)
+    
+    @staticmethod
+    def _search_unavailable(query):
+        """Answer used when no backend produced a result; returns (answer, None)"""
+        return f"I can search for '{query}', but I need a Google API key to retrieve results. Visit: https://www.google.com/search?q={query.replace(' ', '+')}", None
+    
+    def _search_google_api(self, query, deadline=None):
+        """
+        Query the Google Custom Search API
+        
+        Args:
+            query (str): Search query
+            deadline (float): time.monotonic() value by which the call must finish
+        
+        Returns:
+            tuple: (answer, found), or None if the API is not configured or failed
+        """
+        if not self._google_api_configured():
+            return None
+        
+        try:
+            with external_call('google_cse'):
+                response = self.http.get(
+                    GOOGLE_CSE_URL, params=self._google_api_params(query), timeout=10, deadline=deadline
+                )
             
-            return f"I can search for '{query}', but I need a Google API key to retrieve results. Visit: https://www.google.com/search?q={query.replace(' ', '+')}"
+            if response.status_code == 200:
+                return self._format_google_api_results(query, response.json())
+            else:
+                logger.error("Google API error: %s", response.status_code)
         
         except Exception as e:
-            logger.error(f"Search error: {str(e)}")
-            return f"I can help you search for that. Try visiting Google with your query: {user_input}"
+            logger.error("Google Custom Search API error: %s", e)
+        
+        return None
     
-    def handle_reminder(self, user_input):
-        """Handle reminder creation"""
-        try:
-            # Extract reminder text
-            reminder_patterns = [
-                r'(?:remind|reminder)\s+(?:me\s+)?(?:to\s+)?(?:about\s+)?(.+)',
-                r'set\s+(?:a\s+)?reminder\s+(?:for\s+)?(.+)',
-                r'don\'t\s+forget\s+(?:to\s+)?(.+)'
-            ]
+    def _google_api_params(self, query):
+        return {
+            'key': self.google_api_key,
+            'cx': self.google_search_engine_id,
+            'q': query,
+            'num': 3  # Get top 3 results
+        }
+    
+    @staticmethod
+    def _format_google_api_results(query, data):
+        """
+        Turn a Custom Search API response into an answer
+        
+        Returns:
+            tuple: (answer, found)
+        """
+        if 'items' in data and len(data['items']) > 0:
+            # Get the first result
+            result = data['items'][0]
+            title = result.get('title', '')
+            snippet = result.get('snippet', '')
+            link = result.get('link', '')
             
-            reminder_text = None
-            for pattern in reminder_patterns:
-                match = re.search(pattern, user_input.lower())
-                if match:
-                    reminder_text = match.group(1).strip()
-                    break
+            # Try to get image if available
+            image_url = None
+            if 'pagemap' in result:
+                if 'cse_image' in result['pagemap']:
+                    image_url = result['pagemap']['cse_image'][0].get('src')
+                elif 'metatags' in result['pagemap'] and len(result['pagemap']['metatags']) > 0:
+                    metatags = result['pagemap']['metatags'][0]
+                    image_url = metatags.get('og:image') or metatags.get('twitter:image')
+            
+            # Build response with special format for images
+            response_data = {
+                'text': f"Here's what I found about '{query}':\n\n📌 {title}\n{snippet}\n\n🔗 Source: {link}",
+                'image': image_url,
+                'query': query,
+                'link': link
+            }
+            
+            # Return formatted response that frontend can parse
+            return json.dumps(response_data), True
+        
+        return f"I couldn't find any results for '{query}'. Try rephrasing your search.", False
+    
+    def _search_scrape(self, query, deadline=None):
+        """
+        Scrape the Google results page for a snippet
+        
+        Args:
+            query (str): Search query
+            deadline (float): time.monotonic() value by which the call must finish
+        
+        Returns:
+            tuple: (answer, True), or None if nothing could be extracted
+        """
+        try:
+            # Streamed: parsing starts with the first chunk and the rest of the page
+            # is not downloaded once the snippet is found
+            with external_call('google_scrape'):
+                response = self.http.get(
+                    GOOGLE_SEARCH_URL, params={'q': query}, headers=SCRAPE_HEADERS, timeout=5,
+                    deadline=deadline, stream=True
+                )
             
-            if not reminder_text:
-                reminder_text = user_input
+            with response:
+                if response.status_code == 200:
+                    return self._parse_scraped_results(
+                        query, response.iter_content(SCRAPE_CHUNK_BYTES), response.encoding
+                    )
+        except Exception as scrape_error:
+            logger.error("Web scraping error: %s", scrape_error)
+        
+        return None
+    
+    @staticmethod
+    def _parse_scraped_results(query, html, encoding=None):
+        """
+        Pull a snippet out of a Google results page (featured snippet, else the first result)
+        
+        Args:
+            query (str): Search query
+            html: The page as str, bytes or an iterable of bytes chunks
+            encoding (str): Charset of the bytes
+        
+        Returns:
+            tuple: (answer, True), or None if nothing could be extracted
+        """
+        match = extract_snippet(html, GOOGLE_RESULT_RULES, encoding=encoding)
+        if match is None:
+            return None
+        rule, text = match
+        return rule.template.format(query=query, text=text), True
+    
+    def handle_reminder(self, parsed):
+        """Handle reminder creation"""
+        try:
+            # Due time ("in 20 minutes", "tomorrow at 9", "next friday", ...) and what to remind of
+            expression = parsed.time
+            reminder_text = parsed.reminder_text
             
-            # Extract time if present
-            time_match = re.search(r'(\d{1,2})\s*(?::|\.)\s*(\d{2})\s*(am|pm)?', user_input.lower())
             time_str = ""
-            if time_match:
-                time_str = f" at {time_match.group(0)}"
+            due_at = None
+            if expression:
+                when = expression.text
+                time_str = f" at {when}" if when[:1].isdigit() else f" {when}"
+                due_at = expression.timestamp
             
-            # Store reminder
-            reminder = {
-                'text': reminder_text,
-                'time': time_str,
-                'created': datetime.datetime.now().isoformat()
-            }
-            self.reminders.append(reminder)
+            # Store reminder and schedule it if it has a due time
+            owner = getattr(self._context, 'owner', None) or 'anonymous'
+            reminder = self.reminder_store.add(
+                owner, reminder_text, due_at=due_at, time_text=expression.text if expression else None
+            )
+            if due_at is not None:
+                self.reminder_scheduler.schedule(reminder['id'], due_at)
             
             return f"I'll remind you{time_str}: {reminder_text}"
         
         except Exception as e:
-            logger.error(f"Reminder error: {str(e)}")
+            logger.error("Reminder error: %s", e)
             return "I couldn't set that reminder. Please try again."
     
-    def handle_weather(self, user_input):
+    def handle_weather(self, parsed):
         """Handle weather queries"""
         return "I don't have access to weather data at the moment. You can check weather.com or your local weather service for current conditions."
     
-    def handle_greeting(self, user_input):
+    def handle_greeting(self, parsed):
         """Handle greeting messages"""
         now = datetime.datetime.now()
         hour = now.hour
@@ -368,7 +600,7 @@ class CommandHandler:
         import random
         return random.choice(responses)
     
-    def handle_help(self, user_input):
+    def handle_help(self, parsed):
         """Handle help requests"""
         help_text = """I'm your AI personal assistant! Here's what I can do:
 
@@ -386,6 +618,6 @@ Try asking me anything from the list above!"""
         
         return help_text
     
-    def handle_unknown(self, user_input):
+    def handle_unknown(self, parsed):
         """Handle unknown intents"""
         return "I'm not sure I understood that. Try asking me about the time, to do a calculation, search for something, or set a reminder. Say 'help' to see what I can do!"
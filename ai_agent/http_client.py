@@ -0,0 +1,201 @@
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+from .metrics import HTTP_CLIENT_REQUESTS, HTTP_CLIENT_BYTES, HTTP_CLIENT_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying for idempotent requests
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class HTTPClient:
+    """
+    Shared outbound HTTP layer
+    Keeps one pooled keep-alive requests.Session per host, applies connect/read
+    timeouts and retries transient failures with jittered exponential backoff
+    """
+
+    def __init__(self, pool_size=10, connect_timeout=3.05, read_timeout=10, max_retries=2, backoff=0.2):
+        """
+        Args:
+            pool_size (int): Maximum pooled keep-alive connections per host
+            connect_timeout (float): Default TCP/TLS connect timeout in seconds
+            read_timeout (float): Default read timeout in seconds
+            max_retries (int): Retries after the first attempt for transient failures
+            backoff (float): Base backoff in seconds, doubled on every retry
+        """
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sessions = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _session(self, host):
+        """Return the pooled session for a host, creating it on first use"""
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[host] = session
+                self._counters[host] = {'requests': 0, 'retries': 0, 'errors': 0}
+            return session
+
+    def _count(self, host, name):
+        with self._lock:
+            self._counters[host][name] += 1
+
+    def _sleep_before_retry(self, attempt, deadline=None):
+        """
+        Exponential backoff with full jitter
+
+        Returns:
+            bool: False if the deadline would pass before the retry could start
+        """
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return False
+        time.sleep(delay)
+        return True
+
+    def get(self, url, params=None, headers=None, timeout=None, retries=None, deadline=None, **kwargs):
+        """
+        Send a GET request through the host's pooled session
+
+        Args:
+            url (str): Request URL
+            params (dict): Query parameters
+            headers (dict): Extra request headers
+            timeout (float or tuple): Read timeout, or (connect, read) tuple
+            retries (int): Override for the number of retries
+            deadline (float): time.monotonic() value by which the call must finish
+
+        Returns:
+            requests.Response: Final response (possibly a retryable error status)
+
+        Raises:
+            requests.RequestException: When every attempt failed or the deadline passed
+        """
+        return self.request('GET', url, params=params, headers=headers, timeout=timeout,
+                            retries=retries, deadline=deadline, **kwargs)
+
+    def request(self, method, url, timeout=None, retries=None, deadline=None, **kwargs):
+        """
+        Send a request through the host's pooled session, retrying transient failures
+
+        Only idempotent methods are retried on error statuses or connection failures.
+        With a deadline, timeouts are clamped to the remaining time and no retry is
+        started that could not finish before it
+        """
+        # requests is imported on first use to keep it off the startup path
+        import requests
+        host = urlsplit(url).netloc
+        session = self._session(host)
+
+        if timeout is None:
+            timeout = (self.connect_timeout, self.read_timeout)
+        elif not isinstance(timeout, tuple):
+            timeout = (min(self.connect_timeout, timeout), timeout)
+
+        max_retries = self.max_retries if retries is None else retries
+        if method.upper() not in ('GET', 'HEAD', 'OPTIONS'):
+            max_retries = 0
+
+        attempt = 0
+        while True:
+            attempt_timeout = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Deadline exceeded before request to {host}")
+                attempt_timeout = (min(timeout[0], remaining), min(timeout[1], remaining))
+
+            self._count(host, 'requests')
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, timeout=attempt_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                HTTP_CLIENT_SECONDS.observe(time.perf_counter() - started, host=host)
+                HTTP_CLIENT_REQUESTS.inc(host=host, status='error')
+                self._count(host, 'errors')
+                if attempt >= max_retries:
+                    raise
+                logger.warning(f"HTTP {method} {host} failed ({e.__class__.__name__}), retrying")
+            else:
+                self._record_response(host, response, started, kwargs.get('stream', False))
+                if response.status_code not in RETRY_STATUSES or attempt >= max_retries:
+                    if response.status_code >= 500:
+                        self._count(host, 'errors')
+                    return response
+                self._count(host, 'errors')
+                logger.warning(f"HTTP {method} {host} returned {response.status_code}, retrying")
+                response.close()
+
+            if not self._sleep_before_retry(attempt, deadline):
+                raise requests.Timeout(f"Deadline exceeded while retrying request to {host}")
+            self._count(host, 'retries')
+            attempt += 1
+
+    @staticmethod
+    def _record_response(host, response, started, stream):
+        """Export status, duration and body size of one attempt"""
+        HTTP_CLIENT_SECONDS.observe(time.perf_counter() - started, host=host)
+        HTTP_CLIENT_REQUESTS.inc(host=host, status=response.status_code)
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            HTTP_CLIENT_BYTES.inc(int(length), host=host)
+        elif not stream:
+            # Non-streamed bodies are already downloaded, so measuring them is free
+            HTTP_CLIENT_BYTES.inc(len(response.content), host=host)
+
+    def stats(self):
+        """
+        Report per-host request and connection reuse statistics
+
+        Returns:
+            dict: Host to counters; 'connections' is how many TCP connections were
+                opened and 'reused' how many requests went over an existing one
+        """
+        result = {}
+        with self._lock:
+            sessions = dict(self._sessions)
+            counters = {host: dict(values) for host, values in self._counters.items()}
+
+        for host, session in sessions.items():
+            connections = 0
+            pooled_requests = 0
+            adapter = session.get_adapter('https://')
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+                    pooled_requests += pool.num_requests
+
+            host_stats = counters.get(host, {})
+            host_stats['connections'] = connections
+            host_stats['reused'] = max(pooled_requests - connections, 0)
+            result[host] = host_stats
+        return result
+
+    def close(self):
+        """Close all pooled sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
@@ -0,0 +1,182 @@
+import re
+import logging
+
+try:
+    from re import _parser as sre_parse
+    from re import _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+logger = logging.getLogger(__name__)
+
+# Literals shorter than this match almost any input and make a useless prefilter
+MIN_KEYWORD_LENGTH = 2
+
+
+def _required_literals(parsed):
+    """
+    Find a set of literal strings of which at least one must occur in any match
+
+    Args:
+        parsed: Parsed regex sequence (from sre_parse)
+
+    Returns:
+        set: Literal alternatives, or None if no usable literal is guaranteed
+    """
+    candidates = []
+    run = []
+
+    def flush():
+        if run:
+            candidates.append({''.join(run)})
+            run.clear()
+
+    for op, value in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(value))
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            sub = _required_literals(value[-1])
+            if sub:
+                candidates.append(sub)
+        elif op is sre_constants.BRANCH:
+            branches = [_required_literals(branch) for branch in value[1]]
+            if branches and all(branches):
+                candidates.append(set().union(*branches))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            if value[0] >= 1:
+                sub = _required_literals(value[2])
+                if sub:
+                    candidates.append(sub)
+    flush()
+
+    candidates = [
+        lits for lits in candidates
+        if min(len(lit) for lit in lits) >= MIN_KEYWORD_LENGTH
+    ]
+    if not candidates:
+        return None
+    # Prefer the alternative set whose shortest literal is longest (most selective)
+    return max(candidates, key=lambda lits: min(len(lit) for lit in lits))
+
+
+class IntentMatcher:
+    """
+    Compiled intent matching engine
+    All patterns are compiled once. A single keyword scan over the input (one combined
+    alternation of every literal the patterns require) decides which patterns can match
+    at all, so only those are run and inputs without any keyword skip most of the work
+    """
+
+    def __init__(self, intent_patterns):
+        """
+        Args:
+            intent_patterns (dict): Mapping of intent name to list of regex pattern strings
+        """
+        self.intents = list(intent_patterns)
+        self.patterns = {}
+        # intent -> list of (pattern string, compiled regex, required keywords or None)
+        self.compiled = {}
+
+        keywords = set()
+        for intent, patterns in intent_patterns.items():
+            self.patterns[intent] = list(patterns)
+            self.compiled[intent] = []
+            for pattern in patterns:
+                required = _required_literals(sre_parse.parse(pattern))
+                if required is not None:
+                    required = frozenset(required)
+                    keywords |= required
+                self.compiled[intent].append((pattern, re.compile(pattern), required))
+
+        # Lookahead alternation reports the longest keyword starting at every position;
+        # shorter keywords contained in it are recovered through the closure table
+        ordered = sorted(keywords, key=len, reverse=True)
+        self.keyword_re = re.compile('(?=(%s))' % '|'.join(map(re.escape, ordered))) if ordered else None
+        self.keyword_closure = {
+            keyword: frozenset(other for other in keywords if other in keyword)
+            for keyword in ordered
+        }
+
+    def keywords_in(self, text_lower):
+        """
+        Scan the text once for every prefilter keyword
+
+        Args:
+            text_lower (str): Lowercased input text
+
+        Returns:
+            set: Keywords present in the text
+        """
+        present = set()
+        if self.keyword_re is not None:
+            for keyword in self.keyword_re.findall(text_lower):
+                present |= self.keyword_closure[keyword]
+        return present
+
+    def _matches(self, text_lower, intent, present):
+        """Yield the patterns of an intent that pass the prefilter and match"""
+        for pattern, regex, required in self.compiled[intent]:
+            if required is not None and required.isdisjoint(present):
+                continue
+            if regex.search(text_lower):
+                yield pattern
+
+    def scores(self, text):
+        """
+        Score every intent for the given text
+
+        The score of an intent is its share of all matched patterns, so scores of the
+        matching intents sum to 1 and non-matching intents score 0
+
+        Args:
+            text (str): User input text
+
+        Returns:
+            dict: Intent name to score
+        """
+        text_lower = text.lower()
+        present = self.keywords_in(text_lower)
+        hits = {
+            intent: sum(1 for _ in self._matches(text_lower, intent, present))
+            for intent in self.intents
+        }
+
+        total = sum(hits.values())
+        if not total:
+            return dict.fromkeys(self.intents, 0.0)
+        return {intent: count / total for intent, count in hits.items()}
+
+    def rank(self, text):
+        """
+        Rank matching intents by score
+
+        Args:
+            text (str): User input text
+
+        Returns:
+            list: (intent, score) tuples, best first; ties keep declaration order
+        """
+        scores = self.scores(text)
+        ranked = [(intent, score) for intent, score in scores.items() if score > 0]
+        ranked.sort(key=lambda item: item[1], reverse=True)
+        return ranked
+
+    def first(self, text):
+        """
+        Compatibility mode: first intent in declaration order with any matching pattern
+
+        Args:
+            text (str): User input text
+
+        Returns:
+            tuple: (intent, pattern) or (None, None) if nothing matched
+        """
+        text_lower = text.lower()
+        present = self.keywords_in(text_lower)
+        for intent in self.intents:
+            for pattern in self._matches(text_lower, intent, present):
+                return intent, pattern
+        return None, None
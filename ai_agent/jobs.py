@@ -0,0 +1,231 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    created REAL NOT NULL,
+    finished REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (queue, created);
+"""
+
+# How often a long-poll for a job running in another worker process re-reads its state
+JOB_POLL_INTERVAL = 0.2
+
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit"""
+
+
+class JobStore:
+    """
+    Job state in a local SQLite database (WAL mode)
+    Shared by all gunicorn workers on the host, so a job can be polled from any of
+    them; the job itself runs in the worker that accepted it
+    """
+
+    def __init__(self, path='nova_reminders.db'):
+        """
+        Args:
+            path (str): SQLite database file (may be the reminder database)
+        """
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        """Per-thread (and per-process) connection, since sqlite connections are not shareable"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def add(self, job_id, queue_name):
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, queue, status, created) VALUES (?, ?, ?, ?)',
+                (job_id, queue_name, 'queued', time.time())
+            )
+
+    def update(self, job_id, status, result=None, error=None, finished=None):
+        with self._connection() as conn:
+            conn.execute(
+                'UPDATE jobs SET status = ?, result = ?, error = ?, finished = ? WHERE id = ?',
+                (status, json.dumps(result), error, finished, job_id)
+            )
+
+    def delete(self, job_id):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+    def get(self, job_id, queue_name):
+        """Return a job's state, or None if it is unknown"""
+        row = self._connection().execute(
+            'SELECT * FROM jobs WHERE id = ? AND queue = ?', (job_id, queue_name)
+        ).fetchone()
+        if row is None:
+            return None
+        job = {key: row[key] for key in ('id', 'status', 'error', 'created', 'finished')}
+        job['result'] = json.loads(row['result']) if row['result'] is not None else None
+        return job
+
+    def prune(self, queue_name, finished_before, created_before):
+        """Drop finished jobs and jobs abandoned unfinished (their worker exited) past their cutoffs"""
+        with self._connection() as conn:
+            conn.execute(
+                'DELETE FROM jobs WHERE queue = ? AND '
+                '(finished < ? OR (finished IS NULL AND created < ?))',
+                (queue_name, finished_before, created_before)
+            )
+
+
+class JobQueue:
+    """
+    Bounded background job runner
+    A fixed pool of worker threads drains a bounded queue; callers get a job id
+    immediately and poll (or long-poll) for the result. Job state is kept in a
+    JobStore, so polls may land on any worker process
+    """
+
+    def __init__(self, func, workers=2, max_queue=16, result_ttl=300, name='jobs', store=None, max_age=None):
+        """
+        Args:
+            func (callable): Function run for every job with the submitted arguments
+            workers (int): Number of worker threads (the concurrency limit)
+            max_queue (int): Maximum number of jobs waiting to run
+            result_ttl (float): Seconds finished jobs are kept for polling
+            name (str): Name used for worker threads, logs and to key jobs in the store
+            store (JobStore): Shared job state (nova_reminders.db if omitted)
+            max_age (float): Seconds after which an unfinished job is dropped as abandoned
+                (defaults to 4 * result_ttl)
+        """
+        self.func = func
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self.max_age = max_age or 4 * result_ttl
+        self.name = name
+        self.store = store or JobStore()
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Completion events of jobs running in this process, for fast long-polls
+        self._events = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def _ensure_workers(self):
+        """Start worker threads on first use"""
+        if len(self._threads) >= self.workers:
+            return
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._worker,
+                    name=f'{self.name}-worker-{len(self._threads)}',
+                    daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, *args, **kwargs):
+        """
+        Queue a job
+
+        Returns:
+            str: Job id
+
+        Raises:
+            JobQueueFull: If the queue is at its depth limit
+        """
+        self._ensure_workers()
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        done = threading.Event()
+        self.store.add(job_id, self.name)
+        with self._lock:
+            self._events[job_id] = done
+        try:
+            self._queue.put_nowait((job_id, args, kwargs))
+        except queue.Full:
+            with self._lock:
+                del self._events[job_id]
+            self.store.delete(job_id)
+            raise JobQueueFull(f"{self.name} queue is full")
+        return job_id
+
+    def get(self, job_id, wait=0):
+        """
+        Return the public state of a job, optionally waiting for it to finish
+
+        Args:
+            job_id (str): Job id
+            wait (float): Seconds to wait for completion (long-poll)
+
+        Returns:
+            dict: Job state, or None if the job is unknown or expired
+        """
+        deadline = time.monotonic() + wait
+        job = self.store.get(job_id, self.name)
+        while job is not None and job['finished'] is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            with self._lock:
+                done = self._events.get(job_id)
+            if done is not None:
+                done.wait(remaining)
+            else:
+                # Running in another worker process: re-read until it finishes
+                time.sleep(min(JOB_POLL_INTERVAL, remaining))
+            job = self.store.get(job_id, self.name)
+        return job
+
+    def pending(self):
+        """Number of jobs waiting to run in this process"""
+        return self._queue.qsize()
+
+    def _worker(self):
+        while True:
+            job_id, args, kwargs = self._queue.get()
+            try:
+                self.store.update(job_id, 'running')
+                try:
+                    result = self.func(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"{self.name} job {job_id} failed: {str(e)}")
+                    self.store.update(job_id, 'failed', error=str(e), finished=time.time())
+                else:
+                    self.store.update(job_id, 'done', result=result, finished=time.time())
+            except Exception as e:
+                logger.error(f"{self.name} job {job_id} state could not be stored: {str(e)}")
+            finally:
+                with self._lock:
+                    done = self._events.pop(job_id, None)
+                if done is not None:
+                    done.set()
+                self._queue.task_done()
+
+    def _prune(self):
+        """Drop finished jobs older than the result TTL"""
+        now = time.time()
+        try:
+            self.store.prune(self.name, now - self.result_ttl, now - self.max_age)
+        except Exception as e:
+            logger.error(f"Failed to prune {self.name} jobs: {str(e)}")
@@ -0,0 +1,176 @@
+import atexit
+import contextvars
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+
+_request_id = contextvars.ContextVar('nova_request_id', default=None)
+# Outside a request (startup, CLI, benchmarks) diagnostics are always logged
+_diagnostics = contextvars.ContextVar('nova_log_diagnostics', default=True)
+
+_sample_rate = 1.0
+_listener = None
+
+# LogRecord attributes that are not user-supplied extras
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+
+def begin_request(request_id=None):
+    """
+    Bind a request id to the current context and decide whether its diagnostics are logged
+
+    Args:
+        request_id (str): Incoming id (e.g. X-Request-Id), or None to generate one
+
+    Returns:
+        tuple: Tokens to pass to end_request
+    """
+    request_id = request_id or uuid.uuid4().hex[:16]
+    sampled = _sample_rate >= 1 or random.random() < _sample_rate
+    return _request_id.set(request_id), _diagnostics.set(sampled)
+
+
+def end_request(tokens):
+    """Restore the context saved by begin_request"""
+    id_token, diagnostics_token = tokens
+    _request_id.reset(id_token)
+    _diagnostics.reset(diagnostics_token)
+
+
+def current_request_id():
+    return _request_id.get()
+
+
+def diagnostics_enabled():
+    """
+    Whether verbose per-request diagnostics should be logged
+
+    Guard expensive debug logs with this so unsampled requests skip building them entirely
+    """
+    return _diagnostics.get()
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamps records with the request id of the context that logged them"""
+
+    def filter(self, record):
+        record.request_id = _request_id.get() or '-'
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request id and any extras"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that never blocks the logging thread
+    Records are handed over unformatted (message arguments are merged on the listener
+    thread) and dropped, with a count, when the queue is full
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Same-process queue: no need to pre-format or strip the record for pickling
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level=None, fmt=None, use_queue=None, queue_size=None, sample_rate=None):
+    """
+    Configure root logging for the application
+
+    Args:
+        level (str): Log level (NOVA_LOG_LEVEL, default INFO)
+        fmt (str): 'text' or 'json' (NOVA_LOG_FORMAT, default text)
+        use_queue (bool): Write through a background thread (NOVA_LOG_QUEUE, default on)
+        queue_size (int): Records buffered before new ones are dropped (NOVA_LOG_QUEUE_SIZE)
+        sample_rate (float): Share of requests whose diagnostics are logged (NOVA_LOG_SAMPLE_RATE)
+
+    Returns:
+        logging.Handler: Handler installed on the root logger
+    """
+    global _sample_rate, _listener
+
+    level = level or os.getenv('NOVA_LOG_LEVEL', 'INFO')
+    fmt = fmt or os.getenv('NOVA_LOG_FORMAT', 'text')
+    if use_queue is None:
+        use_queue = os.getenv('NOVA_LOG_QUEUE', 'true').lower() in ('1', 'true', 'yes')
+    queue_size = queue_size or int(os.getenv('NOVA_LOG_QUEUE_SIZE', 10000))
+    _sample_rate = float(os.getenv('NOVA_LOG_SAMPLE_RATE', 1.0)) if sample_rate is None else sample_rate
+
+    output = logging.StreamHandler(sys.stderr)
+    if fmt == 'json':
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter('%(levelname)s:%(name)s:[%(request_id)s] %(message)s'))
+
+    stop_listener()
+    handler = output
+    if use_queue:
+        handler = DroppingQueueHandler(queue.Queue(maxsize=queue_size))
+        _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+        _listener.start()
+    handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+    return handler
+
+
+def stop_listener():
+    """Flush queued records and stop the background writer, if one is running"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def restart_after_fork():
+    """Give a forked child process its own log queue and writer thread (threads don't survive fork)"""
+    global _listener
+    if _listener is None:
+        return
+    outputs = _listener.handlers
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, DroppingQueueHandler):
+            # Records still queued belong to the parent, which writes them itself
+            handler.queue = queue.Queue(maxsize=handler.queue.maxsize)
+            _listener = logging.handlers.QueueListener(handler.queue, *outputs, respect_handler_level=True)
+            _listener.start()
+
+
+atexit.register(stop_listener)
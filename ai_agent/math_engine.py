@@ -0,0 +1,187 @@
+import ast
+import logging
+import math
+import operator
+import re
+import time
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Word operators understood in spoken/typed math, applied in order
+WORD_OPERATORS = [
+    (re.compile(r'\bmultiplied\s+by\b'), '*'),
+    (re.compile(r'\bdivided\s+by\b'), '/'),
+    (re.compile(r'\bto\s+the\s+power\s+of\b'), '**'),
+    (re.compile(r'\bplus\b'), '+'),
+    (re.compile(r'\bminus\b'), '-'),
+    (re.compile(r'\btimes\b'), '*'),
+    (re.compile(r'(?<=\d)\s*x\s*(?=[\d(])|\bx\b'), '*'),
+    (re.compile(r'\s*\bsquared\b'), '**2'),
+    (re.compile(r'\s*\bcubed\b'), '**3')
+]
+
+# First run of arithmetic characters that contains a number
+EXPRESSION_RE = re.compile(r'[\(\-\+\s]*[\d\.][\d\+\-\*/\(\)\.\s]*')
+
+# An operator between two operands; a lone number is not a calculation
+BINARY_OPERATION_RE = re.compile(r'[\d\.\)]\s*(?:\*\*|[\+\-\*/])\s*[\(\-\+\s]*[\d\.\(]')
+
+# Math the local engine does not understand (left to WolframAlpha); % is ambiguous
+# between percent and modulo
+UNSUPPORTED_MATH_RE = re.compile(
+    r'\b(?:square\s+root|cube\s+root|root|sqrt|percent|percentage|mod|modulo|remainder|power|'
+    r'log|ln|sin|cos|tan|factorial|derivative|integral|pi)\b|[\^%!√]'
+)
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow
+}
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg
+}
+
+
+def to_expression(text):
+    """
+    Turn a sentence such as "what is 5 plus 3 squared" into an arithmetic expression
+
+    Args:
+        text (str): User input text
+
+    Returns:
+        str: Extracted expression, or None if the text is not plain arithmetic (no
+            operator between numbers, or math words the engine does not support)
+    """
+    expression = text.lower()
+    for pattern, symbol in WORD_OPERATORS:
+        expression = pattern.sub(symbol, expression)
+
+    if UNSUPPORTED_MATH_RE.search(expression):
+        return None
+    match = EXPRESSION_RE.search(expression)
+    if not match or not BINARY_OPERATION_RE.search(match.group(0)):
+        return None
+    return match.group(0).strip()
+
+
+class MathError(ValueError):
+    """Raised when an expression is invalid or exceeds the evaluation limits"""
+
+
+class MathEngine:
+    """
+    Bounded arithmetic evaluator
+    Parses expressions once into a whitelisted AST compiled to closures (cached), and
+    enforces limits on input length, node count, exponent size, operand magnitude and
+    evaluation time so no input can pin a worker's CPU
+    """
+
+    def __init__(self, max_length=200, max_nodes=100, max_exponent=1000, max_digits=100,
+                 max_time=0.05, cache_size=1024):
+        """
+        Args:
+            max_length (int): Maximum expression length in characters
+            max_nodes (int): Maximum number of AST nodes
+            max_exponent (int): Maximum absolute value of an exponent
+            max_digits (int): Maximum number of decimal digits of any intermediate value
+            max_time (float): Maximum evaluation time in seconds
+            cache_size (int): Number of compiled expressions kept
+        """
+        self.max_length = max_length
+        self.max_nodes = max_nodes
+        self.max_exponent = max_exponent
+        self.max_digits = max_digits
+        self.max_magnitude = 10 ** max_digits
+        self.max_time = max_time
+        self.compile = lru_cache(maxsize=cache_size)(self._compile)
+
+    def evaluate(self, expression):
+        """
+        Evaluate an arithmetic expression within the configured limits
+
+        Args:
+            expression (str): Arithmetic expression
+
+        Returns:
+            int or float: Result
+
+        Raises:
+            MathError: If the expression is invalid or exceeds a limit
+        """
+        evaluate = self.compile(expression)
+        deadline = time.perf_counter() + self.max_time
+        try:
+            return evaluate(deadline)
+        except ZeroDivisionError:
+            raise MathError("Division by zero")
+        except OverflowError:
+            raise MathError("Result is too large")
+
+    def _compile(self, expression):
+        """Parse and validate an expression into an evaluation closure"""
+        if len(expression) > self.max_length:
+            raise MathError("Expression is too long")
+
+        try:
+            tree = ast.parse(expression, mode='eval')
+        except (SyntaxError, ValueError, RecursionError):
+            raise MathError("Invalid expression")
+
+        if sum(1 for _ in ast.walk(tree)) > self.max_nodes:
+            raise MathError("Expression is too complex")
+
+        return self._compile_node(tree.body)
+
+    def _compile_node(self, node):
+        if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+            value = self._check_magnitude(node.value)
+            return lambda deadline: value
+
+        if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+            apply = UNARY_OPERATORS[type(node.op)]
+            operand = self._compile_node(node.operand)
+            return lambda deadline: apply(operand(deadline))
+
+        if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+            apply = BINARY_OPERATORS[type(node.op)]
+            left = self._compile_node(node.left)
+            right = self._compile_node(node.right)
+            is_pow = isinstance(node.op, ast.Pow)
+
+            def binary(deadline):
+                a = left(deadline)
+                b = right(deadline)
+                if time.perf_counter() > deadline:
+                    raise MathError("Evaluation took too long")
+                if is_pow:
+                    self._check_power(a, b)
+                return self._check_magnitude(apply(a, b))
+
+            return binary
+
+        raise MathError(f"Unsupported element: {node.__class__.__name__}")
+
+    def _check_power(self, base, exponent):
+        """Reject powers whose exponent or result size exceeds the limits before computing them"""
+        if isinstance(exponent, complex) or abs(exponent) > self.max_exponent:
+            raise MathError("Exponent is too large")
+        if base and exponent > 0 and exponent * math.log10(abs(base)) > self.max_digits:
+            raise MathError("Result is too large")
+
+    def _check_magnitude(self, value):
+        if isinstance(value, complex):
+            raise MathError("Complex results are not supported")
+        if isinstance(value, float) and not math.isfinite(value):
+            raise MathError("Result is too large")
+        if abs(value) > self.max_magnitude:
+            raise MathError("Result is too large")
+        return value
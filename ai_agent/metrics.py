@@ -0,0 +1,331 @@
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds, from sub-millisecond regex work to slow outbound calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labelnames=()):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            labelnames (tuple): Names of the labels every sample carries
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add to the counter for the given label values"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current value for the given label values"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        return self._values.get(key, 0)
+
+    def collect(self):
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}'
+
+
+class Histogram:
+    """Distribution of observed values (latencies) in cumulative buckets, optionally split by labels"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            labelnames (tuple): Names of the labels every sample carries
+            buckets (tuple): Increasing upper bounds; +Inf is implied
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        """Record one observation for the given label values"""
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        with self._lock:
+            series = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self._series.items())
+        bounds = self.buckets + (float('inf'),)
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_number(float(bound))}"'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+            yield f'{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}'
+            yield f'{self.name}_count{_format_labels(self.labelnames, key)} {count}'
+
+
+class CallbackGauge:
+    """Gauge whose samples are read from a callback at scrape time"""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help_text, labelnames, callback):
+        """
+        Args:
+            name (str): Metric name
+            help_text (str): Description shown in the exposition
+            labelnames (tuple): Names of the labels every sample carries
+            callback (callable): Returns an iterable of (label values tuple, value)
+        """
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def collect(self):
+        for key, value in self.callback():
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}'
+
+
+class MetricsRegistry:
+    """
+    Process-local collection of metrics rendered in the Prometheus text format
+    Every gunicorn worker keeps its own registry, so a scrape reports the worker that served it
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None and not isinstance(metric, CallbackGauge):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        """Create (or return the already registered) counter"""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Create (or return the already registered) histogram"""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def gauge_callback(self, name, help_text, labelnames, callback):
+        """Register (or replace) a gauge read from a callback at scrape time"""
+        return self._register(CallbackGauge(name, help_text, labelnames, callback))
+
+    def render(self):
+        """
+        Render every metric in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.collect())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'nova_stage_duration_seconds',
+    'Time spent in each processing stage, by detected intent',
+    ('stage', 'intent')
+)
+EXTERNAL_SECONDS = REGISTRY.histogram(
+    'nova_external_call_duration_seconds',
+    'Duration of calls to external services',
+    ('service',)
+)
+EXTERNAL_ERRORS = REGISTRY.counter(
+    'nova_external_call_errors_total',
+    'Calls to external services that raised an error',
+    ('service',)
+)
+HTTP_CLIENT_REQUESTS = REGISTRY.counter(
+    'nova_http_client_requests_total',
+    'Outbound HTTP attempts by host and response status (error for connection failures)',
+    ('host', 'status')
+)
+HTTP_CLIENT_BYTES = REGISTRY.counter(
+    'nova_http_client_response_bytes_total',
+    'Outbound HTTP response body bytes by host',
+    ('host',)
+)
+HTTP_CLIENT_SECONDS = REGISTRY.histogram(
+    'nova_http_client_request_duration_seconds',
+    'Outbound HTTP attempt duration by host',
+    ('host',)
+)
+REQUEST_SECONDS = REGISTRY.histogram(
+    'nova_request_duration_seconds',
+    'Time to produce the response for an API request',
+    ('route', 'method', 'status')
+)
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _cache_samples(field):
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        yield (cache.name,), cache.stats()[field]
+
+
+for _field, _help in (
+    ('hits', 'Cache lookups that found a live entry'),
+    ('misses', 'Cache lookups that found nothing or an expired entry'),
+    ('evictions', 'Entries evicted because the cache was full'),
+    ('size', 'Entries currently cached'),
+    ('hit_ratio', 'Share of lookups that were hits')
+):
+    REGISTRY.gauge_callback(
+        f'nova_cache_{_field}', _help, ('cache',),
+        lambda field=_field: _cache_samples(field)
+    )
+
+
+def track_cache(cache):
+    """Export a TTLCache's statistics under its name"""
+    with _caches_lock:
+        _caches[cache.name] = cache
+
+
+_http_clients = []
+_http_clients_lock = threading.Lock()
+
+
+def _http_client_samples(field):
+    with _http_clients_lock:
+        clients = list(_http_clients)
+    totals = {}
+    for client in clients:
+        for host, stats in client.stats().items():
+            totals[host] = totals.get(host, 0) + stats.get(field, 0)
+    for host, value in totals.items():
+        yield (host,), value
+
+
+for _field, _help in (
+    ('connections', 'Pooled TCP connections opened to each host'),
+    ('reused', 'Outbound requests sent over an already open pooled connection'),
+    ('retries', 'Outbound requests retried after a transient failure')
+):
+    REGISTRY.gauge_callback(
+        f'nova_http_client_{_field}', _help, ('host',),
+        lambda field=_field: _http_client_samples(field)
+    )
+
+
+def track_http_client(client):
+    """Export an HTTPClient's per-host connection reuse statistics"""
+    with _http_clients_lock:
+        if client not in _http_clients:
+            _http_clients.append(client)
+
+
+class Span:
+    """A running timer; labels can be filled in before the span ends"""
+
+    __slots__ = ('histogram', 'labels', 'start', 'duration', 'errors')
+
+    def __init__(self, histogram, labels, errors=None):
+        self.histogram = histogram
+        self.labels = labels
+        self.errors = errors
+        self.duration = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self.start
+        self.histogram.observe(self.duration, **self.labels)
+        if exc_type is not None and self.errors is not None:
+            self.errors.inc(**self.labels)
+        return False
+
+
+def timed(stage, intent=''):
+    """
+    Time a processing stage into nova_stage_duration_seconds
+
+    Args:
+        stage (str): Stage name, e.g. 'detect_intent' or 'handle_search'
+        intent (str): Intent label; may also be set on the span once known
+
+    Returns:
+        Span: Context manager
+    """
+    return Span(STAGE_SECONDS, {'stage': stage, 'intent': intent})
+
+
+def external_call(service):
+    """
+    Time a call to an external service; an exception leaving the block counts as an error
+
+    Args:
+        service (str): Service name, e.g. 'wolfram' or 'assemblyai'
+
+    Returns:
+        Span: Context manager
+    """
+    return Span(EXTERNAL_SECONDS, {'service': service}, errors=EXTERNAL_ERRORS)
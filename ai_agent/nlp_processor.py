@@ -1,23 +1,69 @@
 import re
+import os
 import logging
+import threading
+
+from .intent_matcher import IntentMatcher
+from .classifier import load_default_classifier
+from .parsing import ParseResult
+from .metrics import timed
+from .logging_utils import diagnostics_enabled
 
 logger = logging.getLogger(__name__)
 
-try:
-    import spacy
-    # Try to load spaCy model
-    try:
-        nlp_spacy = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-        logger.info("spaCy loaded successfully")
-    except OSError:
-        logger.warning("spaCy model 'en_core_web_sm' not found. Run: python -m spacy download en_core_web_sm")
-        SPACY_AVAILABLE = False
-        nlp_spacy = None
-except ImportError:
-    logger.warning("spaCy not installed")
-    SPACY_AVAILABLE = False
-    nlp_spacy = None
+SPACY_MODEL = os.getenv('NOVA_SPACY_MODEL', 'en_core_web_sm')
+
+# Pipeline components each enrichment profile runs (None runs the whole pipeline).
+# In the small English models 'ner' carries its own tok2vec, so it runs without the
+# tagger and parser; the tagger-based components listen to the shared 'tok2vec'
+SPACY_PROFILES = {
+    'tokens': (),
+    'entities': ('ner',),
+    'tags': ('tok2vec', 'tagger', 'attribute_ruler', 'lemmatizer'),
+    'full': None
+}
+
+# Inputs run through the pipeline by warmup() so lazily allocated state exists before serving
+WARMUP_TEXTS = (
+    "Remind me to call Alice tomorrow at 9am",
+    "What is 12 times 7",
+    "Search for the tallest building in Paris"
+)
+
+_spacy_lock = threading.Lock()
+_spacy_model = None
+_spacy_load_attempted = False
+
+
+def load_spacy_model():
+    """
+    Load the spaCy model on first use
+    Components listed in NOVA_SPACY_EXCLUDE (comma separated) are never loaded
+    
+    Returns:
+        Language: Loaded spaCy pipeline, or None if spaCy or the model is unavailable
+    """
+    global _spacy_model, _spacy_load_attempted
+    
+    if _spacy_load_attempted:
+        return _spacy_model
+    
+    with _spacy_lock:
+        if _spacy_load_attempted:
+            return _spacy_model
+        
+        exclude = [name.strip() for name in os.getenv('NOVA_SPACY_EXCLUDE', '').split(',') if name.strip()]
+        try:
+            import spacy
+            _spacy_model = spacy.load(SPACY_MODEL, exclude=exclude)
+            logger.info(f"spaCy loaded successfully (components: {', '.join(_spacy_model.pipe_names)})")
+        except ImportError:
+            logger.warning("spaCy not installed")
+        except OSError:
+            logger.warning(f"spaCy model '{SPACY_MODEL}' not found. Run: python -m spacy download {SPACY_MODEL}")
+        
+        _spacy_load_attempted = True
+        return _spacy_model
 
 class NLPProcessor:
     """
@@ -25,9 +71,30 @@ class NLPProcessor:
     Uses spaCy for text processing and pattern matching for command classification
     """
     
-    def __init__(self):
-        self.spacy_nlp = nlp_spacy
-        self.spacy_available = SPACY_AVAILABLE
+    INTENT_MODES = ('ranked', 'first')
+    
+    # 'off' never runs spaCy, 'lazy' runs only the profile needed for intents whose
+    # handlers consume entities, 'always' analyses every input with the full pipeline
+    ENRICHMENT_MODES = ('off', 'lazy', 'always')
+    
+    def __init__(self, intent_mode=None, enrichment=None, entity_intents=None):
+        # 'ranked' picks the best-scoring intent, 'first' keeps the original
+        # first-match-in-declaration-order behavior
+        self.intent_mode = intent_mode or os.getenv('NOVA_INTENT_MODE', 'ranked')
+        if self.intent_mode not in self.INTENT_MODES:
+            logger.warning(f"Unknown intent mode '{self.intent_mode}', using 'ranked'")
+            self.intent_mode = 'ranked'
+        
+        self.enrichment = enrichment or os.getenv('NOVA_NLP_ENRICHMENT', 'lazy')
+        if self.enrichment not in self.ENRICHMENT_MODES:
+            logger.warning(f"Unknown NLP enrichment mode '{self.enrichment}', using 'lazy'")
+            self.enrichment = 'lazy'
+        
+        # Intents whose handlers use spaCy entities, and the profile they need
+        if entity_intents is None:
+            entity_intents = os.getenv('NOVA_SPACY_INTENTS', 'reminder').split(',')
+        self.entity_intents = {name.strip() for name in entity_intents if name.strip()}
+        self.entity_profile = os.getenv('NOVA_SPACY_PROFILE', 'entities')
         
         # Define intent patterns with improved natural language understanding
         self.intent_patterns = {
@@ -57,7 +124,7 @@ class NLPProcessor:
                 r'\d+\s*[\+\-\*/]\s*\d+',
                 r'\bmathematical\b',
                 r'\bequals?\b',
-                r'\bplus|minus|times|divided|multiply|divide|add|subtract\b',
+                r'\b(?:plus|minus|times|divided|multiply|divide|add|subtract)\b',
                 r'\bsum\s+of\b',
                 r'\bdifference\s+between\b',
                 r'\bproduct\s+of\b',
@@ -87,8 +154,8 @@ class NLPProcessor:
             ],
             'weather': [
                 r'\b(weather|temperature|forecast)\b',
-                r'\bhow.*hot|cold|warm\b',
-                r'\braining|sunny|cloudy\b',
+                r'\bhow\b.*\b(hot|cold|warm)\b',
+                r'\b(raining|sunny|cloudy)\b',
                 r'\bclimate\b',
                 r'\bwhat.*weather\b'
             ],
@@ -108,38 +175,117 @@ class NLPProcessor:
                 r'\bwhat\s+do\s+you\s+do\b'
             ]
         }
+        
+        # Compile all patterns once into the intent matching engine
+        self.intent_matcher = IntentMatcher(self.intent_patterns)
+        
+        # Optional second stage: hashed n-gram classifier. Alone it must reach the
+        # threshold to name an intent; with regex hits its probabilities are added
+        # to the regex scores with the given weight (ties and disagreements)
+        self.classifier = load_default_classifier()
+        self.classifier_threshold = float(os.getenv('NOVA_CLASSIFIER_THRESHOLD', 0.5))
+        self.classifier_weight = float(os.getenv('NOVA_CLASSIFIER_WEIGHT', 0.5))
+    
+    def warmup(self):
+        """Load the spaCy model and run the request path on sample inputs ahead of the first request"""
+        profiles = {'full'} if self.enrichment == 'always' else {self.entity_profile}
+        for text in WARMUP_TEXTS:
+            self.parse(text).entities
+            if self.enrichment != 'off':
+                for profile in profiles:
+                    self.preprocess_text_with_spacy(text, profile=profile)
+    
+    @property
+    def spacy_nlp(self):
+        """spaCy pipeline, loaded on first access"""
+        if self.enrichment == 'off':
+            return None
+        return load_spacy_model()
+    
+    @property
+    def spacy_available(self):
+        return self.spacy_nlp is not None
+    
+    def wants_entities(self, intent):
+        """Whether spaCy entities should be computed for this intent"""
+        if self.enrichment == 'always':
+            return True
+        return self.enrichment == 'lazy' and intent in self.entity_intents
+    
+    def _disabled_components(self, nlp, profile):
+        """Names of pipeline components the given profile does not need"""
+        components = SPACY_PROFILES.get(profile)
+        if components is None:
+            return []
+        return [name for name in nlp.pipe_names if name not in components]
+    
+    @staticmethod
+    def _doc_info(doc):
+        """Convert a spaCy Doc into the plain dict handed to callers"""
+        return {
+            'tokens': [token.text for token in doc],
+            'lemmas': [token.lemma_ for token in doc],
+            'pos_tags': [token.pos_ for token in doc],
+            'entities': [(ent.text, ent.label_) for ent in doc.ents],
+            'noun_chunks': [chunk.text for chunk in doc.noun_chunks] if doc.has_annotation('DEP') else []
+        }
     
-    def preprocess_text_with_spacy(self, text):
+    def preprocess_text_with_spacy(self, text, profile='full'):
         """
         Preprocess text using spaCy for better understanding
         
         Args:
             text (str): Input text
+            profile (str): Component profile from SPACY_PROFILES
             
         Returns:
             dict: Processed text information including tokens, lemmas, entities, POS tags
         """
-        if not self.spacy_available or not self.spacy_nlp:
+        nlp = self.spacy_nlp
+        if not nlp:
             return None
         
         try:
-            doc = self.spacy_nlp(text)
-            
-            return {
-                'tokens': [token.text for token in doc],
-                'lemmas': [token.lemma_ for token in doc],
-                'pos_tags': [token.pos_ for token in doc],
-                'entities': [(ent.text, ent.label_) for ent in doc.ents],
-                'noun_chunks': [chunk.text for chunk in doc.noun_chunks]
-            }
+            with timed(f'spacy_{profile}'):
+                doc = nlp(text, disable=self._disabled_components(nlp, profile))
+            return self._doc_info(doc)
         except Exception as e:
             logger.error(f"spaCy preprocessing error: {str(e)}")
             return None
     
+    def preprocess_batch_with_spacy(self, texts, profile='full', batch_size=64, n_process=1):
+        """
+        Preprocess many texts at once using spaCy's batched nlp.pipe
+        
+        Args:
+            texts (list): Input texts
+            profile (str): Component profile from SPACY_PROFILES
+            batch_size (int): Number of texts spaCy buffers per batch
+            n_process (int): Number of spaCy worker processes
+            
+        Returns:
+            list: One processed-info dict (or None) per input text, in order
+        """
+        nlp = self.spacy_nlp
+        if not nlp or not texts:
+            return [None] * len(texts)
+        
+        try:
+            docs = nlp.pipe(
+                texts,
+                batch_size=batch_size,
+                n_process=n_process,
+                disable=self._disabled_components(nlp, profile)
+            )
+            return [self._doc_info(doc) for doc in docs]
+        except Exception as e:
+            logger.error(f"spaCy batch preprocessing error: {str(e)}")
+            return [None] * len(texts)
+    
     def detect_intent(self, text):
         """
-        Detect the intent from user input text using pattern matching
-        Enhanced with spaCy text processing when available
+        Detect the intent from user input text using pattern matching, combined
+        with the intent classifier when a model is loaded
         
         Args:
             text (str): User input text
@@ -147,26 +293,160 @@ class NLPProcessor:
         Returns:
             str: Detected intent
         """
-        # Use spaCy for text preprocessing if available
-        if self.spacy_available:
-            spacy_info = self.preprocess_text_with_spacy(text)
-            if spacy_info:
-                logger.info(f"spaCy analysis - Entities: {spacy_info['entities']}, POS: {spacy_info['pos_tags']}")
+        # Full spaCy analysis is only logged in 'always' mode; intent matching never needs it
+        if self.enrichment == 'always':
+            self._analyze_always(text)
+        return self._detect(text)[0]
+    
+    def parse(self, text, probabilities=None):
+        """
+        Analyse a user input once for the whole request: intent, scores, spaCy annotations
+        (only when the intent's handler uses entities) and, on demand, the handler's slots
+        
+        Args:
+            text (str): User input text
+            probabilities (dict): Classifier output for the text, if already computed
+            
+        Returns:
+            ParseResult: Parsed input for CommandHandler.handle_command
+        """
+        spacy_info = self._analyze_always(text) if self.enrichment == 'always' else None
+        intent, scores, probabilities = self._detect(text, probabilities)
+        if spacy_info is None and self.wants_entities(intent):
+            spacy_info = self.preprocess_text_with_spacy(text, profile=self.entity_profile)
+            if spacy_info and spacy_info['entities'] and diagnostics_enabled():
+                logger.info("spaCy extracted entities: %s", spacy_info['entities'])
+        return ParseResult(text, intent, scores=scores, probabilities=probabilities, spacy=spacy_info)
+    
+    def parse_batch(self, texts, batch_size=64, n_process=1):
+        """
+        Parse many texts; the classifier scores them all at once and spaCy runs once,
+        batched through nlp.pipe, over only the texts whose intent needs it
+        
+        Args:
+            texts (list): User input texts
+            batch_size (int): spaCy batch size
+            n_process (int): Number of spaCy worker processes
+            
+        Returns:
+            list: ParseResult objects, in input order
+        """
+        batch = [None] * len(texts)
+        if self.classifier is not None and texts:
+            with timed('classify_batch'):
+                batch = self.classifier.predict_batch(texts)
         
-        text_lower = text.lower()
+        results = []
+        for text, probabilities in zip(texts, batch):
+            intent, scores, probabilities = self._detect(text, probabilities)
+            results.append(ParseResult(text, intent, scores=scores, probabilities=probabilities))
         
-        # Check each intent pattern
-        for intent, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, text_lower):
-                    logger.info(f"Matched intent '{intent}' with pattern '{pattern}'")
-                    return intent
+        needs_spacy = [parsed for parsed in results if self.wants_entities(parsed.intent)]
+        if needs_spacy:
+            profile = 'full' if self.enrichment == 'always' else self.entity_profile
+            infos = self.preprocess_batch_with_spacy(
+                [parsed.text for parsed in needs_spacy],
+                profile=profile,
+                batch_size=batch_size,
+                n_process=n_process
+            )
+            for parsed, info in zip(needs_spacy, infos):
+                parsed.spacy = info
+        return results
+    
+    def _analyze_always(self, text):
+        """Full spaCy analysis of 'always' enrichment mode"""
+        spacy_info = self.preprocess_text_with_spacy(text)
+        if spacy_info and diagnostics_enabled():
+            logger.info("spaCy analysis - Entities: %s, POS: %s", spacy_info['entities'], spacy_info['pos_tags'])
+        return spacy_info
+    
+    def _detect(self, text, probabilities=None):
+        """Timed intent matching; returns (intent, regex scores, classifier probabilities)"""
+        with timed('detect_intent') as span:
+            result = self._match_intent(text, probabilities)
+            span.labels['intent'] = result[0]
+        return result
+    
+    def _match_intent(self, text, probabilities=None):
+        """
+        Run the intent matcher and the classifier
+        
+        Args:
+            text (str): User input text
+            probabilities (dict): Classifier output for the text, if already computed
+            
+        Returns:
+            tuple: (intent, regex scores or None, classifier probabilities or None)
+        """
+        scores = None
+        if self.intent_mode == 'first':
+            intent, pattern = self.intent_matcher.first(text)
+            if intent:
+                if diagnostics_enabled():
+                    logger.info("Matched intent '%s' with pattern '%s'", intent, pattern)
+                return intent, scores, probabilities
+        else:
+            scores = self.intent_matcher.scores(text)
+            matched = [intent for intent, score in scores.items() if score > 0]
+            # A single matching intent scores 1 and the classifier (at most weight * 1)
+            # cannot overturn it, so it only runs for misses and ties
+            if matched and (self.classifier is None or (len(matched) == 1 and self.classifier_weight < 1)):
+                intent = max(matched, key=scores.get)
+                if diagnostics_enabled():
+                    logger.info("Matched intent '%s' with score %.2f", intent, scores[intent])
+                return intent, scores, probabilities
+        
+        if self.classifier is not None:
+            if probabilities is None:
+                probabilities = self.classifier.predict(text)
+            intent, score = self._combine_scores(scores, probabilities)
+            if intent:
+                if diagnostics_enabled():
+                    logger.info("Classified intent '%s' with score %.2f", intent, score)
+                return intent, scores, probabilities
         
         # Default to unknown if no pattern matches
         logger.info("No intent matched, defaulting to 'unknown'")
-        return 'unknown'
+        return 'unknown', scores, probabilities
+    
+    def _combine_scores(self, scores, probabilities):
+        """
+        Combine regex scores with classifier probabilities
+        
+        Args:
+            scores (dict): Regex scores per intent (None or all zero when no pattern matched)
+            probabilities (dict): Classifier probability per label
+            
+        Returns:
+            tuple: (intent, score), or (None, 0.0) when neither stage is confident
+        """
+        if not scores or not any(scores.values()):
+            label = max(probabilities, key=probabilities.get)
+            if label != 'unknown' and probabilities[label] >= self.classifier_threshold:
+                return label, probabilities[label]
+            return None, 0.0
+        
+        combined = {
+            intent: score + self.classifier_weight * probabilities.get(intent, 0.0)
+            for intent, score in scores.items()
+        }
+        intent = max(combined, key=combined.get)
+        return intent, combined[intent]
     
-    def extract_entities(self, text, intent):
+    def rank_intents(self, text):
+        """
+        Score the text against every intent
+        
+        Args:
+            text (str): User input text
+            
+        Returns:
+            list: (intent, score) tuples sorted best first, empty if nothing matched
+        """
+        return self.intent_matcher.rank(text)
+    
+    def extract_entities(self, text, intent, spacy_info=None):
         """
         Extract entities from text based on intent
         Uses spaCy for enhanced entity recognition when available
@@ -174,59 +454,31 @@ class NLPProcessor:
         Args:
             text (str): User input text
             intent (str): Detected intent
+            spacy_info (dict): Already computed spaCy analysis of the text, if any
             
         Returns:
             dict: Extracted entities
         """
-        entities = {}
-        
-        # Use spaCy for entity extraction if available
-        if self.spacy_available:
-            spacy_info = self.preprocess_text_with_spacy(text)
-            if spacy_info and spacy_info['entities']:
-                entities['spacy_entities'] = spacy_info['entities']
-                logger.info(f"spaCy extracted entities: {spacy_info['entities']}")
-        
-        if intent == 'math':
-            # Extract mathematical expression
-            math_match = re.search(r'[\d\+\-\*/\(\)\.\s]+', text)
-            if math_match:
-                entities['expression'] = math_match.group(0).strip()
-        
-        elif intent == 'search':
-            # Extract search query
-            search_patterns = [
-                r'(?:search|find|google|look\s+(?:up|for))\s+(.+)',
-                r'tell\s+me\s+about\s+(.+)',
-                r'what\s+is\s+(.+)',
-                r'latest\s+(?:news|info)\s+(?:on|about)\s+(.+)'
-            ]
-            for pattern in search_patterns:
-                match = re.search(pattern, text.lower())
-                if match:
-                    entities['query'] = match.group(1).strip()
-                    break
-            
-            # If no pattern matched, use the whole text as query
-            if 'query' not in entities:
-                entities['query'] = text
-        
-        elif intent == 'reminder':
-            # Extract reminder text
-            reminder_patterns = [
-                r'(?:remind|reminder)\s+(?:me\s+)?(?:to\s+)?(?:about\s+)?(.+)',
-                r'set\s+(?:a\s+)?reminder\s+(?:for\s+)?(.+)',
-                r'don\'t\s+forget\s+(?:to\s+)?(.+)'
-            ]
-            for pattern in reminder_patterns:
-                match = re.search(pattern, text.lower())
-                if match:
-                    entities['reminder_text'] = match.group(1).strip()
-                    break
-            
-            # Extract time if present
-            time_match = re.search(r'(\d{1,2})\s*(?::|\.)\s*(\d{2})\s*(am|pm)?', text.lower())
-            if time_match:
-                entities['time'] = time_match.group(0)
+        # Use spaCy for entity extraction only when this intent's handler consumes entities
+        if not self.wants_entities(intent):
+            spacy_info = None
+        elif spacy_info is None:
+            spacy_info = self.preprocess_text_with_spacy(text, profile=self.entity_profile)
+        return ParseResult(text, intent, spacy=spacy_info).entities
+    
+    def analyze_batch(self, texts, batch_size=64, n_process=1):
+        """
+        Detect intents and extract entities for many texts (see parse_batch)
         
-        return entities
+        Args:
+            texts (list): User input texts
+            batch_size (int): spaCy batch size
+            n_process (int): Number of spaCy worker processes
+            
+        Returns:
+            list: (intent, entities) tuples, in input order
+        """
+        return [
+            (parsed.intent, parsed.entities)
+            for parsed in self.parse_batch(texts, batch_size=batch_size, n_process=n_process)
+        ]
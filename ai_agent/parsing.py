@@ -0,0 +1,120 @@
+import re
+from functools import cached_property
+
+from .math_engine import to_expression
+from .time_parser import parse_time_expression
+
+SEARCH_QUERY_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(?:search|find|google|look\s+(?:up|for)|show\s+me)\s+(.+)',
+    r'tell\s+me\s+(?:about|more\s+about)\s+(.+)',
+    r'what\s+(?:is|are|was|were)\s+(.+)',
+    r'who\s+(?:is|are|was|were)\s+(.+)',
+    r'where\s+(?:is|are|can\s+i\s+find)\s+(.+)',
+    r'when\s+(?:is|are|did|was)\s+(.+)',
+    r'how\s+to\s+(.+)',
+    r'latest\s+(?:news|info|information|updates?)\s+(?:on|about)?\s*(.+)',
+    r'information\s+(?:about|on)\s+(.+)',
+    r'details\s+(?:about|on)\s+(.+)',
+    r'explain\s+(.+)'
+]]
+
+REMINDER_TEXT_PATTERNS = [re.compile(pattern) for pattern in [
+    r'(?:remind|reminder)\s+(?:me\s+)?(?:to\s+)?(?:about\s+)?(.+)',
+    r'set\s+(?:a\s+)?reminder\s+(?:for\s+)?(.+)',
+    r'don\'t\s+forget\s+(?:to\s+)?(.+)'
+]]
+
+# spaCy entity labels used as hints for the reminder time
+TIME_ENTITY_LABELS = ('DATE', 'TIME')
+
+
+def _first_group(patterns, text):
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+class ParseResult:
+    """
+    Everything known about one user input, computed at most once per request
+    NLPProcessor.parse fills in the intent, its scores and spaCy annotations; the
+    slots handlers need (search query, math expression, reminder text and time)
+    are extracted on first access and then reused
+    """
+
+    def __init__(self, text, intent=None, scores=None, probabilities=None, spacy=None):
+        """
+        Args:
+            text (str): Original user input
+            intent (str): Detected intent
+            scores (dict): Regex score per intent (None when not computed)
+            probabilities (dict): Intent classifier probability per label (None when not consulted)
+            spacy (dict): spaCy analysis (see NLPProcessor.preprocess_text_with_spacy), if run
+        """
+        self.text = text
+        self.lower = text.lower()
+        self.intent = intent
+        self.scores = scores
+        self.probabilities = probabilities
+        self.spacy = spacy
+
+    @classmethod
+    def coerce(cls, value, intent=None):
+        """Accept a ParseResult or raw user input text (for callers that have not parsed it)"""
+        if isinstance(value, cls):
+            return value
+        return cls(value, intent=intent)
+
+    @cached_property
+    def query(self):
+        """Search query: the subject of the request, or the whole input"""
+        return _first_group(SEARCH_QUERY_PATTERNS, self.lower) or self.text
+
+    @cached_property
+    def expression(self):
+        """Arithmetic expression with word operators turned into symbols, or None"""
+        return to_expression(self.lower)
+
+    @cached_property
+    def time(self):
+        """Due time of a reminder (TimeExpression), using spaCy DATE/TIME entities as hints"""
+        hints = [
+            entity_text for entity_text, label in (self.spacy or {}).get('entities', [])
+            if label in TIME_ENTITY_LABELS
+        ]
+        return parse_time_expression(self.text, hints=hints)
+
+    @cached_property
+    def reminder_text(self):
+        """What to be reminded of: the input without its time phrase and request wording"""
+        text = self.time.strip_from(self.text) if self.time else self.text
+        return _first_group(REMINDER_TEXT_PATTERNS, text.lower()) or text
+
+    @property
+    def entities(self):
+        """
+        Slots of the detected intent, as returned by NLPProcessor.extract_entities
+
+        Returns:
+            dict: Extracted entities
+        """
+        entities = {}
+        if self.spacy and self.spacy['entities']:
+            entities['spacy_entities'] = self.spacy['entities']
+
+        if self.intent == 'math':
+            if self.expression:
+                entities['expression'] = self.expression
+        elif self.intent == 'search':
+            entities['query'] = self.query
+        elif self.intent == 'reminder':
+            if self.time:
+                entities['time'] = self.time.text
+                entities['due_at'] = self.time.timestamp
+            entities['reminder_text'] = self.reminder_text
+        return entities
+
+    def __repr__(self):
+        return f"ParseResult({self.text!r}, intent={self.intent!r})"
@@ -0,0 +1,264 @@
+import heapq
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    text TEXT NOT NULL,
+    time_text TEXT,
+    due_at REAL,
+    created_at REAL NOT NULL,
+    fired_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_reminders_owner ON reminders (owner, id);
+CREATE INDEX IF NOT EXISTS idx_reminders_pending_due ON reminders (due_at) WHERE fired_at IS NULL;
+"""
+
+COLUMNS = ('id', 'owner', 'text', 'time_text', 'due_at', 'created_at', 'fired_at')
+
+
+class ReminderStore:
+    """
+    Reminders persisted in a local SQLite database (WAL mode)
+    Indexed by owner for listing and by due time for scheduling; safe to share
+    between threads and gunicorn workers on the same host
+    """
+
+    def __init__(self, path='nova_reminders.db'):
+        """
+        Args:
+            path (str): SQLite database file
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connection(self):
+        """Per-thread (and per-process) connection, since sqlite connections are not shareable"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _to_dict(row):
+        if row is None:
+            return None
+        reminder = {column: row[column] for column in COLUMNS}
+        reminder['fired'] = reminder['fired_at'] is not None
+        return reminder
+
+    def add(self, owner, text, due_at=None, time_text=None):
+        """
+        Store a new reminder
+
+        Args:
+            owner (str): Client the reminder belongs to
+            text (str): What to remind about
+            due_at (float): Due time as a UTC epoch timestamp, or None if unscheduled
+            time_text (str): Time expression as the user wrote it
+
+        Returns:
+            dict: Stored reminder
+        """
+        created_at = time.time()
+        with self._connection() as conn:
+            cursor = conn.execute(
+                'INSERT INTO reminders (owner, text, time_text, due_at, created_at) VALUES (?, ?, ?, ?, ?)',
+                (owner, text, time_text, due_at, created_at)
+            )
+        return {
+            'id': cursor.lastrowid, 'owner': owner, 'text': text, 'time_text': time_text,
+            'due_at': due_at, 'created_at': created_at, 'fired_at': None, 'fired': False
+        }
+
+    def get(self, reminder_id):
+        """Return one reminder by id, or None"""
+        row = self._connection().execute(
+            'SELECT * FROM reminders WHERE id = ?', (reminder_id,)
+        ).fetchone()
+        return self._to_dict(row)
+
+    def list(self, owner, limit=20, cursor=None, status='all', fired_since=None):
+        """
+        List an owner's reminders, newest first, with keyset pagination
+
+        Args:
+            owner (str): Client the reminders belong to
+            limit (int): Page size
+            cursor (int): Return reminders with ids below this (the previous page's next_cursor)
+            status (str): 'all', 'pending' or 'fired'
+            fired_since (float): Only reminders fired after this UTC epoch timestamp
+
+        Returns:
+            tuple: (reminders, next_cursor) where next_cursor is None on the last page
+        """
+        query = 'SELECT * FROM reminders WHERE owner = ?'
+        params = [owner]
+        if cursor is not None:
+            query += ' AND id < ?'
+            params.append(cursor)
+        if status == 'pending':
+            query += ' AND fired_at IS NULL'
+        elif status == 'fired':
+            query += ' AND fired_at IS NOT NULL'
+        if fired_since is not None:
+            query += ' AND fired_at > ?'
+            params.append(fired_since)
+        query += ' ORDER BY id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        rows = self._connection().execute(query, params).fetchall()
+        reminders = [self._to_dict(row) for row in rows[:limit]]
+        next_cursor = reminders[-1]['id'] if len(rows) > limit else None
+        return reminders, next_cursor
+
+    def delete(self, owner, reminder_id):
+        """
+        Delete one of an owner's reminders
+
+        Returns:
+            bool: True if a reminder was deleted
+        """
+        with self._connection() as conn:
+            cursor = conn.execute('DELETE FROM reminders WHERE id = ? AND owner = ?', (reminder_id, owner))
+        return cursor.rowcount > 0
+
+    def pending_until(self, until, limit=10000):
+        """
+        Unfired reminders due before a given time, earliest first
+
+        Args:
+            until (float): UTC epoch timestamp
+            limit (int): Maximum number of reminders returned
+
+        Returns:
+            list: (due_at, id) tuples
+        """
+        rows = self._connection().execute(
+            'SELECT due_at, id FROM reminders WHERE fired_at IS NULL AND due_at IS NOT NULL AND due_at <= ? '
+            'ORDER BY due_at LIMIT ?',
+            (until, limit)
+        ).fetchall()
+        return [(row['due_at'], row['id']) for row in rows]
+
+    def claim(self, reminder_id):
+        """
+        Atomically mark a reminder as fired
+
+        Only one caller (thread or worker process) can claim a reminder, so each
+        reminder fires exactly once even with several schedulers running
+
+        Returns:
+            dict: The claimed reminder, or None if it was deleted or already fired
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(
+                'UPDATE reminders SET fired_at = ? WHERE id = ? AND fired_at IS NULL',
+                (time.time(), reminder_id)
+            )
+        if cursor.rowcount == 0:
+            return None
+        return self.get(reminder_id)
+
+
+class ReminderScheduler:
+    """
+    Fires due reminders from a min-heap ordered by due time
+    Scheduling and firing are O(log n). Reminders due within the look-ahead horizon are
+    loaded from the store periodically, so reminders created by other workers or before
+    a restart are picked up too
+    """
+
+    def __init__(self, store, on_fire=None, horizon=3600):
+        """
+        Args:
+            store (ReminderStore): Reminder storage
+            on_fire (callable): Called with the reminder dict when it fires
+            horizon (float): Seconds of upcoming reminders kept in memory
+        """
+        self.store = store
+        self.on_fire = on_fire or self._log_reminder
+        self.horizon = horizon
+        self._heap = []
+        self._scheduled = set()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._loaded_until = 0
+
+    @staticmethod
+    def _log_reminder(reminder):
+        logger.info(f"Reminder due for {reminder['owner']}: {reminder['text']}")
+
+    def start(self):
+        """Start the scheduler thread if it is not running in this process"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='nova-reminders', daemon=True)
+            self._thread.start()
+
+    def schedule(self, reminder_id, due_at):
+        """Add a reminder to the heap if it falls within the loaded window"""
+        with self._condition:
+            if due_at > self._loaded_until or reminder_id in self._scheduled:
+                return
+            heapq.heappush(self._heap, (due_at, reminder_id))
+            self._scheduled.add(reminder_id)
+            if self._heap[0][1] == reminder_id:
+                self._condition.notify()
+
+    def _refresh(self):
+        """Load reminders due within the horizon from the store"""
+        until = time.time() + self.horizon
+        # Widened before querying: a reminder added during the query is either pushed
+        # by schedule() or already committed and returned by the query
+        with self._condition:
+            self._loaded_until = max(self._loaded_until, until)
+        entries = self.store.pending_until(until)
+        with self._condition:
+            for due_at, reminder_id in entries:
+                if reminder_id not in self._scheduled:
+                    heapq.heappush(self._heap, (due_at, reminder_id))
+                    self._scheduled.add(reminder_id)
+
+    def _run(self):
+        next_refresh = 0
+        while True:
+            try:
+                if time.time() >= next_refresh:
+                    self._refresh()
+                    next_refresh = time.time() + self.horizon / 2
+
+                due = []
+                with self._condition:
+                    now = time.time()
+                    while self._heap and self._heap[0][0] <= now:
+                        _, reminder_id = heapq.heappop(self._heap)
+                        self._scheduled.discard(reminder_id)
+                        due.append(reminder_id)
+                    if not due:
+                        wake_at = min(self._heap[0][0], next_refresh) if self._heap else next_refresh
+                        self._condition.wait(max(wake_at - now, 0))
+
+                for reminder_id in due:
+                    # Deleted or already fired (e.g. by another worker) reminders are skipped
+                    reminder = self.store.claim(reminder_id)
+                    if reminder:
+                        self.on_fire(reminder)
+            except Exception as e:
+                logger.error(f"Reminder scheduler error: {str(e)}")
+                time.sleep(1)
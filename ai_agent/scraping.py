@@ -0,0 +1,119 @@
+import codecs
+from collections import namedtuple
+from html.parser import HTMLParser
+
+# Bytes read per chunk from a streamed response
+SCRAPE_CHUNK_BYTES = 16 * 1024
+
+# Pages are not parsed past this size
+SCRAPE_MAX_BYTES = 2 * 1024 * 1024
+
+ExtractionRule = namedtuple('ExtractionRule', ['name', 'tag', 'classes', 'template'])
+ExtractionRule.__doc__ = """
+Declarative snippet selector: the text of the first <tag> element carrying all of
+the given classes, formatted with template (placeholders {query} and {text})
+"""
+
+# Snippets of a Google results page, best first
+GOOGLE_RESULT_RULES = (
+    ExtractionRule('featured_snippet', 'div', 'BNeawe s3v9rd AP7Wnd',
+                   "Here's what I found about '{query}': {text}"),
+    ExtractionRule('first_result', 'div', 'BNeawe vvjwJb AP7Wnd',
+                   "I found this about '{query}': {text}"),
+)
+
+
+class SnippetExtractor(HTMLParser):
+    """
+    Streaming snippet extractor
+    Tokenizes HTML as it is fed without building a tree, collects only the text of
+    elements matching the rules and is done as soon as the best rule matches.
+    A lower-ranked match is kept in case the best rule never matches
+    """
+
+    def __init__(self, rules):
+        """
+        Args:
+            rules (sequence): ExtractionRule objects, best first
+        """
+        super().__init__(convert_charrefs=True)
+        self.rules = [(rule, frozenset(rule.classes.split())) for rule in rules]
+        self.match = None
+        self._match_rank = len(self.rules)
+        # Element being captured: (rank, tag), nesting depth of that tag and its text
+        self._capture = None
+        self._depth = 0
+        self._parts = []
+
+    @property
+    def done(self):
+        return self._match_rank == 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._capture is not None:
+            if tag == self._capture[1]:
+                self._depth += 1
+            return
+
+        classes = None
+        # Only rules ranked above the current match can improve it
+        for rank in range(self._match_rank):
+            rule, wanted = self.rules[rank]
+            if tag != rule.tag:
+                continue
+            if classes is None:
+                classes = frozenset((dict(attrs).get('class') or '').split())
+            if wanted <= classes:
+                self._capture = (rank, tag)
+                self._depth = 1
+                self._parts = []
+                return
+
+    def handle_endtag(self, tag):
+        if self._capture is None or tag != self._capture[1]:
+            return
+        self._depth -= 1
+        if self._depth == 0:
+            rank = self._capture[0]
+            self._capture = None
+            self.match = (self.rules[rank][0], ''.join(self._parts))
+            self._match_rank = rank
+
+    def handle_data(self, data):
+        if self._capture is not None:
+            self._parts.append(data)
+
+
+def extract_snippet(chunks, rules=GOOGLE_RESULT_RULES, encoding=None, max_bytes=SCRAPE_MAX_BYTES):
+    """
+    Extract the best matching snippet from an HTML document
+
+    Args:
+        chunks (iterable): The document as bytes chunks (e.g. response.iter_content()),
+            or a whole str/bytes document, which is fed in chunks all the same
+        rules (sequence): ExtractionRule objects, best first
+        encoding (str): Charset of byte chunks, defaults to UTF-8
+        max_bytes (int): Stop reading after this many bytes
+
+    Returns:
+        tuple: (ExtractionRule, text) of the best match, or None
+    """
+    if isinstance(chunks, (str, bytes)):
+        document = chunks
+        chunks = (document[start:start + SCRAPE_CHUNK_BYTES]
+                  for start in range(0, len(document), SCRAPE_CHUNK_BYTES))
+
+    extractor = SnippetExtractor(rules)
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    size = 0
+    for chunk in chunks:
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        extractor.feed(chunk)
+        size += len(chunk)
+        if extractor.done or size >= max_bytes:
+            break
+    else:
+        extractor.feed(decoder.decode(b'', final=True))
+        extractor.close()
+    return extractor.match
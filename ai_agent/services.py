@@ -0,0 +1,165 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceRegistry:
+    """
+    Builds application services on first use and records how long each took
+    Lets the web process answer requests (e.g. health checks) before heavy
+    components such as spaCy or the TTS engine are loaded
+    """
+
+    # 'eager' builds everything at startup, 'lazy' on first use, 'background'
+    # on first use or in a warmup thread started at boot, whichever comes first
+    STARTUP_MODES = ('eager', 'lazy', 'background')
+
+    def __init__(self):
+        self._factories = {}
+        self._warmups = {}
+        self._instances = {}
+        self._timings = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+        self._fork_safe = set()
+
+    def register(self, name, factory, warmup=None, fork_safe=False):
+        """
+        Register a service
+
+        Args:
+            name (str): Service name
+            factory (callable): Builds the service instance
+            warmup (callable): Called with the instance to preload its engines during warmup
+            fork_safe (bool): Whether an instance built before a fork can be used by the
+                child; services that own threads, executors or native engines are not
+
+        Returns:
+            LazyService: Proxy that builds the service on first attribute access
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._warmups[name] = warmup
+            self._locks[name] = threading.Lock()
+            if fork_safe:
+                self._fork_safe.add(name)
+        return LazyService(self, name)
+
+    def get(self, name):
+        """Return a service instance, building it on first call"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                started = time.perf_counter()
+                instance = self._factories[name]()
+                elapsed = time.perf_counter() - started
+                self._timings[name] = elapsed
+                self._instances[name] = instance
+                logger.info(f"Initialized {name} in {elapsed * 1000:.1f} ms")
+            return instance
+
+    def is_ready(self, name):
+        return name in self._instances
+
+    def warmup(self, names=None):
+        """
+        Build services and run their warmup hooks
+
+        Args:
+            names (list): Services to warm up, defaults to all of them in registration order
+        """
+        started = time.perf_counter()
+        for name in names or list(self._factories):
+            try:
+                instance = self.get(name)
+                warmup = self._warmups.get(name)
+                if warmup is not None:
+                    warmup_started = time.perf_counter()
+                    warmup(instance)
+                    elapsed = time.perf_counter() - warmup_started
+                    self._timings[f'{name}.warmup'] = elapsed
+                    logger.info(f"Warmed up {name} in {elapsed * 1000:.1f} ms")
+            except Exception as e:
+                logger.error(f"Warmup of {name} failed: {str(e)}")
+        logger.info(f"Service warmup finished in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    def warmup_in_background(self, names=None):
+        """Run warmup(names) in a daemon thread (once)"""
+        with self._lock:
+            if self._warmup_thread is not None and self._warmup_thread.is_alive():
+                return self._warmup_thread
+            self._warmup_thread = threading.Thread(
+                target=self.warmup, args=(names,), name='nova-warmup', daemon=True
+            )
+            self._warmup_thread.start()
+            return self._warmup_thread
+
+    def start(self, mode):
+        """
+        Apply a startup mode
+
+        Args:
+            mode (str): One of STARTUP_MODES
+        """
+        if mode not in self.STARTUP_MODES:
+            logger.warning(f"Unknown startup mode '{mode}', using 'background'")
+            mode = 'background'
+        if mode == 'eager':
+            self.warmup()
+        elif mode == 'background':
+            self.warmup_in_background()
+
+    def after_fork(self):
+        """
+        Reset state in a forked child (e.g. a gunicorn worker)
+        Fork-safe instances stay shared copy-on-write with the parent; the others
+        are dropped and rebuilt in the child on first use
+        """
+        self._lock = threading.Lock()
+        self._warmup_thread = None
+        for name in list(self._instances):
+            if name not in self._fork_safe:
+                del self._instances[name]
+                self._timings.pop(name, None)
+                self._timings.pop(f'{name}.warmup', None)
+        self._locks = {name: threading.Lock() for name in self._factories}
+
+    def timings(self):
+        """
+        Initialization and warmup times
+
+        Returns:
+            dict: Service (or 'service.warmup') name to seconds
+        """
+        return dict(self._timings)
+
+    def status(self):
+        """Readiness of every registered service"""
+        return {name: self.is_ready(name) for name in self._factories}
+
+
+class LazyService:
+    """Stand-in for a registered service that forwards attribute access to the real instance"""
+
+    __slots__ = ('_registry', '_name')
+
+    def __init__(self, registry, name):
+        object.__setattr__(self, '_registry', registry)
+        object.__setattr__(self, '_name', name)
+
+    def __getattr__(self, attribute):
+        return getattr(self._registry.get(self._name), attribute)
+
+    def __setattr__(self, attribute, value):
+        setattr(self._registry.get(self._name), attribute, value)
+
+    def __repr__(self):
+        state = 'ready' if self._registry.is_ready(self._name) else 'not initialized'
+        return f"<LazyService {self._name} ({state})>"
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SINGLEFLIGHT_CALLS = REGISTRY.counter(
+    'nova_singleflight_calls_total',
+    'Lookups by role: leaders make the outbound call, followers share its result',
+    ('group', 'role')
+)
+
+
+class SingleFlightTimeout(TimeoutError):
+    """Raised to a caller that gave up waiting for an identical in-flight lookup"""
+
+
+class _Call:
+    """One in-flight lookup: its result and the cancel events of the callers waiting on it"""
+
+    __slots__ = ('future', 'cancel_events')
+
+    def __init__(self):
+        self.future = Future()
+        self.cancel_events = []
+
+
+class FlightCancellation:
+    """
+    Event-like view of an in-flight lookup: is_set() once every caller waiting on
+    it has cancelled. A lookup shared by several requests checks this instead of
+    the leading request's own cancel event
+    """
+
+    __slots__ = ('flights', 'key')
+
+    def __init__(self, flights, key):
+        self.flights = flights
+        self.key = key
+
+    def is_set(self):
+        return self.flights.abandoned(self.key)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent lookups (threaded code)
+    The first caller for a key runs the lookup; callers arriving while it is in
+    flight wait for its result instead of making their own call, and get its
+    exception if it fails. Nothing is kept once the lookup finishes; caching the
+    result is up to the caller
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Group name (the backend) used in metrics and logs
+        """
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, timeout=None, cancel_event=None):
+        """
+        Run func once for all concurrent callers with the same key
+
+        Args:
+            key: Normalized lookup key
+            func (callable): Performs the lookup when this caller leads; it should stop
+                early only when cancellation(key) is set, not on the leader's own cancel event
+            timeout (float): Seconds a follower waits for the leader (None waits until it finishes)
+            cancel_event (threading.Event): Set when this caller no longer wants the result
+
+        Returns:
+            The lookup result
+
+        Raises:
+            SingleFlightTimeout: A follower's timeout passed before the leader finished
+            Exception: Whatever the lookup raised, in the leader and every follower
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            call.cancel_events.append(cancel_event)
+        future = call.future
+
+        if not leader:
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role='follower')
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                # Gone as far as the lookup is concerned
+                with self._lock:
+                    call.cancel_events.remove(cancel_event)
+                raise SingleFlightTimeout(f"Timed out waiting for in-flight {self.name} lookup") from None
+
+        SINGLEFLIGHT_CALLS.inc(group=self.name, role='leader')
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        # Later callers start a new lookup (or hit the caller's cache) from here on
+        with self._lock:
+            del self._calls[key]
+
+    def abandoned(self, key):
+        """Whether every caller waiting on the in-flight lookup for key has cancelled"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                return False
+            return all(event is not None and event.is_set() for event in call.cancel_events)
+
+    def cancellation(self, key):
+        """FlightCancellation for the lookup of key, to use as the lookup's cancel event"""
+        return FlightCancellation(self, key)
+
+    def in_flight(self):
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """
+    Coalesces identical concurrent lookups on an event loop (see SingleFlight)
+    The lookup runs as its own task, so it keeps going for the remaining waiters
+    when the caller that started it times out or disconnects
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): Group name (the backend) used in metrics and logs
+        """
+        self.name = name
+        self._tasks = {}
+
+    async def do(self, key, factory, timeout=None):
+        """
+        Await one lookup shared by all concurrent callers with the same key
+
+        Args:
+            key: Normalized lookup key
+            factory (callable): Returns the lookup coroutine when this caller leads
+            timeout (float): Seconds any caller waits (None waits until it finishes)
+
+        Returns:
+            The lookup result
+
+        Raises:
+            SingleFlightTimeout: The timeout passed before the lookup finished
+            Exception: Whatever the lookup raised, in every caller
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role='leader')
+            task = self._tasks[key] = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            SINGLEFLIGHT_CALLS.inc(group=self.name, role='follower')
+
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            raise SingleFlightTimeout(f"Timed out waiting for in-flight {self.name} lookup") from None
+
+    def _finish(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Every waiter may have given up; retrieve the error so it is not reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug("%s lookup failed: %s", self.name, task.exception())
+
+    def in_flight(self):
+        return len(self._tasks)
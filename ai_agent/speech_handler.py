@@ -1,26 +1,158 @@
 import io
+import hashlib
 import logging
+import shutil
 import tempfile
+import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+from .cache import TTLCache
+from .metrics import external_call, timed, track_cache
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Uploads larger than this are spooled to disk instead of kept in memory
+AUDIO_SPILL_BYTES = int(os.getenv('NOVA_AUDIO_SPILL_BYTES', 10 * 1024 * 1024))
+
+class AudioBuffer:
+    """
+    Audio data held in a single buffer for all transcription backends
+    Bytes stay in memory and seekable upload streams are used in place; anything
+    else is copied once into a spooled file that only touches disk above the
+    spill threshold
+    """
+    
+    def __init__(self, source, filename=None, spill_threshold=None, copy=False):
+        """
+        Args:
+            source: Uploaded file (FileStorage), binary stream, bytes or file path
+            filename (str): Original file name, used to detect the audio format
+            spill_threshold (int): Size in bytes above which data is spooled to disk
+            copy (bool): Copy the data even if the source stream is seekable, so the
+                buffer outlives the request that owns the upload
+        """
+        self.spill_threshold = AUDIO_SPILL_BYTES if spill_threshold is None else spill_threshold
+        self.filename = filename or getattr(source, 'filename', None)
+        self._data = None
+        self._file = None
+        self._owned = False
+        
+        if isinstance(source, AudioBuffer):
+            self.filename = filename or source.filename
+            self._data = source._data
+            self._file = source._file
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            if len(source) <= self.spill_threshold:
+                self._data = bytes(source)
+            else:
+                self._file = self._spool(io.BytesIO(source))
+                self._owned = True
+        elif isinstance(source, (str, os.PathLike)):
+            self.filename = self.filename or os.fspath(source)
+            self._file = open(source, 'rb')
+            self._owned = True
+        else:
+            stream = getattr(source, 'stream', source)
+            if not copy and getattr(stream, 'seekable', lambda: False)():
+                self._file = stream
+            else:
+                self._file = self._spool(stream)
+                self._owned = True
+    
+    def _spool(self, stream):
+        spool = tempfile.SpooledTemporaryFile(max_size=self.spill_threshold)
+        shutil.copyfileobj(stream, spool)
+        return spool
+    
+    @property
+    def extension(self):
+        """File extension of the audio format (defaults to .webm, the browser default)"""
+        name = (self.filename or '').lower()
+        for ext in ('.wav', '.mp3', '.webm'):
+            if name.endswith(ext):
+                return ext
+        return '.webm'
+    
+    def open(self):
+        """
+        Return a binary file object positioned at the start of the audio
+        In-memory data is wrapped without copying
+        """
+        if self._data is not None:
+            return io.BytesIO(self._data)
+        self._file.seek(0)
+        return self._file
+    
+    def close(self):
+        """Release the spooled or opened file, if this buffer owns one"""
+        if self._owned and self._file is not None:
+            self._file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
 class SpeechHandler:
     """
     Handles speech-to-text and text-to-speech functionality
     Uses AssemblyAI for high-accuracy speech recognition
     """
     
+    DEFAULT_TTS_RATE = 175
+    
     def __init__(self):
         self.tts_engine = None
         self.recognizer = None
         self.assemblyai_key = os.getenv('ASSEMBLYAI_API_KEY')
-        self._init_tts()
-        self._init_speech_recognition()
-        self._init_assemblyai()
+        if not self.assemblyai_key:
+            logger.warning("ASSEMBLYAI_API_KEY not found in environment variables")
+        
+        # pyttsx3 engines are not thread-safe: the engine is created and only ever
+        # driven on this single dedicated thread
+        self._tts_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='nova-tts')
+        self.tts_timeout = float(os.getenv('NOVA_TTS_TIMEOUT', 30))
+        
+        # Rendered audio keyed by a hash of text + voice + rate
+        self.tts_cache = TTLCache(
+            maxsize=int(os.getenv('NOVA_TTS_CACHE_SIZE', 128)),
+            ttl=float(os.getenv('NOVA_TTS_CACHE_TTL', 86400)),
+            name='tts'
+        )
+        track_cache(self.tts_cache)
+        
+        # Engines are created on first use (or by warmup), not at construction
+        self._init_lock = threading.Lock()
+        self._tts_initialized = False
+        self._recognizer_initialized = False
+    
+    def warmup(self):
+        """Create the TTS engine and speech recognizer ahead of the first request"""
+        self._ensure_tts()
+        self._ensure_recognizer()
+    
+    def _ensure_tts(self):
+        """Create the TTS engine on its thread once; returns the engine or None"""
+        if not self._tts_initialized:
+            with self._init_lock:
+                if not self._tts_initialized:
+                    self._tts_executor.submit(self._init_tts).result()
+                    self._tts_initialized = True
+        return self.tts_engine
+    
+    def _ensure_recognizer(self):
+        """Create the speech recognizer once; returns it or None"""
+        if not self._recognizer_initialized:
+            with self._init_lock:
+                if not self._recognizer_initialized:
+                    self._init_speech_recognition()
+                    self._recognizer_initialized = True
+        return self.recognizer
     
     def _init_tts(self):
         """Initialize text-to-speech engine"""
@@ -28,7 +160,7 @@ class SpeechHandler:
             import pyttsx3
             self.tts_engine = pyttsx3.init()
             # Set properties
-            self.tts_engine.setProperty('rate', 175)  # Speed of speech
+            self.tts_engine.setProperty('rate', self.DEFAULT_TTS_RATE)  # Speed of speech
             self.tts_engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
             logger.info("Text-to-speech engine initialized")
         except Exception as e:
@@ -45,59 +177,37 @@ class SpeechHandler:
             logger.error(f"Failed to initialize speech recognition: {str(e)}")
             self.recognizer = None
     
-    def _init_assemblyai(self):
-        """Initialize AssemblyAI"""
-        try:
-            import assemblyai as aai
-            self.assemblyai_key = os.getenv('ASSEMBLYAI_API_KEY')
-            if self.assemblyai_key:
-                aai.settings.api_key = self.assemblyai_key
-                logger.info("AssemblyAI initialized successfully")
-            else:
-                logger.warning("ASSEMBLYAI_API_KEY not found in environment variables")
-        except Exception as e:
-            logger.error(f"Failed to initialize AssemblyAI: {str(e)}")
-            self.assemblyai_key = None
-    
     def audio_to_text(self, audio_file):
         """
         Convert audio file to text
         
         Args:
-            audio_file: Audio file object
+            audio_file: Audio file object, AudioBuffer, bytes or path
             
         Returns:
             str: Transcribed text or None
         """
-        if not self.recognizer:
+        if not self._ensure_recognizer():
             logger.error("Speech recognizer not initialized")
             return None
         
         try:
             import speech_recognition as sr
             
-            # Save uploaded file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_audio:
-                audio_file.save(temp_audio.name)
-                temp_path = temp_audio.name
+            buffer = audio_file if isinstance(audio_file, AudioBuffer) else AudioBuffer(audio_file)
             
-            try:
-                # Load audio file
-                with sr.AudioFile(temp_path) as source:
-                    # Adjust for ambient noise
-                    self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                    # Record audio
-                    audio_data = self.recognizer.record(source)
-                
-                # Recognize speech using Google Speech Recognition
-                text = self.recognizer.recognize_google(audio_data)
-                logger.info(f"Transcribed text: {text}")
-                return text
+            # Load audio straight from the buffer
+            with sr.AudioFile(buffer.open()) as source:
+                # Adjust for ambient noise
+                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
+                # Record audio
+                audio_data = self.recognizer.record(source)
             
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            # Recognize speech using Google Speech Recognition
+            with external_call('google_speech'):
+                text = self.recognizer.recognize_google(audio_data)
+            logger.info("Transcribed text: %s", text)
+            return text
         
         except sr.UnknownValueError:
             logger.warning("Could not understand audio")
@@ -114,7 +224,7 @@ class SpeechHandler:
         Convert audio file to text using AssemblyAI (more accurate)
         
         Args:
-            audio_file: Audio file object or path
+            audio_file: Audio file object, AudioBuffer, bytes or path
             
         Returns:
             str: Transcribed text or None
@@ -126,64 +236,62 @@ class SpeechHandler:
         try:
             import assemblyai as aai
             
-            # Re-initialize API key in case it wasn't set during init
+            # The SDK is only imported once a transcription needs it
             aai.settings.api_key = self.assemblyai_key
             
-            # Determine file extension from the uploaded file
-            file_ext = '.webm'  # Default to webm (most common from browsers)
-            if hasattr(audio_file, 'filename'):
-                if audio_file.filename.endswith('.wav'):
-                    file_ext = '.wav'
-                elif audio_file.filename.endswith('.mp3'):
-                    file_ext = '.mp3'
-                elif audio_file.filename.endswith('.webm'):
-                    file_ext = '.webm'
-            
-            # Save uploaded file temporarily with correct extension
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as temp_audio:
-                if hasattr(audio_file, 'save'):
-                    audio_file.save(temp_audio.name)
-                else:
-                    # If it's a path
-                    with open(audio_file, 'rb') as f:
-                        temp_audio.write(f.read())
-                temp_path = temp_audio.name
+            buffer = audio_file if isinstance(audio_file, AudioBuffer) else AudioBuffer(audio_file)
             
-            try:
-                # Configure transcription - removed language_detection to avoid empty audio error
-                config = aai.TranscriptionConfig(
-                    speech_model=aai.SpeechModel.best,
-                    language_code="en",  # Explicitly set to English
-                )
-                
-                # Transcribe
-                logger.info(f"Transcribing audio with AssemblyAI (format: {file_ext})...")
-                transcriber = aai.Transcriber(config=config)
-                transcript = transcriber.transcribe(temp_path)
-                
-                if transcript.status == aai.TranscriptStatus.error:
-                    logger.error(f"AssemblyAI transcription failed: {transcript.error}")
-                    return None
-                
-                if not transcript.text or transcript.text.strip() == "":
-                    logger.warning("AssemblyAI returned empty transcript")
-                    return None
-                
-                logger.info(f"Transcribed text: {transcript.text}")
-                return transcript.text
-            
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            # Configure transcription - removed language_detection to avoid empty audio error
+            config = aai.TranscriptionConfig(
+                speech_model=aai.SpeechModel.best,
+                language_code="en",  # Explicitly set to English
+            )
+            
+            # Transcribe, uploading straight from the buffer
+            logger.info("Transcribing audio with AssemblyAI (format: %s)...", buffer.extension)
+            transcriber = aai.Transcriber(config=config)
+            with external_call('assemblyai'):
+                transcript = transcriber.transcribe(buffer.open())
+            
+            if transcript.status == aai.TranscriptStatus.error:
+                logger.error(f"AssemblyAI transcription failed: {transcript.error}")
+                return None
+            
+            if not transcript.text or transcript.text.strip() == "":
+                logger.warning("AssemblyAI returned empty transcript")
+                return None
+            
+            logger.info("Transcribed text: %s", transcript.text)
+            return transcript.text
         
         except Exception as e:
             logger.error(f"Error in AssemblyAI audio-to-text: {str(e)}")
             return None
     
+    def transcribe(self, audio_file):
+        """
+        Transcribe audio with AssemblyAI, falling back to Google Speech Recognition
+        Both backends read the same buffer, so the upload is read only once
+        
+        Args:
+            audio_file: Audio file object, AudioBuffer, bytes or path
+            
+        Returns:
+            str: Transcribed text or None
+        """
+        with AudioBuffer(audio_file) as buffer:
+            text = self.audio_to_text_assemblyai(buffer)
+            
+            # Fallback to old method if AssemblyAI fails
+            if not text:
+                logger.warning("AssemblyAI failed, trying fallback method")
+                text = self.audio_to_text(buffer)
+        
+        return text
+    
     def text_to_audio(self, text):
         """
-        Convert text to speech
+        Speak text on the server's audio output
         
         Args:
             text (str): Text to convert to speech
@@ -191,21 +299,86 @@ class SpeechHandler:
         Returns:
             bool: True if successful, False otherwise
         """
-        if not self.tts_engine:
+        if not self._ensure_tts():
             logger.error("TTS engine not initialized")
             return False
         
         try:
-            # Speak the text
-            self.tts_engine.say(text)
-            self.tts_engine.runAndWait()
-            logger.info(f"Text-to-speech completed for: {text[:50]}...")
+            # Speak the text on the engine's own thread
+            self._tts_executor.submit(self._speak, text).result(timeout=self.tts_timeout)
+            logger.info("Text-to-speech completed for: %.50s...", text)
             return True
         
         except Exception as e:
             logger.error(f"Error in text-to-audio: {str(e)}")
             return False
     
+    def _speak(self, text):
+        self.tts_engine.say(text)
+        self.tts_engine.runAndWait()
+    
+    @staticmethod
+    def tts_cache_key(text, voice=None, rate=None):
+        """
+        Content address of a synthesis request
+        
+        Returns:
+            str: SHA-256 hex digest of text, voice and rate
+        """
+        material = f"{voice or ''}\0{rate or ''}\0{text}".encode('utf-8')
+        return hashlib.sha256(material).hexdigest()
+    
+    def synthesize(self, text, voice=None, rate=None):
+        """
+        Render text to WAV audio, serving repeated requests from the cache
+        
+        Args:
+            text (str): Text to convert to speech
+            voice (str): Engine voice id, or None for the default voice
+            rate (int): Speech rate in words per minute, or None for the default
+            
+        Returns:
+            bytes: WAV audio, or None if synthesis failed
+        """
+        if not self._ensure_tts():
+            logger.error("TTS engine not initialized")
+            return None
+        
+        key = self.tts_cache_key(text, voice, rate)
+        audio = self.tts_cache.get(key)
+        if audio is not None:
+            return audio
+        
+        try:
+            with timed('tts_render'):
+                audio = self._tts_executor.submit(self._render_wav, text, voice, rate).result(timeout=self.tts_timeout)
+        except Exception as e:
+            logger.error(f"Error in text-to-speech synthesis: {str(e)}")
+            return None
+        
+        if audio:
+            self.tts_cache.set(key, audio)
+        return audio
+    
+    def _render_wav(self, text, voice, rate):
+        """Render text into WAV bytes (runs on the TTS thread)"""
+        # pyttsx3 can only render to a file path
+        fd, path = tempfile.mkstemp(suffix='.wav')
+        os.close(fd)
+        default_voice = self.tts_engine.getProperty('voice')
+        try:
+            if voice:
+                self.tts_engine.setProperty('voice', voice)
+            self.tts_engine.setProperty('rate', rate or self.DEFAULT_TTS_RATE)
+            self.tts_engine.save_to_file(text, path)
+            self.tts_engine.runAndWait()
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            self.tts_engine.setProperty('voice', default_voice)
+            self.tts_engine.setProperty('rate', self.DEFAULT_TTS_RATE)
+            os.unlink(path)
+    
     def stop_speaking(self):
         """Stop current speech"""
         if self.tts_engine:
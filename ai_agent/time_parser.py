@@ -0,0 +1,233 @@
+import datetime
+import re
+
+NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6,
+    'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12,
+    'fifteen': 15, 'twenty': 20, 'thirty': 30, 'forty': 40, 'forty-five': 45,
+    'sixty': 60, 'ninety': 90, 'half an': 0.5, 'half a': 0.5
+}
+
+UNIT_SECONDS = {
+    'second': 1, 'sec': 1, 'minute': 60, 'min': 60, 'hour': 3600, 'hr': 3600,
+    'day': 86400, 'week': 604800
+}
+
+WEEKDAYS = {
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3, 'friday': 4, 'saturday': 5, 'sunday': 6
+}
+
+# Abbreviations are ordinary words too ("sun cream", "sat scores"), so they only
+# count as days after on/next/this/coming
+WEEKDAY_ABBREVIATIONS = {
+    'mon': 0, 'tue': 1, 'tues': 1, 'wed': 2, 'thu': 3, 'thurs': 3, 'fri': 4, 'sat': 5, 'sun': 6
+}
+
+# Times of day implied by words, as (hour, minute)
+DAY_PARTS = {
+    'noon': (12, 0), 'midday': (12, 0), 'midnight': (0, 0), 'morning': (9, 0),
+    'afternoon': (15, 0), 'evening': (18, 0), 'tonight': (20, 0), 'night': (20, 0)
+}
+
+_NUMBER = r'(?P<amount>\d+(?:\.\d+)?|half\s+an?|%s)' % '|'.join(
+    sorted((re.escape(word) for word in NUMBER_WORDS if not word.startswith('half')), key=len, reverse=True)
+)
+_UNIT = r'(?P<unit>%s)s?' % '|'.join(sorted(UNIT_SECONDS, key=len, reverse=True))
+_WEEKDAY = r'(?P<weekday>%s)' % '|'.join(sorted(WEEKDAYS, key=len, reverse=True))
+_WEEKDAY_ABBREVIATION = r'(?P<weekday_abbreviation>%s)' % '|'.join(
+    sorted(WEEKDAY_ABBREVIATIONS, key=len, reverse=True)
+)
+_CLOCK = (
+    r'(?:at\s+)?(?P<hour>\d{1,2})(?:\s*[:.]\s*(?P<minute>\d{2}))?\s*(?P<meridiem>a\.?m\.?|p\.?m\.?)?'
+    r'(?:\s+o\'?clock)?'
+)
+_DAY_PART = r'(?:(?:in\s+the|at|this)\s+)?(?P<part>%s)' % '|'.join(sorted(DAY_PARTS, key=len, reverse=True))
+
+# Grammars are compiled once; each alternative names the pieces it captures
+RELATIVE_RE = re.compile(r'\b(?:in|after)\s+%s\s+%s\b(?:\s+(?:from\s+now|later))?' % (_NUMBER, _UNIT))
+DAY_RE = re.compile(
+    r'\b(?:(?P<today>today)|(?P<tomorrow>tomorrow)|(?P<after>day\s+after\s+tomorrow)|'
+    r'(?:(?P<next>next)\s+|(?:this|on|coming)\s+)?%s|'
+    r'(?:(?P<next_abbreviated>next)\s+|(?:this|on|coming)\s+)%s)\b' % (_WEEKDAY, _WEEKDAY_ABBREVIATION)
+)
+CLOCK_RE = re.compile(r'\b%s(?![\w:])' % _CLOCK)
+DAY_PART_RE = re.compile(r'\b%s\b' % _DAY_PART)
+# Only month names and their abbreviations: "mark 5 times" or "decide 2 things" are not dates
+DATE_RE = re.compile(
+    r'\b(?:on\s+)?(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|'
+    r'aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?\s+'
+    r'(?P<day>\d{1,2})(?:st|nd|rd|th)?\b'
+)
+
+MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6, 'jul': 7, 'aug': 8,
+    'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12
+}
+
+
+class TimeExpression:
+    """A parsed time expression: absolute due time plus where it was found in the text"""
+
+    __slots__ = ('due', 'text', 'spans')
+
+    def __init__(self, due, text, spans):
+        self.due = due
+        self.text = text
+        self.spans = spans
+
+    @property
+    def timestamp(self):
+        """Due time as a UTC epoch timestamp"""
+        return self.due.timestamp()
+
+    def strip_from(self, text):
+        """Remove the matched time phrases from the text they were found in"""
+        for start, end in sorted(self.spans, reverse=True):
+            text = text[:start] + text[end:]
+        return ' '.join(text.split())
+
+    def __repr__(self):
+        return f"TimeExpression({self.due.isoformat()}, {self.text!r})"
+
+
+def _amount(value):
+    value = value.strip()
+    if value[0].isdigit():
+        return float(value)
+    return NUMBER_WORDS[' '.join(value.split())]
+
+
+def _clock_time(match, bare_numbers=False):
+    """Return (hour, minute) for a clock match, or None if it is not a plausible time"""
+    hour = int(match.group('hour'))
+    minute = int(match.group('minute') or 0)
+    meridiem = (match.group('meridiem') or '').replace('.', '')
+    has_marker = meridiem or match.group('minute') or match.group(0).startswith('at') or 'clock' in match.group(0)
+    if not has_marker and not bare_numbers:
+        # A bare number ("buy 2 apples") is not a time
+        return None
+    if meridiem == 'pm' and hour < 12:
+        hour += 12
+    elif meridiem == 'am' and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None
+    return hour, minute
+
+
+def parse_time_expression(text, now=None, hints=None):
+    """
+    Parse the first relative or absolute time expression in a text
+
+    Understands "in 20 minutes", "in half an hour", "tomorrow at 9", "next friday",
+    "on monday evening", "at 3:30 pm", "noon", "march 5th at 10am" and combinations
+    of a day with a clock time or part of the day
+
+    Args:
+        text (str): Text containing the expression
+        now (datetime): Reference time (timezone-aware); defaults to the local time now
+        hints (list): Time phrases already found by NER (spaCy DATE/TIME entity texts),
+            tried when the text itself has no recognizable expression; inside an
+            entity a bare number ("call at 5" tagged TIME) counts as an hour
+
+    Returns:
+        TimeExpression: Parsed expression with a UTC due time, or None if nothing was found
+    """
+    if now is None:
+        now = datetime.datetime.now().astimezone()
+    elif now.tzinfo is None:
+        now = now.astimezone()
+
+    result = _parse(text, now)
+    if result is not None or not hints:
+        return result
+
+    lower = text.lower()
+    for hint in hints:
+        start = lower.find(hint.lower())
+        if start < 0:
+            continue
+        result = _parse(hint, now, bare_numbers=True)
+        if result:
+            result.spans = [(start + s, start + e) for s, e in result.spans]
+            result.text = text[start:start + len(hint)]
+            return result
+    return None
+
+
+def _parse(text, now, bare_numbers=False):
+    """Apply the compiled grammars to one piece of text"""
+    lower = text.lower()
+
+    relative = RELATIVE_RE.search(lower)
+    if relative:
+        seconds = _amount(relative.group('amount')) * UNIT_SECONDS[relative.group('unit')]
+        try:
+            due = (now + datetime.timedelta(seconds=seconds)).astimezone(datetime.timezone.utc)
+        except OverflowError:
+            # Beyond the range of datetime ("in 1000000000 days")
+            return None
+        return TimeExpression(due, text[relative.start():relative.end()], [relative.span()])
+
+    spans = []
+    day = None
+    day_match = DAY_RE.search(lower)
+    date_match = DATE_RE.search(lower)
+    if day_match:
+        spans.append(day_match.span())
+        if day_match.group('today'):
+            day = now.date()
+        elif day_match.group('tomorrow'):
+            day = now.date() + datetime.timedelta(days=1)
+        elif day_match.group('after'):
+            day = now.date() + datetime.timedelta(days=2)
+        else:
+            if day_match.group('weekday'):
+                weekday = WEEKDAYS[day_match.group('weekday')]
+            else:
+                weekday = WEEKDAY_ABBREVIATIONS[day_match.group('weekday_abbreviation')]
+            days_ahead = (weekday - now.weekday()) % 7
+            if days_ahead == 0 or day_match.group('next') or day_match.group('next_abbreviated'):
+                days_ahead = days_ahead or 7
+            day = now.date() + datetime.timedelta(days=days_ahead)
+    elif date_match:
+        spans.append(date_match.span())
+        month = MONTHS[date_match.group('month')[:3]]
+        try:
+            day = datetime.date(now.year, month, int(date_match.group('day')))
+            if day < now.date():
+                day = day.replace(year=now.year + 1)
+        except ValueError:
+            day = None
+            spans.pop()
+
+    clock = None
+    for clock_match in CLOCK_RE.finditer(lower):
+        # Skip numbers that are part of the date ("march 5th")
+        if date_match and date_match.start() <= clock_match.start() < date_match.end():
+            continue
+        clock = _clock_time(clock_match, bare_numbers)
+        if clock:
+            spans.append(clock_match.span())
+            break
+    if clock is None:
+        part_match = DAY_PART_RE.search(lower)
+        if part_match:
+            clock = DAY_PARTS[part_match.group('part')]
+            spans.append(part_match.span())
+
+    if day is None and clock is None:
+        return None
+
+    if clock is None:
+        clock = (9, 0)  # A day without a time means the morning of that day
+    due = now.replace(hour=clock[0], minute=clock[1], second=0, microsecond=0)
+    if day is not None:
+        due = due.replace(year=day.year, month=day.month, day=day.day)
+    elif due <= now:
+        # A bare time that already passed today means tomorrow
+        due += datetime.timedelta(days=1)
+
+    start = min(span[0] for span in spans)
+    end = max(span[1] for span in spans)
+    return TimeExpression(due.astimezone(datetime.timezone.utc), text[start:end], spans)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+
+from .cache import TTLCache
+from .metrics import external_call, track_cache
+from .singleflight import AsyncSingleFlight, SingleFlight, SingleFlightTimeout
+
+logger = logging.getLogger(__name__)
+
+WOLFRAM_QUERY_URL = 'https://api.wolframalpha.com/v2/query'
+
+# Pods that hold the answer when Wolfram marks none as primary
+ANSWER_POD_IDS = ('Result', 'DecimalApproximation', 'Value', 'Solution')
+
+_QUESTION_PUNCTUATION_RE = re.compile(r'[?!.\s]+$')
+
+
+def normalize_question(question):
+    """Cache key for a question: case, inner whitespace and trailing punctuation don't matter"""
+    return _QUESTION_PUNCTUATION_RE.sub('', ' '.join(question.lower().split()))
+
+
+class WolframBackend:
+    """
+    WolframAlpha Full Results API (v2) client
+    Queries go through the shared pooled HTTP client under a strict deadline, answers
+    are cached by normalized question, identical questions asked concurrently share
+    one request, and a semaphore caps in-flight requests so bursts cannot exhaust
+    the API quota
+    """
+
+    def __init__(self, app_id, http, timeout=5, max_concurrent=4, cache_size=1024, cache_ttl=86400,
+                 negative_ttl=300):
+        """
+        Args:
+            app_id (str): WolframAlpha AppID
+            http (HTTPClient): Shared outbound HTTP client
+            timeout (float): Seconds a query may take in total, including waiting for a slot
+            max_concurrent (int): Maximum simultaneous requests to the API
+            cache_size (int): Number of cached answers
+            cache_ttl (float): Seconds an answer is cached
+            negative_ttl (float): Seconds a "no answer" result is cached
+        """
+        self.app_id = app_id
+        self.http = http
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.max_concurrent = max_concurrent
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        # Created on first async use so it binds to the serving event loop
+        self._async_slots = None
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl, name='wolfram')
+        track_cache(self.cache)
+        self.flights = SingleFlight('wolfram')
+        self.async_flights = AsyncSingleFlight('wolfram')
+
+    @property
+    def configured(self):
+        return bool(self.app_id and self.app_id != 'your_wolfram_alpha_app_id_here')
+
+    def ask(self, question, deadline=None):
+        """
+        Ask WolframAlpha a question
+
+        Args:
+            question (str): Question text
+            deadline (float): time.monotonic() value by which the answer is needed,
+                defaults to now plus the backend timeout
+
+        Returns:
+            str: Plain-text answer, or None if there is no answer, the API failed,
+                or the deadline passed
+        """
+        if not self.configured:
+            return None
+
+        key = normalize_question(question)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+
+        deadline = self._deadline(deadline)
+        try:
+            return self.flights.do(key, lambda: self._query(question, key, deadline),
+                                   timeout=max(deadline - time.monotonic(), 0))
+        except SingleFlightTimeout:
+            logger.warning("Deadline passed waiting for an identical WolframAlpha query")
+            return None
+
+    def _query(self, question, key, deadline):
+        """Query the API (one caller per question at a time) and cache the answer"""
+        if not self._slots.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            logger.warning("WolframAlpha concurrency limit reached, skipping query")
+            return None
+        try:
+            with external_call('wolfram'):
+                response = self.http.get(WOLFRAM_QUERY_URL, params=self._params(question, deadline), deadline=deadline)
+                response.raise_for_status()
+                answer = self._answer_from_result(response.json())
+        except Exception as e:
+            logger.error(f"WolframAlpha error: {str(e)}")
+            return None
+        finally:
+            self._slots.release()
+
+        self._store(key, answer)
+        return answer
+
+    async def ask_async(self, question, http, deadline=None):
+        """
+        Ask WolframAlpha a question without blocking the event loop
+
+        Args:
+            question (str): Question text
+            http (AsyncHTTPClient): Non-blocking HTTP client
+            deadline (float): time.monotonic() value by which the answer is needed
+
+        Returns:
+            str: Plain-text answer, or None (see ask)
+        """
+        if not self.configured:
+            return None
+
+        key = normalize_question(question)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached or None
+
+        deadline = self._deadline(deadline)
+        try:
+            return await self.async_flights.do(key, lambda: self._query_async(question, key, http, deadline),
+                                               timeout=max(deadline - time.monotonic(), 0))
+        except SingleFlightTimeout:
+            logger.warning("Deadline passed waiting for an identical WolframAlpha query")
+            return None
+
+    async def _query_async(self, question, key, http, deadline):
+        """Non-blocking _query"""
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrent)
+        try:
+            await asyncio.wait_for(self._async_slots.acquire(), max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            logger.warning("WolframAlpha concurrency limit reached, skipping query")
+            return None
+        try:
+            with external_call('wolfram'):
+                response = await http.get(WOLFRAM_QUERY_URL, params=self._params(question, deadline), deadline=deadline)
+                response.raise_for_status()
+                answer = self._answer_from_result(response.json())
+        except Exception as e:
+            logger.error(f"WolframAlpha error: {str(e)}")
+            return None
+        finally:
+            self._async_slots.release()
+
+        self._store(key, answer)
+        return answer
+
+    def _deadline(self, deadline):
+        limit = time.monotonic() + self.timeout
+        return limit if deadline is None else min(deadline, limit)
+
+    def _store(self, key, answer):
+        # An empty string marks a cached "no answer"
+        if answer:
+            self.cache.set(key, answer)
+        else:
+            self.cache.set(key, '', ttl=self.negative_ttl)
+
+    def _params(self, question, deadline):
+        # Let Wolfram give up a little before our own deadline so we get its partial result
+        budget = max(int(deadline - time.monotonic()) - 1, 1)
+        return {
+            'appid': self.app_id,
+            'input': question,
+            'format': 'plaintext',
+            'output': 'json',
+            'totaltimeout': budget
+        }
+
+    @classmethod
+    def _answer_from_result(cls, data):
+        """Pull the answer out of a JSON query result"""
+        result = data.get('queryresult', {})
+        if not result.get('success') or result.get('error'):
+            return None
+        return cls._answer_from_pods(result.get('pods', []))
+
+    @staticmethod
+    def _answer_from_pods(pods):
+        candidates = [pod for pod in pods if pod.get('primary')]
+        candidates += [pod for pod in pods if pod.get('id') in ANSWER_POD_IDS]
+        for pod in candidates:
+            for subpod in pod.get('subpods', []):
+                text = (subpod.get('plaintext') or '').strip()
+                if text:
+                    return text
+        return None
@@ -1,5 +1,14 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response, stream_with_context, g, session
 from flask_cors import CORS
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from werkzeug.middleware.proxy_fix import ProxyFix
+import contextvars
+import json
+import queue
+import threading
+import time
+import uuid
 import os
 from dotenv import load_dotenv
 import logging
@@ -7,24 +16,171 @@ import logging
 # Import AI agent modules
 from ai_agent.nlp_processor import NLPProcessor
 from ai_agent.commands import CommandHandler
-from ai_agent.speech_handler import SpeechHandler
+from ai_agent.speech_handler import SpeechHandler, AudioBuffer
+from ai_agent.jobs import JobQueue, JobQueueFull, JobStore
+from ai_agent.services import ServiceRegistry
+from ai_agent.admission import AdmissionController, AdmissionRejected
+from ai_agent import metrics
+from ai_agent import logging_utils
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging (NOVA_LOG_FORMAT, NOVA_LOG_QUEUE, NOVA_LOG_SAMPLE_RATE)
+logging_utils.configure_logging()
 logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
+# The session only holds the reminder owner id; re-signing its cookie on every
+# response would cost each request a serialization (asgi.py issues it once too)
+app.config['SESSION_REFRESH_EACH_REQUEST'] = False
 CORS(app)
 
-# Initialize AI components
-nlp_processor = NLPProcessor()
-command_handler = CommandHandler()
-speech_handler = SpeechHandler()
+# Number of reverse proxies in front of the app (1 on Render). Their X-Forwarded-For
+# entries are trusted to give the client address that rate limits are keyed on; with
+# 0 the forwarded headers are ignored, since clients can set them to anything
+PROXY_HOPS = int(os.getenv('NOVA_PROXY_HOPS', 0))
+if PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS, x_proto=PROXY_HOPS)
+
+# AI components are built on first use; NOVA_STARTUP_MODE picks whether they are
+# also warmed up at boot ('background', the default), built before serving ('eager')
+# or left until a request needs them ('lazy')
+services = ServiceRegistry()
+nlp_processor = services.register('nlp_processor', NLPProcessor, warmup=NLPProcessor.warmup, fork_safe=True)
+command_handler = services.register('command_handler', CommandHandler)
+speech_handler = services.register('speech_handler', SpeechHandler, warmup=SpeechHandler.warmup)
+services.start(os.getenv('NOVA_STARTUP_MODE', 'background'))
+
+# Per-client rate limits and per-lane concurrency budgets for the /api/process and
+# /api/speech-to-text routes (NOVA_ADMISSION_* settings, see .env.example)
+admission = AdmissionController.from_env()
+ADMISSION_MESSAGES = {
+    429: 'Too many requests, please slow down',
+    503: 'The assistant is busy, please retry shortly'
+}
+
+# Batch processing settings
+BATCH_MAX_MESSAGES = int(os.getenv('NOVA_BATCH_MAX_MESSAGES', 1000))
+BATCH_SIZE = int(os.getenv('NOVA_BATCH_SIZE', 64))
+BATCH_SPACY_PROCESSES = int(os.getenv('NOVA_BATCH_SPACY_PROCESSES', 1))
+BATCH_HANDLER_WORKERS = int(os.getenv('NOVA_BATCH_HANDLER_WORKERS', 4))
+BATCH_STREAM_THRESHOLD = int(os.getenv('NOVA_BATCH_STREAM_THRESHOLD', 50))
+# Seconds a batch message waits for a free expensive-lane slot before it is rejected
+BATCH_SLOT_WAIT = float(os.getenv('NOVA_BATCH_SLOT_WAIT', 30))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_HANDLER_WORKERS, thread_name_prefix='nova-batch')
+
+# Server-Sent Events streaming of /api/process
+SSE_HEARTBEAT_INTERVAL = float(os.getenv('NOVA_SSE_HEARTBEAT', 10))
+stream_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('NOVA_STREAM_WORKERS', 16)),
+    thread_name_prefix='nova-stream'
+)
+
+def _transcribe_upload(buffer):
+    """Background transcription of an uploaded audio buffer"""
+    try:
+        return speech_handler.transcribe(buffer)
+    finally:
+        buffer.close()
+
+# Asynchronous speech-to-text jobs; their state is kept in SQLite (the reminder
+# database by default) so a job can be polled from any gunicorn worker
+STT_MAX_WAIT = float(os.getenv('NOVA_STT_MAX_WAIT', 30))
+transcription_jobs = JobQueue(
+    _transcribe_upload,
+    workers=int(os.getenv('NOVA_STT_WORKERS', 2)),
+    max_queue=int(os.getenv('NOVA_STT_QUEUE_DEPTH', 16)),
+    result_ttl=float(os.getenv('NOVA_STT_JOB_TTL', 300)),
+    name='transcription',
+    store=JobStore(os.getenv('NOVA_JOB_DB', os.getenv('NOVA_REMINDER_DB', 'nova_reminders.db')))
+)
+
+metrics.REGISTRY.gauge_callback(
+    'nova_service_init_seconds', 'Time taken to build (and warm up) each service', ('service',),
+    lambda: [((name,), seconds) for name, seconds in services.timings().items()]
+)
+metrics.REGISTRY.gauge_callback(
+    'nova_job_queue_pending', 'Jobs waiting for a worker', ('queue',),
+    lambda: [((transcription_jobs.name,), transcription_jobs.pending())]
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+    g.log_context = logging_utils.begin_request(request.headers.get('X-Request-Id'))
+
+@app.teardown_request
+def end_request_log_context(exc):
+    tokens = g.pop('log_context', None)
+    if tokens is not None:
+        logging_utils.end_request(tokens)
+
+@app.after_request
+def record_request_duration(response):
+    """Record API request latency by route (streamed bodies are timed until headers are sent)"""
+    started = g.pop('request_started', None)
+    if started is not None and request.path.startswith('/api/'):
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_SECONDS.observe(
+            time.perf_counter() - started, route=route, method=request.method, status=response.status_code
+        )
+    response.headers['X-Request-Id'] = logging_utils.current_request_id() or ''
+    return response
+
+def client_id():
+    """Identify the calling client for rate limiting: its address (proxy-aware, see NOVA_PROXY_HOPS)"""
+    return request.remote_addr or 'anonymous'
+
+def session_owner():
+    """
+    Server-issued id of the caller's session, kept in Flask's signed session cookie
+    Reminders belong to it; a client without the cookie gets a new id (and cookie)
+    """
+    owner = session.get('owner')
+    if not owner:
+        session.permanent = True
+        session['owner'] = owner = uuid.uuid4().hex
+    return owner
+
+def command_owner(intent):
+    """Session owner for a reminder command; other intents neither need nor issue the session cookie"""
+    return session_owner() if intent == 'reminder' else None
+
+def request_lane(parsed, controller=None):
+    """Admission lane of a parsed request; math only needs the expensive lane when the local engine can't answer it"""
+    controller = controller or admission
+    local = parsed.intent == 'math' and command_handler.evaluate_math(parsed) is not None
+    return controller.lane_for(parsed.intent, local=local)
+
+def release_on_close(response, ticket):
+    """Hold an admission ticket until a (streamed) response is closed"""
+    response.call_on_close(lambda: ticket.__exit__(None, None, None))
+    return response
+
+def admission_rejected_response(rejection):
+    """429/503 response for a request turned away by admission control"""
+    logger.warning("Rejected request from %s: %s", client_id(), rejection)
+    response = jsonify({'error': ADMISSION_MESSAGES[rejection.status], 'retry_after': rejection.retry_after})
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response, rejection.status
+
+def format_command_result(result, intent):
+    """Shape a CommandHandler result into the /api/process response body"""
+    # Handle both old string format and new dict format for compatibility
+    if isinstance(result, dict):
+        return {
+            'response': result.get('answer', ''),
+            'thinking': result.get('thinking', ''),
+            'intent': result.get('intent', intent)
+        }
+    # Fallback for old string format
+    return {
+        'response': result,
+        'intent': intent
+    }
 
 @app.route('/')
 def index():
@@ -41,63 +197,301 @@ def process_command():
         if not user_input:
             return jsonify({'error': 'No message provided'}), 400
         
-        logger.info(f"Processing command: {user_input}")
+        if logging_utils.diagnostics_enabled():
+            logger.info("Processing command: %s", user_input)
         
-        # Process the command using NLP
-        intent = nlp_processor.detect_intent(user_input)
-        logger.info(f"Detected intent: {intent}")
+        # Process the command using NLP (parsed once, shared with the handler)
+        parsed = nlp_processor.parse(user_input)
+        intent = parsed.intent
+        logger.info("Detected intent: %s", intent)
         
         # Handle the command based on intent (now returns dict with thinking process)
-        result = command_handler.handle_command(intent, user_input)
-        
-        # Handle both old string format and new dict format for compatibility
-        if isinstance(result, dict):
-            return jsonify({
-                'response': result.get('answer', ''),
-                'thinking': result.get('thinking', ''),
-                'intent': result.get('intent', intent)
-            })
-        else:
-            # Fallback for old string format
-            return jsonify({
-                'response': result,
-                'intent': intent
-            })
+        with admission.admit(client_id(), request_lane(parsed)):
+            result = command_handler.handle_command(intent, parsed, owner=command_owner(intent))
+        
+        return jsonify(format_command_result(result, intent))
     
+    except AdmissionRejected as rejection:
+        return admission_rejected_response(rejection)
     except Exception as e:
-        logger.error(f"Error processing command: {str(e)}")
+        logger.error("Error processing command: %s", e)
         return jsonify({'error': f'Error processing command: {str(e)}'}), 500
 
-@app.route('/api/speech-to-text', methods=['POST'])
-def speech_to_text():
-    """Convert speech audio to text using AssemblyAI"""
+def _sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_command(parsed, owner):
+    """
+    Yield SSE events for one command: the intent and thinking steps right away,
+    progress while the handler runs, then the final answer
+    """
+    intent = parsed.intent
+    yield _sse_event('intent', {'intent': intent})
+    
+    thinking = command_handler.generate_thinking_process(intent, parsed.text)
+    for index, step in enumerate(thinking.split('\n')):
+        yield _sse_event('thinking', {'index': index, 'step': step})
+    
+    updates = queue.Queue()
+    cancel_event = threading.Event()
+    # The handler thread runs in a copy of this context so its logs keep the request id
+    future = stream_executor.submit(
+        contextvars.copy_context().run, command_handler.handle_command, intent, parsed,
+        progress=updates.put, cancel_event=cancel_event, owner=owner
+    )
+    future.add_done_callback(lambda _: updates.put(None))
+    
     try:
-        if 'audio' not in request.files:
-            return jsonify({'error': 'No audio file provided'}), 400
+        while True:
+            try:
+                update = updates.get(timeout=SSE_HEARTBEAT_INTERVAL)
+            except queue.Empty:
+                # Comment line: keeps proxies from timing out and detects disconnects
+                yield ': heartbeat\n\n'
+                continue
+            if update is None:
+                break
+            yield _sse_event('progress', {'message': update})
         
-        audio_file = request.files['audio']
+        try:
+            body = format_command_result(future.result(), intent)
+            yield _sse_event('answer', body)
+        except Exception as e:
+            logger.error("Error processing streamed command: %s", e)
+            yield _sse_event('error', {'error': f'Error processing command: {str(e)}'})
+        yield _sse_event('done', {})
+    
+    finally:
+        # Runs on normal completion and when the client disconnects mid-stream
+        if not future.done():
+            logger.info("Client disconnected, cancelling command")
+            cancel_event.set()
+            future.cancel()
+
+@app.route('/api/process/stream', methods=['GET', 'POST'])
+def process_command_stream():
+    """Process a text command, streaming intent, thinking steps and answer as Server-Sent Events"""
+    if request.method == 'POST':
+        data = request.get_json() or {}
+        user_input = data.get('message', '').strip()
+    else:
+        # GET form for browser EventSource clients
+        user_input = request.args.get('message', '').strip()
+    
+    if not user_input:
+        return jsonify({'error': 'No message provided'}), 400
+    
+    if logging_utils.diagnostics_enabled():
+        logger.info("Streaming command: %s", user_input)
+    
+    parsed = nlp_processor.parse(user_input)
+    logger.info("Detected intent: %s", parsed.intent)
+    try:
+        # The lane slot is held until the stream ends (or the client goes away)
+        ticket = admission.admit(client_id(), request_lane(parsed))
+    except AdmissionRejected as rejection:
+        return admission_rejected_response(rejection)
+    
+    response = Response(
+        stream_with_context(_stream_command(parsed, command_owner(parsed.intent))),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    return release_on_close(response, ticket)
+
+def _process_batch_item(index, parsed, owner, batch_admission):
+    """Run the handler for one parsed batch message"""
+    intent = parsed.intent
+    try:
+        # Messages that call an external API take an expensive-lane slot, queueing
+        # for one while the lane is full; the batch is charged to the client once
+        lane = request_lane(parsed)
+        with batch_admission.admit(lane) if lane == 'expensive' else nullcontext():
+            result = command_handler.handle_command(intent, parsed, owner=owner)
+        item = format_command_result(result, intent)
+        entities = parsed.entities
+        if entities:
+            item['entities'] = entities
+    except AdmissionRejected as rejection:
+        item = {
+            'error': ADMISSION_MESSAGES[rejection.status], 'status': rejection.status,
+            'retry_after': rejection.retry_after, 'intent': intent
+        }
+    except Exception as e:
+        logger.error("Error processing batch message %d: %s", index, e)
+        item = {'error': f'Error processing command: {str(e)}', 'intent': intent}
+    item['index'] = index
+    return item
+
+def _iter_batch_results(messages, batch_size, owner_for, batch_admission):
+    """
+    Analyse messages chunk by chunk and yield per-message results in input order
+    owner_for maps a parsed intent to its session owner; it runs on the request thread
+    """
+    for start in range(0, len(messages), batch_size):
+        chunk = messages[start:start + batch_size]
+        texts = [message for message in chunk if message]
+        parsed_texts = iter(nlp_processor.parse_batch(
+            texts,
+            batch_size=batch_size,
+            n_process=BATCH_SPACY_PROCESSES
+        ))
         
-        # Use AssemblyAI for better accuracy
-        text = speech_handler.audio_to_text_assemblyai(audio_file)
+        futures = []
+        for offset, message in enumerate(chunk):
+            if not message:
+                futures.append(None)
+                continue
+            parsed = next(parsed_texts)
+            futures.append(batch_executor.submit(
+                contextvars.copy_context().run, _process_batch_item, start + offset, parsed,
+                owner_for(parsed.intent), batch_admission
+            ))
         
-        # Fallback to old method if AssemblyAI fails
-        if not text:
-            logger.warning("AssemblyAI failed, trying fallback method")
-            text = speech_handler.audio_to_text(audio_file)
+        for offset, future in enumerate(futures):
+            if future is None:
+                yield {'index': start + offset, 'error': 'No message provided'}
+            else:
+                yield future.result()
+
+@app.route('/api/process/batch', methods=['POST'])
+def process_batch():
+    """Process a list of text commands, streaming NDJSON for large batches"""
+    try:
+        data = request.get_json() or {}
+        messages = data.get('messages')
+        
+        if not isinstance(messages, list) or not messages:
+            return jsonify({'error': 'No messages provided'}), 400
+        if len(messages) > BATCH_MAX_MESSAGES:
+            return jsonify({'error': f'Too many messages (max {BATCH_MAX_MESSAGES})'}), 413
+        
+        messages = [message.strip() if isinstance(message, str) else '' for message in messages]
+        try:
+            batch_size = max(1, min(int(data.get('batch_size', BATCH_SIZE)), BATCH_MAX_MESSAGES))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'batch_size must be an integer'}), 400
+        stream = data.get('stream', len(messages) > BATCH_STREAM_THRESHOLD)
+        
+        if stream and not session.get('owner'):
+            # A streamed response sends its headers before the messages are parsed, so a
+            # new session cookie is only issued up front when a message is a reminder
+            has_reminder = any(nlp_processor.detect_intent(message) == 'reminder' for message in messages if message)
+            owner = session_owner() if has_reminder else None
+            owner_for = lambda intent: owner
+        else:
+            owner_for = command_owner
+        client = client_id()
+        logger.info("Processing batch of %d commands", len(messages))
+        
+        # The batch holds one cheap slot; its expensive messages share one charge
+        ticket = admission.admit(client, 'cheap')
+        batch_admission = admission.batch(client, wait=BATCH_SLOT_WAIT)
+        if stream:
+            def generate():
+                for item in _iter_batch_results(messages, batch_size, owner_for, batch_admission):
+                    yield json.dumps(item) + '\n'
+            response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+            return release_on_close(response, ticket)
+        
+        with ticket:
+            return jsonify({'results': list(_iter_batch_results(messages, batch_size, owner_for, batch_admission))})
+    
+    except AdmissionRejected as rejection:
+        return admission_rejected_response(rejection)
+    except Exception as e:
+        logger.error("Error processing batch: %s", e)
+        return jsonify({'error': f'Error processing batch: {str(e)}'}), 500
+
+@app.route('/api/speech-to-text', methods=['POST'])
+def speech_to_text():
+    """Convert speech audio to text using AssemblyAI"""
+    try:
+        # Admitted before the upload is parsed, so rejected requests cost nothing
+        with admission.admit(client_id(), 'expensive'):
+            if 'audio' not in request.files:
+                return jsonify({'error': 'No audio file provided'}), 400
+            
+            audio_file = request.files['audio']
+            
+            # Use AssemblyAI for better accuracy, with the Google recognizer as fallback
+            text = speech_handler.transcribe(audio_file)
         
         if text:
-            logger.info(f"Transcribed: {text}")
+            if logging_utils.diagnostics_enabled():
+                logger.info("Transcribed: %s", text)
             return jsonify({'text': text, 'success': True})
         else:
             return jsonify({'error': 'Could not understand audio'}), 400
     
+    except AdmissionRejected as rejection:
+        return admission_rejected_response(rejection)
+    except Exception as e:
+        logger.error("Error in speech-to-text: %s", e)
+        return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
+
+@app.route('/api/speech-to-text/jobs', methods=['POST'])
+def submit_speech_to_text_job():
+    """Queue an audio upload for background transcription and return its job id"""
+    try:
+        # Charged to the expensive lane like a synchronous transcription, before the
+        # upload is parsed
+        with admission.admit(client_id(), 'expensive'):
+            if 'audio' not in request.files:
+                return jsonify({'error': 'No audio file provided'}), 400
+            
+            audio_file = request.files['audio']
+            # Copy the upload once: the request's own stream is closed when it ends
+            buffer = AudioBuffer(audio_file, copy=True)
+            try:
+                job_id = transcription_jobs.submit(buffer)
+            except JobQueueFull:
+                buffer.close()
+                raise
+        
+        return jsonify({
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': f'/api/speech-to-text/jobs/{job_id}'
+        }), 202
+    
+    except AdmissionRejected as rejection:
+        return admission_rejected_response(rejection)
+    except JobQueueFull:
+        logger.warning("Transcription queue is full, rejecting upload")
+        response = jsonify({'error': 'Transcription queue is full, please retry shortly'})
+        response.headers['Retry-After'] = '2'
+        return response, 503
     except Exception as e:
-        logger.error(f"Error in speech-to-text: {str(e)}")
+        logger.error("Error queueing speech-to-text job: %s", e)
         return jsonify({'error': f'Error processing audio: {str(e)}'}), 500
 
+@app.route('/api/speech-to-text/jobs/<job_id>', methods=['GET'])
+def speech_to_text_job_status(job_id):
+    """Poll a transcription job; pass ?wait=<seconds> to long-poll until it finishes"""
+    try:
+        wait = min(max(float(request.args.get('wait', 0)), 0), STT_MAX_WAIT)
+    except ValueError:
+        return jsonify({'error': 'Invalid wait value'}), 400
+    
+    job = transcription_jobs.get(job_id, wait=wait)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job'}), 404
+    
+    body = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'done':
+        if job['result']:
+            body.update({'text': job['result'], 'success': True})
+        else:
+            body.update({'error': 'Could not understand audio', 'success': False})
+    elif job['status'] == 'failed':
+        body.update({'error': f"Error processing audio: {job['error']}", 'success': False})
+    return jsonify(body)
+
 @app.route('/api/text-to-speech', methods=['POST'])
 def text_to_speech():
-    """Convert text to speech"""
+    """Convert text to speech and return the rendered WAV audio"""
     try:
         data = request.get_json()
         text = data.get('text', '').strip()
@@ -105,29 +499,82 @@ def text_to_speech():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
+        voice = data.get('voice')
+        rate = data.get('rate')
+        if rate is not None:
+            try:
+                rate = min(max(int(rate), 50), 400)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'Invalid rate'}), 400
+        
+        # Audio is content-addressed, so clients can revalidate with the ETag
+        etag = speech_handler.tts_cache_key(text, voice, rate)
+        if etag in request.if_none_match:
+            return Response(status=304, headers={'ETag': f'"{etag}"'})
+        
         # Generate speech from text
-        audio_data = speech_handler.text_to_audio(text)
+        audio_data = speech_handler.synthesize(text, voice=voice, rate=rate)
         
         if audio_data:
-            return jsonify({
-                'success': True,
-                'message': 'Text-to-speech generated successfully'
+            return Response(audio_data, mimetype='audio/wav', headers={
+                'ETag': f'"{etag}"',
+                'Cache-Control': 'public, max-age=86400'
             })
         else:
             return jsonify({'error': 'Could not generate speech'}), 500
     
     except Exception as e:
-        logger.error(f"Error in text-to-speech: {str(e)}")
+        logger.error("Error in text-to-speech: %s", e)
         return jsonify({'error': f'Error generating speech: {str(e)}'}), 500
 
+@app.route('/api/reminders', methods=['GET'])
+def list_reminders():
+    """
+    List the session's reminders, newest first; paginate with ?limit= and ?cursor=
+    Each reminder has a 'fired' flag; poll with ?status=fired&fired_since=<timestamp>
+    to pick up reminders that came due since the last poll
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+        cursor = request.args.get('cursor', type=int)
+    except ValueError:
+        return jsonify({'error': 'Invalid limit'}), 400
+    
+    fired_since = request.args.get('fired_since', type=float)
+    if 'fired_since' in request.args and fired_since is None:
+        return jsonify({'error': 'Invalid fired_since'}), 400
+    
+    status = request.args.get('status', 'all')
+    if status not in ('all', 'pending', 'fired'):
+        return jsonify({'error': 'Invalid status'}), 400
+    
+    reminders, next_cursor = command_handler.reminder_store.list(
+        session_owner(), limit=limit, cursor=cursor, status=status, fired_since=fired_since
+    )
+    return jsonify({'reminders': reminders, 'next_cursor': next_cursor, 'now': time.time()})
+
+@app.route('/api/reminders/<int:reminder_id>', methods=['DELETE'])
+def delete_reminder(reminder_id):
+    """Delete one of the session's reminders"""
+    if not command_handler.reminder_store.delete(session_owner(), reminder_id):
+        return jsonify({'error': 'Reminder not found'}), 404
+    return jsonify({'success': True})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'message': 'AI Personal Assistant is running'
+        'message': 'AI Personal Assistant is running',
+        'services': services.status(),
+        'admission': admission.in_flight()
     })
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics_endpoint():
+    """Per-stage latencies, outbound call and cache statistics in Prometheus text format"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
     debug = os.getenv('FLASK_DEBUG', 'True') == 'True'
@@ -0,0 +1,283 @@
+"""
+ASGI entry point for NOVA
+
+/api/process and /api/speech-to-text run natively on the event loop, so requests
+waiting on search, WolframAlpha or AssemblyAI don't hold a worker; every other
+route is served by the Flask app through asgiref's WSGI adapter, on a thread pool so
+slow Flask routes (streams, batches, job long-polls) don't hold up each other.
+
+Run with an ASGI server, e.g.:
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from itsdangerous import BadSignature
+from werkzeug.formparser import parse_form_data
+from werkzeug.http import dump_cookie, parse_cookie
+
+import app as nova
+from ai_agent import logging_utils
+from ai_agent.admission import AdmissionRejected
+from ai_agent.async_runtime import AsyncAssistant
+from ai_agent.metrics import REQUEST_SECONDS
+from ai_agent.speech_handler import AudioBuffer, AUDIO_SPILL_BYTES
+
+logger = nova.logger
+
+MAX_BODY_BYTES = int(os.getenv('NOVA_MAX_UPLOAD_BYTES', 25 * 1024 * 1024))
+
+assistant = AsyncAssistant(nova.nlp_processor, nova.command_handler, nova.speech_handler)
+# Waiting on the network holds no thread here, so the expensive lane can be much wider
+# than under gunicorn; clients are charged to the same token buckets as the Flask routes
+admission = nova.admission.with_concurrency(expensive=int(os.getenv('NOVA_ASYNC_EXPENSIVE_CONCURRENCY', 64)))
+
+# Threads serving the Flask routes; asgiref's default runs every WSGI call on one thread
+wsgi_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('NOVA_ASYNC_WSGI_WORKERS', 32)),
+    thread_name_prefix='nova-wsgi'
+)
+
+
+class ThreadPooledWsgiInstance(WsgiToAsgiInstance):
+    """asgiref's per-request WSGI wrapper, run on wsgi_executor instead of the single sync thread"""
+
+    run_wsgi_app = sync_to_async(
+        WsgiToAsgiInstance.__dict__['run_wsgi_app'].func, thread_sensitive=False, executor=wsgi_executor
+    )
+
+
+class ThreadPooledWsgiToAsgi(WsgiToAsgi):
+    """WsgiToAsgi whose requests run concurrently on a thread pool"""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadPooledWsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+flask_application = ThreadPooledWsgiToAsgi(nova.app)
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+async def read_body(receive, limit=MAX_BODY_BYTES):
+    """Collect the request body into a spooled file (in memory below the audio spill threshold)"""
+    body = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPILL_BYTES)
+    size = 0
+    more = True
+    while more:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > limit:
+            body.close()
+            raise RequestTooLarge()
+        body.write(chunk)
+        more = message.get('more_body', False)
+    body.seek(0)
+    return body, size
+
+
+async def send_json(send, status, data, headers=()):
+    payload = json.dumps(data).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode()),
+            # Same as flask-cors' default for the Flask routes
+            (b'access-control-allow-origin', b'*'),
+            *headers
+        ]
+    })
+    await send({'type': 'http.response.body', 'body': payload})
+
+
+def header(scope, name):
+    name = name.lower().encode()
+    for key, value in scope['headers']:
+        if key == name:
+            return value.decode('latin-1')
+    return None
+
+
+def client_id(scope):
+    """
+    Same identity rule as app.client_id: the remote address, or behind NOVA_PROXY_HOPS
+    trusted proxies the X-Forwarded-For entry the outermost of them added (as ProxyFix)
+    """
+    client = scope.get('client')
+    address = client[0] if client else None
+    if nova.PROXY_HOPS:
+        forwarded = [
+            entry.strip() for key, value in scope['headers'] if key == b'x-forwarded-for'
+            for entry in value.decode('latin-1').split(',')
+        ]
+        if len(forwarded) >= nova.PROXY_HOPS:
+            address = forwarded[-nova.PROXY_HOPS]
+    return address or 'anonymous'
+
+
+def session_owner(scope, headers):
+    """
+    Same owner as app.session_owner, read from Flask's signed session cookie
+
+    Args:
+        scope (dict): ASGI connection scope
+        headers (list): Response headers, extended with Set-Cookie when a new id is issued
+
+    Returns:
+        str: Owner id of the session
+    """
+    flask_app = nova.app
+    interface = flask_app.session_interface
+    serializer = interface.get_signing_serializer(flask_app)
+    name = interface.get_cookie_name(flask_app)
+    max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+
+    data = {}
+    cookie = parse_cookie(header(scope, 'cookie') or '').get(name)
+    if cookie:
+        try:
+            data = serializer.loads(cookie, max_age=max_age)
+        except BadSignature:
+            data = {}
+
+    owner = data.get('owner')
+    if not owner:
+        data.update(owner=uuid.uuid4().hex, _permanent=True)
+        owner = data['owner']
+        cookie = dump_cookie(
+            name, serializer.dumps(data), max_age=max_age,
+            domain=interface.get_cookie_domain(flask_app),
+            path=interface.get_cookie_path(flask_app),
+            secure=interface.get_cookie_secure(flask_app),
+            httponly=interface.get_cookie_httponly(flask_app),
+            samesite=interface.get_cookie_samesite(flask_app)
+        )
+        headers.append((b'set-cookie', cookie.encode('latin-1')))
+    return owner
+
+
+async def process_command(scope, body, size, headers):
+    """Async /api/process: same request and response bodies as the Flask route"""
+    try:
+        data = json.loads(body.read() or b'{}')
+        user_input = (data.get('message') or '').strip()
+        if not user_input:
+            return 400, {'error': 'No message provided'}
+
+        if logging_utils.diagnostics_enabled():
+            logger.info("Processing command: %s", user_input)
+        parsed = await assistant.run_cpu(assistant.nlp_processor.parse, user_input)
+        intent = parsed.intent
+        logger.info("Detected intent: %s", intent)
+        lane = await assistant.run_cpu(nova.request_lane, parsed, admission)
+        # Only reminders are scoped to the session (see app.command_owner)
+        owner = session_owner(scope, headers) if intent == 'reminder' else None
+        with admission.admit(client_id(scope), lane):
+            result = await assistant.handle_command(intent, parsed, owner=owner)
+        return 200, nova.format_command_result(result, intent)
+
+    except AdmissionRejected:
+        raise
+    except Exception as e:
+        logger.error("Error processing command: %s", e)
+        return 500, {'error': f'Error processing command: {str(e)}'}
+
+
+async def speech_to_text(scope, body, size, headers):
+    """Async /api/speech-to-text: multipart 'audio' upload, transcribed without blocking the loop"""
+    try:
+        environ = {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': header(scope, 'content-type') or '',
+            'CONTENT_LENGTH': str(size),
+            'wsgi.input': body
+        }
+        # Multipart parsing may spill a large upload to disk, so it stays off the loop
+        _, _, files = await assistant.run_cpu(parse_form_data, environ)
+        if 'audio' not in files:
+            return 400, {'error': 'No audio file provided'}
+
+        with AudioBuffer(files['audio']) as buffer:
+            text = await assistant.transcribe(buffer)
+
+        if text:
+            if logging_utils.diagnostics_enabled():
+                logger.info("Transcribed: %s", text)
+            return 200, {'text': text, 'success': True}
+        return 400, {'error': 'Could not understand audio'}
+
+    except Exception as e:
+        logger.error("Error in speech-to-text: %s", e)
+        return 500, {'error': f'Error processing audio: {str(e)}'}
+
+
+# Route to (handler, lane); routes with a lane are admitted before their body is read,
+# the others pick their lane in the handler. Handlers get the connection scope, the
+# spooled body, its size and a list of extra response headers they may extend
+ROUTES = {
+    ('POST', '/api/process'): (process_command, None),
+    ('POST', '/api/speech-to-text'): (speech_to_text, 'expensive')
+}
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await assistant.aclose()
+            wsgi_executor.shutdown(wait=False)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+
+    route = ROUTES.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+    if route is None:
+        return await flask_application(scope, receive, send)
+
+    handler, lane = route
+    started = time.perf_counter()
+    tokens = logging_utils.begin_request(header(scope, 'x-request-id'))
+    try:
+        headers = []
+        try:
+            with admission.admit(client_id(scope), lane) if lane else nullcontext():
+                try:
+                    body, size = await read_body(receive)
+                except RequestTooLarge:
+                    status, data = 413, {'error': f'Request body exceeds {MAX_BODY_BYTES} bytes'}
+                else:
+                    with body:
+                        status, data = await handler(scope, body, size, headers)
+        except AdmissionRejected as rejection:
+            logger.warning("Rejected request from %s: %s", client_id(scope), rejection)
+            status, data = rejection.status, {
+                'error': nova.ADMISSION_MESSAGES[rejection.status], 'retry_after': rejection.retry_after
+            }
+            headers.append((b'retry-after', str(rejection.retry_after).encode()))
+        request_id = (logging_utils.current_request_id() or '').encode()
+        headers.append((b'x-request-id', request_id))
+        await send_json(send, status, data, headers=headers)
+        REQUEST_SECONDS.observe(time.perf_counter() - started, route=scope['path'],
+                                method=scope['method'], status=status)
+    finally:
+        logging_utils.end_request(tokens)
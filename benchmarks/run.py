@@ -0,0 +1,308 @@
+"""
+Offline benchmark suite for NOVA's hot paths
+
+Times intent detection and entity extraction over a labeled corpus, the math,
+reminder and thinking-process handlers, and end-to-end /api/process throughput
+through the Flask test client with external services stubbed out. Results are
+written as JSON and compared against a stored baseline.
+
+Usage:
+    python benchmarks/run.py                      # run and compare to benchmarks/baseline.json
+    python benchmarks/run.py --update-baseline    # run and store the results as the new baseline
+    python benchmarks/run.py --output results.json --tolerance 0.3
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+CORPUS_PATH = os.path.join(BENCH_DIR, 'corpus.json')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+
+STUB_SEARCH_ANSWER = "Here's what I found: benchmark result (stubbed search backend)"
+
+
+def configure_environment(workdir):
+    """Point every external service at nothing and keep state in a scratch directory"""
+    # Empty values win over .env, since load_dotenv never overrides existing variables
+    for key in ('ASSEMBLYAI_API_KEY', 'WOLFRAM_ALPHA_APP_ID', 'GOOGLE_API_KEY', 'GOOGLE_SEARCH_ENGINE_ID'):
+        os.environ[key] = ''
+    os.environ['NOVA_REMINDER_DB'] = os.path.join(workdir, 'reminders.db')
+    # Services are built on first use rather than warmed up in the background during the timings
+    os.environ['NOVA_STARTUP_MODE'] = 'lazy'
+    os.environ.setdefault('NOVA_NLP_ENRICHMENT', 'off')
+    os.environ.setdefault('NOVA_INTENT_MODE', 'ranked')
+    # Throughput is measured from a single client, which rate limiting would throttle
+    os.environ.setdefault('NOVA_ADMISSION', 'false')
+    if PROJECT_ROOT not in sys.path:
+        sys.path.insert(0, PROJECT_ROOT)
+
+
+def stub_external_services(command_handler):
+    """Replace the outbound search backends with an instant canned answer"""
+    command_handler._search_google_api = lambda query, deadline=None: None
+    command_handler._search_scrape = lambda query, deadline=None: (STUB_SEARCH_ANSWER, True)
+    # Measure the handler rather than the cache
+    command_handler.search_cache.maxsize = 0
+
+
+def load_corpus():
+    with open(CORPUS_PATH) as f:
+        corpus = json.load(f)
+    return [(text, intent) for intent, texts in corpus.items() for text in texts]
+
+
+def measure(func, items, rounds, warmup=1):
+    """
+    Time func over every item for several rounds
+
+    Args:
+        func (callable): Called with one item
+        items (list): Inputs, all processed in each round
+        rounds (int): Number of timed rounds
+        warmup (int): Untimed rounds run first
+
+    Returns:
+        dict: Per-call microseconds (min, median, p95 across rounds) and calls per second
+    """
+    for _ in range(warmup):
+        for item in items:
+            func(item)
+
+    per_call = []
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        for item in items:
+            func(item)
+        per_call.append((time.perf_counter_ns() - started) / len(items) / 1000)
+
+    per_call.sort()
+    median = statistics.median(per_call)
+    return {
+        'min_us': round(per_call[0], 3),
+        'median_us': round(median, 3),
+        'p95_us': round(per_call[min(len(per_call) - 1, int(len(per_call) * 0.95))], 3),
+        'ops_per_sec': round(1e6 / median, 1) if median else None,
+        'calls': len(items) * rounds
+    }
+
+
+def intent_accuracy(nlp_processor, corpus):
+    """Share of corpus utterances whose detected intent matches the label, overall and per intent"""
+    mismatches = []
+    totals = {}
+    missed = {}
+    for text, expected in corpus:
+        totals[expected] = totals.get(expected, 0) + 1
+        detected = nlp_processor.detect_intent(text)
+        if detected != expected:
+            missed[expected] = missed.get(expected, 0) + 1
+            mismatches.append({'text': text, 'expected': expected, 'detected': detected})
+    return {
+        'accuracy': round(1 - len(mismatches) / len(corpus), 4),
+        'total': len(corpus),
+        'per_intent': {
+            intent: round(1 - missed.get(intent, 0) / total, 4) for intent, total in sorted(totals.items())
+        },
+        'mismatches': mismatches
+    }
+
+
+def run_micro(rounds):
+    """Benchmarks that call the NLP processor and command handler directly"""
+    from ai_agent.nlp_processor import NLPProcessor
+    from ai_agent.commands import CommandHandler
+    from ai_agent.parsing import ParseResult
+
+    corpus = load_corpus()
+    nlp_processor = NLPProcessor()
+    command_handler = CommandHandler()
+    stub_external_services(command_handler)
+
+    texts = [text for text, _ in corpus]
+    labeled = [(text, intent) for text, intent in corpus if intent != 'unknown']
+    math_texts = [text for text, intent in corpus if intent == 'math']
+    reminder_texts = [text for text, intent in corpus if intent == 'reminder']
+
+    results = {
+        'detect_intent': measure(nlp_processor.detect_intent, texts, rounds),
+        'parse': measure(nlp_processor.parse, texts, rounds),
+        'extract_entities': measure(lambda item: nlp_processor.extract_entities(*item), labeled, rounds),
+        # Handlers get a fresh parse each call, so slot extraction is part of their time
+        'handle_math': measure(lambda text: command_handler.handle_math(ParseResult(text, 'math')),
+                               math_texts, rounds),
+        'handle_reminder': measure(lambda text: command_handler.handle_reminder(ParseResult(text, 'reminder')),
+                                   reminder_texts, max(rounds // 5, 3)),
+        'generate_thinking_process': measure(
+            lambda item: command_handler.generate_thinking_process(item[1], item[0]), labeled, rounds
+        )
+    }
+    return results, intent_accuracy(nlp_processor, corpus)
+
+
+def run_end_to_end(requests_count):
+    """/api/process throughput through the Flask test client"""
+    try:
+        import app as nova_app
+    except ImportError as e:
+        return {'skipped': f"Flask app could not be imported: {e}"}
+
+    stub_external_services(nova_app.command_handler)
+    client = nova_app.app.test_client()
+    messages = [text for text, _ in load_corpus()]
+
+    for message in messages:
+        client.post('/api/process', json={'message': message})
+
+    latencies = []
+    failures = 0
+    started = time.perf_counter()
+    for i in range(requests_count):
+        request_started = time.perf_counter_ns()
+        response = client.post('/api/process', json={'message': messages[i % len(messages)]})
+        latencies.append((time.perf_counter_ns() - request_started) / 1000)
+        if response.status_code != 200:
+            failures += 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': requests_count,
+        'failures': failures,
+        'requests_per_sec': round(requests_count / elapsed, 1),
+        'median_us': round(statistics.median(latencies), 3),
+        'p95_us': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        'p99_us': round(latencies[int(len(latencies) * 0.99) - 1], 3)
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+            capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compare results against a baseline
+    Timings are only compared with a baseline recorded on the same platform and Python;
+    intent accuracy (overall and per intent) is compared everywhere
+
+    Args:
+        results (dict): Current run
+        baseline (dict): Stored run
+        tolerance (float): Allowed relative slowdown of a median (0.2 = 20%)
+
+    Returns:
+        list: Human-readable regression descriptions (empty when nothing regressed)
+    """
+    regressions = []
+    if any(baseline.get('meta', {}).get(key) != results['meta'][key] for key in ('platform', 'python')):
+        print("  timings skipped: baseline was recorded on another platform or Python version")
+        baseline = {key: value for key, value in baseline.items() if key == 'intent_accuracy'}
+    baseline_timings = dict(baseline.get('benchmarks', {}))
+    current_timings = dict(results['benchmarks'])
+    for name in ('end_to_end',):
+        if 'median_us' in baseline.get(name, {}) and 'median_us' in results.get(name, {}):
+            baseline_timings[name] = baseline[name]
+            current_timings[name] = results[name]
+
+    for name, previous in baseline_timings.items():
+        current = current_timings.get(name)
+        if not current or not previous.get('median_us'):
+            continue
+        ratio = current['median_us'] / previous['median_us']
+        status = 'REGRESSION' if ratio > 1 + tolerance else 'ok'
+        print(f"  {name:<28} {previous['median_us']:>10.2f}us -> {current['median_us']:>10.2f}us  x{ratio:.2f}  {status}")
+        if status != 'ok':
+            regressions.append(f"{name} median is {ratio:.2f}x the baseline")
+
+    previous_accuracy = baseline.get('intent_accuracy', {}).get('accuracy')
+    accuracy = results['intent_accuracy']['accuracy']
+    if previous_accuracy is not None:
+        print(f"  {'intent accuracy':<28} {previous_accuracy:>12.2%} -> {accuracy:>12.2%}")
+        if accuracy < previous_accuracy:
+            regressions.append(f"intent accuracy dropped from {previous_accuracy:.2%} to {accuracy:.2%}")
+
+    per_intent = results['intent_accuracy'].get('per_intent', {})
+    for intent, previous in baseline.get('intent_accuracy', {}).get('per_intent', {}).items():
+        current = per_intent.get(intent)
+        if current is not None and current < previous:
+            print(f"  {intent + ' accuracy':<28} {previous:>12.2%} -> {current:>12.2%}")
+            regressions.append(f"{intent} accuracy dropped from {previous:.2%} to {current:.2%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run NOVA's offline benchmark suite")
+    parser.add_argument('--rounds', type=int, default=50, help='timed rounds per micro-benchmark')
+    parser.add_argument('--requests', type=int, default=500, help='requests for the end-to-end benchmark')
+    parser.add_argument('--skip-e2e', action='store_true', help='skip the Flask end-to-end benchmark')
+    parser.add_argument('--output', help='write the results JSON to this file')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline JSON to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative slowdown before failing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='nova-bench-') as workdir:
+        configure_environment(workdir)
+        import logging
+        logging.disable(logging.CRITICAL)
+
+        benchmarks, accuracy = run_micro(args.rounds)
+        results = {
+            'meta': {
+                'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'revision': git_revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'rounds': args.rounds
+            },
+            'benchmarks': benchmarks,
+            'intent_accuracy': accuracy
+        }
+        if not args.skip_e2e:
+            results['end_to_end'] = run_end_to_end(args.requests)
+
+    print(json.dumps({key: value for key, value in results.items() if key != 'intent_accuracy'}, indent=2))
+    print(f"Intent accuracy: {accuracy['accuracy']:.2%} of {accuracy['total']} utterances")
+    for mismatch in accuracy['mismatches']:
+        print(f"  '{mismatch['text']}': expected {mismatch['expected']}, got {mismatch['detected']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print(f"Comparing with baseline from {baseline.get('meta', {}).get('revision') or 'unknown revision'}:")
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
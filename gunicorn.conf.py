@@ -0,0 +1,65 @@
+"""
+Gunicorn production profile for NOVA
+
+    gunicorn -c gunicorn.conf.py app:app
+
+The app is imported once in the master and the NLP pipeline (spaCy) is loaded and
+exercised there before any worker is forked. gc.freeze() then moves those objects
+out of the collector's reach, so workers share the model pages copy-on-write
+instead of each loading (or gradually dirtying) their own copy.
+
+Services that own threads, executors, SQLite connections or native engines
+(CommandHandler, SpeechHandler) are never built in the master; each worker
+builds its own after the fork, shared by that worker's request threads.
+"""
+import gc
+import os
+
+# Nothing is built while app.py is imported; when_ready decides what the master preloads
+os.environ.setdefault('NOVA_STARTUP_MODE', 'lazy')
+
+# Built and warmed in the master, shared by all workers
+PRELOADED_SERVICES = ['nlp_processor']
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+preload_app = True
+
+# Threads share one CommandHandler per worker: its caches, HTTP pools and executors
+# are thread-safe and per-request state lives in thread-locals. Admission control caps
+# the expensive lane (NOVA_ADMISSION_EXPENSIVE_CONCURRENCY, 4) below the thread count so
+# slow search/WolframAlpha/speech requests never take every thread from cheap ones
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+threads = int(os.getenv('NOVA_GUNICORN_THREADS', 8))
+
+timeout = int(os.getenv('NOVA_GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# Optional recycling of workers to bound memory growth (0 disables it)
+max_requests = int(os.getenv('NOVA_GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+
+def when_ready(server):
+    """Load and warm the fork-safe services in the master, then freeze the heap"""
+    import app as nova
+
+    nova.services.warmup(PRELOADED_SERVICES)
+    gc.collect()
+    gc.freeze()
+    timings = ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in nova.services.timings().items())
+    server.log.info(f"Preloaded services ({timings}); {gc.get_freeze_count()} objects frozen")
+
+
+def post_fork(server, worker):
+    """Reset per-process state inherited from the master and warm the worker's own services"""
+    import app as nova
+    from ai_agent import logging_utils
+
+    logging_utils.restart_after_fork()
+    nova.services.after_fork()
+    if os.getenv('NOVA_WORKER_WARMUP', 'true').lower() in ('1', 'true', 'yes'):
+        nova.services.warmup_in_background(
+            [name for name in nova.services.status() if name not in PRELOADED_SERVICES]
+        )
@@ -0,0 +1,42 @@
+import threading
+import time
+
+import pytest
+
+from ai_agent.admission import AdmissionController, AdmissionRejected
+
+
+def controller(expensive_concurrency=1):
+    return AdmissionController(
+        concurrency={'cheap': 8, 'expensive': expensive_concurrency},
+        rates={'cheap': 1, 'expensive': 0.001},
+        bursts={'cheap': 5, 'expensive': 1}
+    )
+
+
+def test_batch_is_charged_once():
+    admission = controller(expensive_concurrency=4)
+    batch = admission.batch('client')
+    for _ in range(10):
+        with batch.admit('expensive'):
+            pass
+    with pytest.raises(AdmissionRejected) as rejection:
+        admission.admit('client', 'expensive')
+    assert rejection.value.status == 429
+
+
+def test_batch_messages_wait_for_a_slot():
+    admission = controller()
+    held = admission.admit('other', 'expensive')
+    threading.Timer(0.2, held.__exit__, (None, None, None)).start()
+    started = time.monotonic()
+    with admission.batch('client', wait=2).admit('expensive'):
+        assert time.monotonic() - started >= 0.15
+
+
+def test_batch_message_rejected_when_no_slot_frees_up():
+    admission = controller()
+    with admission.admit('other', 'expensive'):
+        with pytest.raises(AdmissionRejected) as rejection:
+            admission.batch('client', wait=0.1).admit('expensive')
+    assert rejection.value.status == 503
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import tempfile
+import time
+
+import pytest
+
+os.environ.setdefault('NOVA_STARTUP_MODE', 'lazy')
+os.environ.setdefault('NOVA_REMINDER_DB', os.path.join(tempfile.mkdtemp(), 'nova.db'))
+
+import app as nova  # noqa: E402
+import asgi  # noqa: E402
+from ai_agent.admission import AdmissionRejected  # noqa: E402
+
+
+def slow_wsgi_app(environ, start_response):
+    if environ['PATH_INFO'] == '/slow':
+        time.sleep(0.5)
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'ok']
+
+
+async def timed_get(application, path):
+    started = time.perf_counter()
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http', 'method': 'GET', 'path': path, 'query_string': b'', 'headers': [],
+        'http_version': '1.1', 'scheme': 'http', 'server': ('test', 80), 'client': ('127.0.0.1', 1)
+    }
+    await application(scope, receive, send)
+    assert sent[0]['status'] == 200
+    return time.perf_counter() - started
+
+
+def test_flask_routes_run_concurrently():
+    application = asgi.ThreadPooledWsgiToAsgi(slow_wsgi_app)
+
+    async def run():
+        return await asyncio.gather(
+            timed_get(application, '/slow'), timed_get(application, '/slow'), timed_get(application, '/fast')
+        )
+
+    slow, other_slow, fast = asyncio.run(run())
+    assert slow < 0.9 and other_slow < 0.9
+    assert fast < 0.25
+
+
+def test_asgi_routes_share_the_flask_rate_limits():
+    if not nova.admission.enabled:
+        pytest.skip('admission control is disabled')
+    client = 'test-shared-bucket'
+    burst = int(nova.admission.limiters['expensive'].burst)
+    for _ in range(burst):
+        with asgi.admission.admit(client, 'expensive'):
+            pass
+    with pytest.raises(AdmissionRejected) as rejection:
+        nova.admission.admit(client, 'expensive')
+    assert rejection.value.status == 429
+    assert asgi.admission.lanes['expensive'].limit > nova.admission.lanes['expensive'].limit
@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ai_agent.commands import CommandHandler
+from ai_agent.math_engine import MathEngine, MathError, to_expression
+from ai_agent.parsing import ParseResult
+
+# Inputs the local engine must leave to WolframAlpha
+NOT_LOCAL = [
+    "what is the square root of 144",
+    "what is 15 percent of 200",
+    "what is 10 mod 3",
+    "2^10",
+    "15% of 200",
+    "what is 7",
+    "what is -5",
+]
+
+
+@pytest.mark.parametrize('text', NOT_LOCAL)
+def test_not_plain_arithmetic_has_no_expression(text):
+    assert to_expression(text) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("what is 5 plus 3", 8),
+    ("calculate 12 times 4", 48),
+    ("what is 5 squared", 25),
+    ("what's 2 to the power of 10", 1024),
+    ("(3+4)*2", 14),
+    ("what is 100 divided by 4", 25),
+    ("what is 2 x 3", 6),
+])
+def test_plain_arithmetic_is_evaluated_locally(text, expected):
+    assert MathEngine().evaluate(to_expression(text)) == expected
+
+
+def test_limits_are_enforced():
+    engine = MathEngine()
+    with pytest.raises(MathError):
+        engine.evaluate('9 ** 9 ** 9')
+    with pytest.raises(MathError):
+        engine.evaluate('1 / 0')
+
+
+@pytest.mark.parametrize('text', NOT_LOCAL)
+def test_handle_math_falls_through_to_wolfram(text):
+    asked = []
+    # Only the attributes handle_math uses; the full constructor starts threads and opens SQLite
+    handler = CommandHandler.__new__(CommandHandler)
+    handler.math_engine = MathEngine()
+    handler.wolfram = SimpleNamespace(configured=True, ask=lambda question: asked.append(question) or '12')
+    handler._report_progress = lambda message: None
+    assert handler.evaluate_math(ParseResult(text, intent='math')) is None
+    assert handler.handle_math(ParseResult(text, intent='math')) == "The answer is 12."
+    assert asked == [text]
@@ -0,0 +1,23 @@
+import time
+
+from ai_agent.reminders import ReminderScheduler
+
+
+class RacingStore:
+    """Store whose horizon query races with a reminder being added and scheduled"""
+
+    def __init__(self):
+        self.scheduler = None
+
+    def pending_until(self, until):
+        # Committed after the query's snapshot, so only schedule() can deliver it
+        self.scheduler.schedule(7, time.time() + 60)
+        return []
+
+
+def test_reminder_added_during_refresh_is_scheduled():
+    store = RacingStore()
+    scheduler = ReminderScheduler(store, horizon=3600)
+    store.scheduler = scheduler
+    scheduler._refresh()
+    assert [reminder_id for _, reminder_id in scheduler._heap] == [7]
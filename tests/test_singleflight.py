@@ -0,0 +1,66 @@
+import threading
+import time
+
+from ai_agent.singleflight import SingleFlight
+
+
+def test_leader_cancellation_does_not_cancel_a_shared_lookup():
+    flights = SingleFlight('test')
+    leader_cancel = threading.Event()
+    started = threading.Event()
+    seen = []
+    results = {}
+
+    def lookup():
+        started.set()
+        cancellation = flights.cancellation('key')
+        deadline = time.monotonic() + 0.5
+        while time.monotonic() < deadline:
+            if cancellation.is_set():
+                return 'cancelled'
+            time.sleep(0.01)
+        seen.append(cancellation.is_set())
+        return 'answer'
+
+    leader = threading.Thread(target=lambda: results.update(
+        leader=flights.do('key', lookup, cancel_event=leader_cancel)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.update(follower=flights.do('key', lookup)))
+    follower.start()
+    time.sleep(0.05)
+    leader_cancel.set()
+    leader.join()
+    follower.join()
+
+    assert results == {'leader': 'answer', 'follower': 'answer'}
+    assert seen == [False]
+
+
+def test_lookup_is_abandoned_once_every_caller_cancelled():
+    flights = SingleFlight('test')
+    cancels = [threading.Event(), threading.Event()]
+    started = threading.Event()
+    results = []
+
+    def lookup():
+        started.set()
+        cancellation = flights.cancellation('key')
+        while not cancellation.is_set():
+            time.sleep(0.01)
+        return 'cancelled'
+
+    threads = [threading.Thread(target=lambda event=event: results.append(
+        flights.do('key', lookup, cancel_event=event))) for event in cancels]
+    threads[0].start()
+    started.wait()
+    threads[1].start()
+    time.sleep(0.05)
+    cancels[0].set()
+    assert not flights.abandoned('key')
+    cancels[1].set()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert results == ['cancelled', 'cancelled']
+    assert flights.in_flight() == 0
@@ -0,0 +1,54 @@
+import datetime
+
+import pytest
+
+from ai_agent.parsing import ParseResult
+from ai_agent.time_parser import parse_time_expression
+
+# A Wednesday
+NOW = datetime.datetime(2026, 10, 14, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.parametrize('text', [
+    "remind me to buy sun cream",
+    "check the sat scores",
+    "the wed dress",
+])
+def test_weekday_abbreviations_need_a_prefix(text):
+    assert parse_time_expression(text, now=NOW) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("remind me on sat to call", datetime.datetime(2026, 10, 17, 9, 0)),
+    ("next fri at 5pm", datetime.datetime(2026, 10, 16, 17, 0)),
+    ("remind me on friday", datetime.datetime(2026, 10, 16, 9, 0)),
+    ("meeting monday", datetime.datetime(2026, 10, 19, 9, 0)),
+])
+def test_weekdays(text, expected):
+    assert parse_time_expression(text, now=NOW).due == expected.replace(tzinfo=datetime.timezone.utc)
+
+
+@pytest.mark.parametrize('text', [
+    "remind me to call mark 5 times",
+    "send the marketing 3 slides",
+    "decide 2 things",
+    "junk 4 boxes",
+])
+def test_words_starting_with_a_month_are_not_dates(text):
+    assert parse_time_expression(text, now=NOW) is None
+
+
+@pytest.mark.parametrize('text, expected', [
+    ("march 5th at 10am", datetime.datetime(2027, 3, 5, 10, 0)),
+    ("on sept 3", datetime.datetime(2027, 9, 3, 9, 0)),
+    ("dec. 24", datetime.datetime(2026, 12, 24, 9, 0)),
+    ("july 4", datetime.datetime(2027, 7, 4, 9, 0)),
+])
+def test_month_names(text, expected):
+    assert parse_time_expression(text, now=NOW).due == expected.replace(tzinfo=datetime.timezone.utc)
+
+
+def test_out_of_range_relative_time_is_not_a_time():
+    assert parse_time_expression("remind me in 1000000000 days", now=NOW) is None
+    entities = ParseResult("remind me in 1000000000 days to stretch", intent='reminder').entities
+    assert 'due_at' not in entities